@@ -14,7 +14,7 @@
 
 import unittest
 
-from towhee.hub.cache_manager import CacheManager
+from towhee.hub.cache_manager import CacheManager, get_local_dir, local_dir
 
 
 class TestCacheManager(unittest.TestCase):
@@ -29,6 +29,12 @@ class TestCacheManager(unittest.TestCase):
         with self.assertRaises(ValueError):
             CacheManager().get_pipeline('No-pipe', 'main', True)
 
+    def test_local_dir(self):
+        root = get_local_dir()
+        with local_dir('/tmp/towhee_hub') as d:
+            self.assertEqual((d, get_local_dir()), ('/tmp/towhee_hub', '/tmp/towhee_hub'))
+        self.assertEqual(get_local_dir(), root)
+
     def test_download_op(self):
         CacheManager().get_operator('image-decode/cv2-rgb', 'main', True, True)
         CacheManager().get_operator('image-decode/cv2', 'main', True, False)
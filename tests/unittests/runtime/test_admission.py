@@ -0,0 +1,104 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+import threading
+import unittest
+
+from towhee import pipe
+from towhee.runtime.admission import AdmissionController, PipelineOverloadedError
+from towhee.runtime.cancellation import PipelineTimeoutError
+from towhee.runtime.scheduler import Priority
+
+
+class TestAdmission(unittest.TestCase):
+    """
+    Test the admission control of pipeline calls.
+    """
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            AdmissionController(0)
+        with self.assertRaises(ValueError):
+            AdmissionController(2, min_concurrency=3)
+
+    def test_queue(self):
+        admission = AdmissionController(1, max_queue=2)
+        admission.acquire()
+        order = []
+
+        def wait(name, priority):
+            admission.acquire(priority)
+            order.append(name)
+            admission.release()
+
+        threads = [threading.Thread(target=wait, args=('low', Priority.LOW))]
+        threads[0].start()
+        while admission.stats()['queued'] < 1:
+            time.sleep(0.01)
+        threads.append(threading.Thread(target=wait, args=('high', Priority.HIGH)))
+        threads[1].start()
+        while admission.stats()['queued'] < 2:
+            time.sleep(0.01)
+
+        with self.assertRaises(PipelineOverloadedError):
+            admission.acquire()
+        admission.release()
+        for t in threads:
+            t.join()
+        self.assertEqual(order, ['high', 'low'])
+        self.assertEqual(admission.stats(), {'limit': 1, 'running': 0, 'queued': 0, 'rejected': 1})
+
+    def test_wait_timeout(self):
+        admission = AdmissionController(1, max_queue=1, queue_timeout=0.05)
+        admission.acquire()
+        with self.assertRaises(PipelineOverloadedError):
+            admission.acquire()
+        with self.assertRaises(PipelineTimeoutError):
+            admission.acquire(timeout=0.01)
+        self.assertEqual(admission.stats()['queued'], 0)
+        admission.release()
+        admission.acquire(timeout=0.01)
+
+    def test_adaptive(self):
+        admission = AdmissionController(8, target_latency=0.1, min_concurrency=2)
+        for _ in range(20):
+            admission.acquire()
+            admission.release(1)
+        self.assertEqual(admission.limit, 2)
+        for _ in range(100):
+            admission.acquire()
+            admission.release(0.01)
+        self.assertEqual(admission.limit, 8)
+        admission.acquire()
+        admission.release()
+        self.assertEqual(admission.limit, 8)
+
+    def test_pipeline(self):
+        gate = threading.Event()
+        p = pipe.input('x').map('x', 'y', lambda x: gate.wait(5) and x).output('y').limit(2)
+        self.assertIsNone(pipe.input('x').output('x').admission_stats())
+
+        f1 = p.async_call(1)
+        f2 = p.async_call(2)
+        with self.assertRaises(PipelineOverloadedError):
+            p(3)
+        self.assertTrue(f2.cancel())
+        f3 = p.async_call(3)
+        gate.set()
+        self.assertEqual([f1.result().get(), f3.result().get()], [[1], [3]])
+
+        # the batch waits for its own calls
+        self.assertEqual([r.get() for r in p.batch([1, 2, 3, 4, 5])], [[1], [2], [3], [4], [5]])
+        stats = p.admission_stats()
+        self.assertEqual((stats['running'], stats['queued']), (0, 0))
@@ -0,0 +1,182 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+import asyncio
+import threading
+import unittest
+
+from towhee import pipe
+from towhee.runtime.async_runner import get_event_loop, is_async_op, TokenBucket
+
+
+class FakeService:
+    """
+    An async operator calling a fake service, recording the most concurrent calls.
+    """
+    def __init__(self, delay: float = 0.05):
+        self._delay = delay
+        self.running = 0
+        self.max_running = 0
+        self.max_threads = 0
+
+    async def __call__(self, x):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        self.max_threads = max(self.max_threads, threading.active_count())
+        try:
+            await asyncio.sleep(self._delay)
+            if x < 0:
+                raise ValueError('negative input')
+            return x * 2
+        finally:
+            self.running -= 1
+
+
+class TestAsyncOps(unittest.TestCase):
+    """
+    Test the async operators.
+    """
+    def test_is_async(self):
+        async def f(x):
+            return x
+        self.assertTrue(is_async_op(f))
+        self.assertTrue(is_async_op(FakeService()))
+        self.assertFalse(is_async_op(lambda x: x))
+
+    def test_concurrency(self):
+        service = FakeService()
+        p = (pipe.input('x')
+             .flat_map('x', 'x', lambda x: x)
+             .map('x', 'y', service, config={'max_concurrency': 20})
+             .output('y'))
+        threads = threading.active_count()
+        start = time.time()
+        res = p(list(range(100))).to_list()
+        self.assertLess(time.time() - start, 2)
+        self.assertEqual(res, [[i * 2] for i in range(100)])
+        self.assertEqual(service.max_running, 20)
+        self.assertLess(service.max_threads, threads + 10)
+
+        # The limit is shared by the calls.
+        service.max_running = 0
+        res = [q.to_list() for q in p.batch([list(range(30))] * 4)]
+        self.assertEqual(res, [[[i * 2] for i in range(30)]] * 4)
+        self.assertLessEqual(service.max_running, 20)
+
+    def test_rate_limit(self):
+        p = (pipe.input('x')
+             .flat_map('x', 'x', lambda x: x)
+             .map('x', 'y', FakeService(0), config={'rate_limit': 20, 'rate_burst': 1})
+             .output('y'))
+        start = time.time()
+        self.assertEqual(p(list(range(6))).to_list(), [[i * 2] for i in range(6)])
+        self.assertGreaterEqual(time.time() - start, 0.2)
+
+        p = pipe.input('x').map('x', 'y', FakeService(0), config={'rate_limit': 0.5}).output('y')
+        self.assertEqual(p(1).get(), [2])
+        with self.assertRaises(ValueError):
+            pipe.input('x').map('x', 'y', FakeService(0), config={'rate_limit': 0}).output('y')
+
+    def test_emit_before_next_input(self):
+        def slow_source(n):
+            for i in range(n):
+                yield i
+                time.sleep(0.3)
+
+        received = []
+        p = (pipe.input('x')
+             .flat_map('x', 'x', slow_source)
+             .map('x', 'y', FakeService(0.01), config={'max_concurrency': 4})
+             .map('y', 'y', lambda y: received.append(time.time()) or y)
+             .output('y'))
+        start = time.time()
+        self.assertEqual(p(2).to_list(), [[0], [2]])
+        # The first row is output once its call finishes, not when the next input arrives.
+        self.assertLess(received[0] - start, 0.2)
+
+    def test_token_bucket(self):
+        bucket = TokenBucket(100, burst=5)
+
+        async def take(n):
+            for _ in range(n):
+                await bucket.acquire()
+
+        start = time.time()
+        asyncio.run_coroutine_threadsafe(take(5), get_event_loop()).result()
+        self.assertLess(time.time() - start, 0.05)
+        asyncio.run_coroutine_threadsafe(take(10), get_event_loop()).result()
+        self.assertGreaterEqual(time.time() - start, 0.09)
+
+        with self.assertRaises(ValueError):
+            TokenBucket(0)
+
+    def test_fake_server(self):
+        async def handle(reader, writer):
+            data = await reader.readline()
+            await asyncio.sleep(0.02)
+            writer.write(data.upper())
+            await writer.drain()
+            writer.close()
+
+        loop = get_event_loop()
+        server = asyncio.run_coroutine_threadsafe(asyncio.start_server(handle, '127.0.0.1', 0), loop).result()
+        port = server.sockets[0].getsockname()[1]
+
+        async def request(text):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write((text + '\n').encode())
+            await writer.drain()
+            reply = await reader.readline()
+            writer.close()
+            return reply.decode().strip()
+
+        try:
+            p = (pipe.input('x')
+                 .flat_map('x', 'x', lambda x: x)
+                 .map('x', 'y', request, config={'max_concurrency': 50})
+                 .output('y'))
+            words = ['towhee{}'.format(i) for i in range(100)]
+            self.assertEqual(p(words).to_list(), [[w.upper()] for w in words])
+        finally:
+            server.close()
+
+    def test_flat_map_and_filter(self):
+        async def split(x):
+            await asyncio.sleep(0.01)
+            return list(range(x))
+
+        async def is_even(x):
+            return x % 2 == 0
+
+        p = (pipe.input('x')
+             .flat_map('x', 'y', split)
+             .filter('y', 'y', 'y', is_even)
+             .output('y'))
+        self.assertEqual(p(5).to_list(), [[0], [2], [4]])
+
+    def test_error(self):
+        p = (pipe.input('x')
+             .flat_map('x', 'x', lambda x: x)
+             .map('x', 'y', FakeService(0.01))
+             .output('y'))
+        with self.assertRaises(RuntimeError):
+            p([1, -1, 2])
+
+        p = (pipe.input('x')
+             .flat_map('x', 'x', lambda x: x)
+             .map('x', 'y', FakeService(0.01), config={'error_policy': 'skip'})
+             .output('y'))
+        self.assertEqual(p([1, -1, 2]).to_list(), [[2], [4]])
+        self.assertEqual(p.dead_letters.records[0]['inputs'], [-1])
@@ -13,9 +13,13 @@
 # limitations under the License.
 
 import pathlib
+import tempfile
 import unittest
+from unittest import mock
 
+import towhee.hub.cache_manager as cache_manager
 from towhee import AutoConfig, AutoPipes
+from towhee.pipelines import cached_model_names, operator_version
 from towhee.runtime.node_config import TowheeConfig
 
 
@@ -142,6 +146,46 @@ class TestAutoPipes(unittest.TestCase):
         ret = p(10).get()[0]
         self.assertEqual(ret, 12)
 
+    def test_load_once(self):
+        file_path = str(pathlib.Path(__file__).parent / 'builtin_pipeline.py')
+        AutoConfig.load_config(file_path)
+        # The pipeline is registered by the same load.
+        self.assertIn(file_path, AutoPipes._PIPES_DEF)  # pylint: disable=protected-access
+
+    def test_sentence_embedding_config(self):
+        # The operators are not loaded to list their models.
+        conf = AutoConfig.load_config('sentence_embedding')
+        self.assertEqual(conf.model, 'all-MiniLM-L6-v2')
+
+    def test_cached_model_names(self):
+        calls = []
+
+        def _load():
+            calls.append(1)
+            return ['a', 'b']
+
+        with tempfile.TemporaryDirectory() as root, mock.patch.object(cache_manager, '_HUB_ROOT', root):
+            self.assertEqual(cached_model_names('test_autos.load', _load), ['a', 'b'])
+            self.assertEqual(cached_model_names('test_autos.load', _load), ['a', 'b'])
+            self.assertTrue((pathlib.Path(root) / 'pipelines' / 'model_names' / 'test_autos.load.json').is_file())
+            with mock.patch.dict('towhee.pipelines._model_names', clear=True):
+                self.assertEqual(cached_model_names('test_autos.load', _load), ['a', 'b'])
+            self.assertEqual(len(calls), 1)
+
+            # Loaded again once the operator changes or the names expire.
+            self.assertEqual(cached_model_names('test_autos.load', _load, lambda: 'v2'), ['a', 'b'])
+            self.assertEqual(len(calls), 2)
+            with mock.patch.dict('towhee.pipelines._model_names', clear=True):
+                self.assertEqual(cached_model_names('test_autos.load', _load, lambda: 'v2'), ['a', 'b'])
+                self.assertEqual(len(calls), 2)
+            self.assertEqual(cached_model_names('test_autos.load', _load, lambda: 'v2', max_age=0), ['a', 'b'])
+            self.assertEqual(len(calls), 3)
+
+            self.assertIsNone(operator_version('sentence-embedding/not-downloaded'))
+            op_dir = pathlib.Path(root) / 'operators' / 'sentence-embedding' / 'sbert' / 'versions' / 'main'
+            op_dir.mkdir(parents=True)
+            self.assertEqual(operator_version('sentence-embedding/sbert'), str(op_dir.stat().st_mtime_ns))
+
     def test_local_repo(self):
         conf = AutoConfig.load_config('local/ci-test2')
         conf.param = 1
@@ -0,0 +1,110 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+import threading
+import unittest
+
+from towhee import pipe, ops
+from towhee.operator import PyOperator
+from towhee.runtime.operator_manager import OperatorRegistry
+from towhee.runtime.cancellation import PipelineTimeoutError, PipelineCancelledError, CancelToken, cancel_scope
+
+register = OperatorRegistry.register
+
+_GATE = threading.Event()
+
+
+# pylint: disable=unused-variable
+@register(name='test_cancel/wait_gate')
+class WaitGate(PyOperator):
+    def __call__(self, x):
+        _GATE.wait(5)
+        return x
+
+
+class TestCancellation(unittest.TestCase):
+    """
+    Test timeout and cancellation of pipeline calls.
+    """
+    def setUp(self):
+        _GATE.clear()
+        self.pipe = (pipe.input('n')
+                     .flat_map('n', 'x', range)
+                     .map('x', 'y', ops.test_cancel.wait_gate())
+                     .output('y'))
+
+    def tearDown(self):
+        _GATE.set()
+
+    def _pool_size(self):
+        return len(self.pipe._operator_pool)  # pylint: disable=protected-access
+
+    def test_timeout(self):
+        start = time.time()
+        with self.assertRaises(PipelineTimeoutError):
+            self.pipe(5, timeout=0.1)
+        self.assertLess(time.time() - start, 2)
+        self.assertIsInstance(PipelineTimeoutError('x'), TimeoutError)
+
+        # the hanging operator is returned to the pool once it exits
+        self.assertEqual(self._pool_size(), 0)
+        _GATE.set()
+        for _ in range(50):
+            if self._pool_size() == 1:
+                break
+            time.sleep(0.02)
+        self.assertEqual(self._pool_size(), 1)
+        self.assertEqual(self.pipe(3, timeout=5).to_list(), [[0], [1], [2]])
+
+    def test_async_call(self):
+        f = self.pipe.async_call(3)
+        self.assertFalse(f.done())
+        self.assertTrue(f.cancel())
+        self.assertTrue(f.cancelled())
+        self.assertTrue(f.done())
+        self.assertFalse(f.cancel())
+        with self.assertRaises(PipelineCancelledError):
+            f.result()
+
+        _GATE.set()
+        f = self.pipe.async_call(2)
+        self.assertEqual(f.result(5).to_list(), [[0], [1]])
+        self.assertFalse(f.cancel())
+        self.assertFalse(f.cancelled())
+
+    def test_cancel_scope(self):
+        token = CancelToken()
+        threading.Timer(0.1, token.cancel).start()
+        with cancel_scope(token):
+            with self.assertRaises(PipelineCancelledError):
+                self.pipe(3)
+        self.assertTrue(token.cancelled)
+
+        _GATE.set()
+        with cancel_scope(token):
+            with self.assertRaises(PipelineCancelledError):
+                self.pipe(3)
+
+    def test_batch_timeout(self):
+        with self.assertRaises(PipelineTimeoutError):
+            self.pipe.batch([1, 2, 3], timeout=0.1)
+        _GATE.set()
+        res = self.pipe.batch([1, 2], timeout=5)
+        self.assertEqual([r.to_list() for r in res], [[[0]], [[0], [1]]])
+
+    def test_full_queue(self):
+        p = pipe.input('n').flat_map('n', 'x', range).map('x', 'y', ops.test_cancel.wait_gate()).output('y')
+        with self.assertRaises(PipelineTimeoutError):
+            p(10000, timeout=0.1)
@@ -0,0 +1,107 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from towhee import pipe
+from towhee.runtime.checkpoint import Checkpoint
+
+
+class TestCheckpoint(unittest.TestCase):
+    """
+    Test the checkpoint and resume of bulk runs.
+    """
+    def setUp(self):
+        self._root = tempfile.TemporaryDirectory()
+        self.ckpt_path = Path(self._root.name) / 'job.ckpt'
+        self.calls = []
+        self.fail_on = set()
+        self._lock = threading.Lock()
+
+        def _embed(x):
+            with self._lock:
+                self.calls.append(x)
+            if x in self.fail_on:
+                raise ValueError('bad row {}'.format(x))
+            return x * 10
+
+        self.pipe = pipe.input('x').map('x', 'y', _embed).output('y')
+
+    def tearDown(self):
+        self._root.cleanup()
+
+    def test_checkpoint(self):
+        with Checkpoint(self.ckpt_path) as ckpt:
+            self.assertEqual(ckpt.offset, 0)
+            ckpt.commit(3, [('a', 1), ('b', 5), ('c', 7)])
+            self.assertEqual(ckpt.offset, 3)
+            self.assertEqual(ckpt.done_ids(), {'b', 'c'})
+            ckpt.commit(6)
+            self.assertEqual(ckpt.done_ids(), {'c'})
+            self.assertTrue(ckpt.is_done('c'))
+            ckpt.reset()
+            self.assertEqual((ckpt.offset, ckpt.done_ids()), (0, set()))
+
+    def test_resume(self):
+        self.fail_on = {5}
+        with self.assertRaises(RuntimeError):
+            self.pipe.bulk_run(range(20), self.ckpt_path, commit_every=2, max_in_flight=4)
+        with Checkpoint(self.ckpt_path) as ckpt:
+            self.assertEqual(ckpt.offset, 5)
+            done = ckpt.done_ids()
+        self.assertTrue(done <= {'6', '7', '8', '9'})
+
+        self.fail_on = set()
+        self.calls = []
+        results = {}
+        stats = self.pipe.bulk_run(range(20), self.ckpt_path, on_result=lambda rid, res: results.update({rid: res.get()[0]}))
+        self.assertEqual(sorted(self.calls), sorted(set(range(5, 20)) - set(int(i) for i in done)))
+        self.assertEqual(stats, {'run': 15 - len(done), 'skipped': 5 + len(done), 'offset': 20})
+        self.assertEqual(results['19'], 190)
+
+        self.calls = []
+        self.assertEqual(self.pipe.bulk_run(range(20), self.ckpt_path)['run'], 0)
+        self.assertEqual(self.calls, [])
+
+    def test_row_id(self):
+        with Checkpoint(self.ckpt_path) as ckpt:
+            ckpt.commit(0, [('k1', 1), ('k3', 3)])
+            stats = self.pipe.bulk_run(range(5), ckpt, row_id=lambda x: 'k{}'.format(x))
+            self.assertEqual(stats, {'run': 3, 'skipped': 2, 'offset': 5})
+            self.assertEqual(sorted(self.calls), [0, 2, 4])
+            self.assertEqual(ckpt.done_ids(), set())
+
+    def test_interrupted(self):
+        def _interrupt(rid, _):
+            if rid == '3':
+                raise KeyboardInterrupt()
+
+        with self.assertRaises(KeyboardInterrupt):
+            self.pipe.bulk_run(range(10), self.ckpt_path, commit_every=100, max_in_flight=1, on_result=_interrupt)
+        with Checkpoint(self.ckpt_path) as ckpt:
+            self.assertEqual(ckpt.offset, 3)
+
+    def test_limit(self):
+        p = pipe.input('x').map('x', 'y', lambda x: time.sleep(0.01) or x).output('y').limit(1)
+        self.assertEqual(p.bulk_run(range(10), self.ckpt_path, max_in_flight=4), {'run': 10, 'skipped': 0, 'offset': 10})
+
+    def test_multi_inputs(self):
+        p = pipe.input('a', 'b').map(('a', 'b'), 'c', lambda a, b: a + b).output('c')
+        res = []
+        p.bulk_run([(1, 2), (3, 4)], self.ckpt_path, on_result=lambda _, r: res.append(r.get()[0]))
+        self.assertEqual(res, [3, 7])
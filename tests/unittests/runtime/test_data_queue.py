@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import unittest
+
+import numpy as np
 import threading
 import time
 from functools import partial
@@ -483,6 +485,39 @@ class TestDataQueue(unittest.TestCase):
         self.assertEqual(ret[1], [2])
         self.assertEqual(que.size, 0)
 
+    def test_debug_data_queue_caps(self):
+        que = DataQueue([('url', ColumnType.SCALAR), ('image', ColumnType.QUEUE), ('vec', ColumnType.QUEUE)],
+                        keep_data=True, keep_rows=2)
+        que.batch_put([['http://towhee.io'], [1, 2, 3, 4], ['vec1', 'vec2', 'vec3', 'vec4']])
+        que.seal()
+        self.assertEqual([row[1:] for row in que.to_list()], [[1, 'vec1'], [2, 'vec2'], [3, 'vec3'], [4, 'vec4']])
+        self.assertEqual(que.dropped_rows, 2)
+        que.reset_size()
+        self.assertEqual([row[1:] for row in que.to_list()], [[1, 'vec1'], [2, 'vec2']])
+
+        que = DataQueue([('image', ColumnType.QUEUE), ('vec', ColumnType.QUEUE)], keep_data=True, keep_bytes=10)
+        for i in range(5):
+            que.put((b'abcd', 'v{}'.format(i)))
+        que.seal()
+        self.assertEqual(len(que.to_list()), 5)
+        que.reset_size()
+        self.assertEqual(que.to_list(), [[b'abcd', 'v0'], [b'abcd', 'v1']])
+
+    def test_debug_data_queue_snapshot(self):
+        arr = np.zeros(3)
+        frozen = np.zeros(3)
+        frozen.flags.writeable = False
+        for copy_data in [True, False]:
+            que = DataQueue([('arr', ColumnType.QUEUE), ('frozen', ColumnType.QUEUE)], keep_data=True, copy_data=copy_data)
+            que.put((arr, frozen))
+            ret = que.get()
+            self.assertIs(ret[1], frozen)
+            self.assertEqual(ret[0] is arr, not copy_data)
+            ret[0] += 1
+            que.reset_size()
+            self.assertEqual(que.get()[0].sum(), 0 if copy_data else 3)
+            arr = np.zeros(3)
+
     def test_empty_scalar(self):
         que = DataQueue([('url', ColumnType.SCALAR), ('image', ColumnType.SCALAR)])
         que.put(('http://towhee.io', Empty()))
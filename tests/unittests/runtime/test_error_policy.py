@@ -0,0 +1,128 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from towhee import pipe
+from towhee.runtime.error_policy import ErrorPolicy, ListSink, JSONLSink
+
+
+def _inverse(x):
+    return 1 / x
+
+
+def _src():
+    return pipe.input('d').flat_map('d', 'x', lambda d: d)
+
+
+class TestErrorPolicy(unittest.TestCase):
+    """
+    Test the error policies and the dead-letter sinks.
+    """
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            ErrorPolicy('retry')
+        with self.assertRaises(ValueError):
+            _src().map('x', 'y', _inverse, config={'error_policy': 'retry'}).output('y')
+
+    def test_fail(self):
+        p = _src().map('x', 'y', _inverse).output('y')
+        with self.assertRaises(RuntimeError):
+            p([1, 0, 2])
+        self.assertEqual(len(p.dead_letters), 0)
+
+    def test_skip(self):
+        p = _src().map('x', 'y', _inverse).output('x', 'y').on_error('skip')
+        self.assertEqual(p([1, 0, 2, 0, 4]).to_list(), [[1, 1.0], [2, 0.5], [4, 0.25]])
+        records = p.dead_letters.records
+        self.assertEqual([(r['row'], r['inputs']) for r in records], [(1, [0]), (3, [0])])
+        self.assertEqual(records[0]['node'], '_inverse-1')
+        self.assertEqual(records[0]['error'], 'ZeroDivisionError: division by zero')
+        self.assertIn('Traceback', records[0]['traceback'])
+
+        res = p.batch([[0], [1]])
+        self.assertEqual([r.to_list() for r in res], [[], [[1, 1.0]]])
+        self.assertEqual(len(p.dead_letters), 3)
+
+    def test_default(self):
+        p = _src().map('x', ('y', 'z'), lambda x: (1 / x, x)).output('y', 'z').on_error('default', (-1, -1))
+        self.assertEqual(p([1, 0]).to_list(), [[1.0, 1], [-1, -1]])
+
+    def test_generator(self):
+        def _gen(x):
+            yield x
+            yield 1 / x
+
+        p = _src().map('x', 'y', _gen).output('y').on_error('default', [])
+        self.assertEqual(p([1, 0]).to_list(), [[[1, 1.0]], [[]]])
+        self.assertEqual(p.dead_letters.records[0]['inputs'], [0])
+
+        p = _src().map('x', 'y', _gen).output('y').on_error('skip')
+        self.assertEqual(p([0, 2]).to_list(), [[[2, 0.5]]])
+
+    def test_filter(self):
+        # A failed row is kept under 'default' and dropped under 'skip', whatever the default.
+        for default in [False, None, True]:
+            p = _src().filter('x', 'y', 'x', lambda x: 1 / x > 0.3).output('y').on_error('default', default)
+            self.assertEqual(p([1, 0, 4]).to_list(), [[1], [0]])
+        p = _src().filter('x', 'y', 'x', lambda x: 1 / x > 0.3).output('y').on_error('skip')
+        self.assertEqual(p([1, 0, 4]).to_list(), [[1]])
+
+    def test_node_config(self):
+        p = (_src().map('x', 'y', _inverse, config={'error_policy': 'default', 'error_default': 0})
+             .map('x', 'z', _inverse)
+             .output('y', 'z'))
+        with self.assertRaises(RuntimeError):
+            p([1, 0])
+
+        p.on_error('skip')
+        self.assertEqual(p([1, 0]).to_list(), [[1.0, 1.0]])
+        self.assertEqual([r['node'] for r in p.dead_letters.records], ['_inverse-1', '_inverse-2'])
+
+        p = _src().map('x', 'y', _inverse, config={'error_policy': 'fail'}).output('y').on_error('skip')
+        with self.assertRaises(RuntimeError):
+            p([0])
+
+    def test_nodes(self):
+        sink = ListSink()
+        p = _src().filter('x', 'y', 'x', lambda x: 1 / x > 0.3).output('y').on_error('skip', sink=sink)
+        self.assertEqual(p([1, 0, 2, 4]).to_list(), [[1], [2]])
+        p = _src().flat_map('x', 'y', lambda x: [1 / x] * 2).output('y').on_error('skip', sink=sink)
+        self.assertEqual(p([1, 0]).to_list(), [[1.0], [1.0]])
+        p = _src().window('x', 'y', 2, 2, lambda x: 1 / sum(x)).output('y').on_error('skip', sink=sink)
+        self.assertEqual(p([1, 1, 0, 0, 1]).to_list(), [[0.5], [1.0]])
+        p = _src().window_all('x', 'y', lambda x: 1 / sum(x)).output('y').on_error('default', 0, sink=sink)
+        self.assertEqual(p([0]).to_list(), [[0]])
+        self.assertEqual(len(sink), 4)
+
+        p = _src().reduce('x', 'y', lambda x: 1 / sum(x)).output('y').on_error('skip', sink=sink)
+        with self.assertRaises(RuntimeError):
+            p([0])
+
+    def test_jsonl_sink(self):
+        with tempfile.TemporaryDirectory() as root:
+            file_path = Path(root) / 'dead' / 'letters.jsonl'
+            sink = JSONLSink(file_path)
+            p = _src().map('x', 'y', _inverse).output('y').on_error('skip', sink=sink)
+            self.assertEqual(p([0, 1, 0]).to_list(), [[1.0]])
+            p([object()])
+            sink.close()
+            records = [json.loads(line) for line in file_path.read_text().splitlines()]
+            self.assertEqual([r['row'] for r in records], [0, 2, 0])
+            self.assertEqual(records[0]['inputs'], [0])
+            self.assertTrue(records[2]['inputs'][0].startswith('<object object'))
+            self.assertTrue(records[2]['error'].startswith('TypeError'))
@@ -0,0 +1,143 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from towhee import pipe
+from towhee.runtime import execution_plan
+from towhee.runtime.dag_repr import DAGRepr
+from towhee.runtime.execution_plan import ExecutionPlan, compile_dag, dag_fingerprint
+
+
+def _build(fn, config=None):
+    p0 = pipe.input('a', 'b')
+    p1 = p0.map('a', 'c', fn, config=config)
+    p2 = p0.filter('b', 'd', 'b', lambda x: x > 0)
+    return p1.concat(p2).flat_map('c', 'e', lambda x: range(x)).window('e', 'f', 2, 2, sum)
+
+
+class TestExecutionPlan(unittest.TestCase):
+    """
+    Test the compiled execution plan.
+    """
+    def setUp(self):
+        execution_plan.clear_plan_cache()
+
+    def tearDown(self):
+        execution_plan.set_plan_cache_dir(None)
+        execution_plan.clear_plan_cache()
+
+    def test_builder_shares_nodes(self):
+        p0 = pipe.input('a')
+        p1 = p0.map('a', 'b', lambda x: x + 1)
+        p2 = p0.map('a', 'c', lambda x: x * 2)
+        self.assertEqual(len(p0.dag['_input']['next_nodes']), 0)
+        self.assertEqual(len(p1.dag['_input']['next_nodes']), 1)
+        self.assertEqual(len(p2.dag['_input']['next_nodes']), 1)
+
+        p3 = p1.map('b', 'd', lambda x: x)
+        self.assertIs(p3.dag[p1._clo_node]['op_info'], p1.dag[p1._clo_node]['op_info'])  # pylint: disable=protected-access
+
+        p4 = p3.concat(p2).output('b', 'c', 'd')
+        self.assertEqual(p4(1).get(), [2, 2, 2])
+        self.assertEqual(p1.output('b')(1).get(), [2])
+        self.assertEqual(p2.output('c')(1).get(), [2])
+
+    def test_dag_not_modified(self):
+        config = {'parallel': 2}
+        p = _build(lambda x: x + 1, config)
+        dag = p.dag
+        nodes = dict((uid, dict(node)) for uid, node in dag.items())
+        p.output('d', 'f')
+        self.assertEqual(config, {'parallel': 2})
+        self.assertEqual(dict((uid, dict(node)) for uid, node in dag.items()), nodes)
+
+    def test_fingerprint(self):
+        self.assertEqual(dag_fingerprint(_build(lambda x: x + 1).dag), dag_fingerprint(_build(lambda x: x + 2).dag))
+        self.assertNotEqual(dag_fingerprint(_build(lambda x: x + 1).dag), dag_fingerprint(pipe.input('a').dag))
+
+        sub = pipe.input('a').map('a', 'b', lambda x: x + 1).output('b')
+        self.assertIsNone(dag_fingerprint(pipe.input('a').map('a', 'b', sub).dag))
+
+    def test_cached_plan(self):
+        p1 = _build(lambda x: x + 1).output('d', 'f')
+        p2 = _build(lambda x: x + 2, {'name': 'add'}).output('d', 'f')
+        self.assertEqual(p1.plan.fingerprint, p2.plan.fingerprint)
+        self.assertEqual(p1(3, 1).to_list(), [[1, 1], [1, 5]])
+        self.assertEqual(p2(3, 1).to_list(), [[1, 1], [1, 5], [1, 4]])
+
+        names = [p2.plan.nodes[uid].name for uid in p2.plan.top_sort]
+        self.assertIn('add', names)
+        self.assertEqual(names[0], '_input')
+        self.assertEqual(names[-1], '_output')
+
+        expect = DAGRepr.from_dict(p2.dag_repr.dag_dict)
+        self.assertEqual(p2.dag_repr.to_dict()['edges'], expect.to_dict()['edges'])
+        self.assertEqual(p2.dag_repr.top_sort, expect.top_sort)
+        for uid, node in expect.nodes.items():
+            self.assertEqual(p2.plan.nodes[uid].dict(), node.dict())
+
+    def test_column_index(self):
+        p = pipe.input('a', 'b').map('a', 'c', lambda x: x).output('c', 'a')
+        plan = p.plan
+        out_edge = plan.nodes['_output'].out_edges[0]
+        self.assertEqual(dict(plan.column_index[out_edge]), {'c': 0, 'a': 1})
+        for eid, edge in plan.edges.items():
+            self.assertEqual(list(plan.column_index[eid]), [name for name, _ in edge['data']])
+
+        with self.assertRaises(TypeError):
+            plan.nodes['new'] = None  # pylint: disable=unsupported-assignment-operation
+
+    def test_invalid_dag(self):
+        p = pipe.input('a').map('b', 'c', lambda x: x)
+        with self.assertRaises(ValueError):
+            p.output('c')
+        with self.assertRaises(ValueError):
+            p.output('c')
+
+    def test_save_load(self):
+        p = _build(lambda x: x + 1).output('d', 'f')
+        with tempfile.TemporaryDirectory() as root:
+            file_path = Path(root) / 'plan.json'
+            p.plan.save(file_path)
+            dag = _build(lambda x: x * 2).output('d', 'f').dag_repr.dag_dict
+            plan = ExecutionPlan.load(file_path, dag)
+            self.assertEqual(plan.fingerprint, p.plan.fingerprint)
+            self.assertEqual(plan.top_sort[0], '_input')
+
+            with self.assertRaises(ValueError):
+                ExecutionPlan.load(file_path, pipe.input('a').map('a', 'b', lambda x: x).output('b').dag_repr.dag_dict)
+
+    def test_disk_cache(self):
+        with tempfile.TemporaryDirectory() as root:
+            execution_plan.set_plan_cache_dir(root)
+            p1 = _build(lambda x: x + 1).output('d', 'f')
+            self.assertTrue((Path(root) / (p1.plan.fingerprint + '.json')).is_file())
+
+            execution_plan.clear_plan_cache()
+            p2 = _build(lambda x: x + 1).output('d', 'f')
+            self.assertEqual(p2.plan.fingerprint, p1.plan.fingerprint)
+            self.assertEqual(p2(3, 1).to_list(), [[1, 1], [1, 5]])
+
+    def test_compile_pipeline_op(self):
+        sub = pipe.input('a').map('a', 'b', lambda x: x + 1).output('b')
+        p = pipe.input('a').map('a', 'b', sub).output('b')
+        self.assertEqual(p(1).get(), [2])
+        plan = compile_dag(p.dag_repr.dag_dict)
+        self.assertIsNotNone(plan.fingerprint)
+        self.assertIsNone(p.plan.fingerprint)
+        with self.assertRaises(ValueError):
+            p.plan.to_dict()
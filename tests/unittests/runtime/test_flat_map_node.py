@@ -317,6 +317,35 @@ class TestFlatMapNode(unittest.TestCase):
                                 'res2': i + 10
                             })
 
+    def test_generator_back_pressure(self):
+        produced = []
+
+        def _gen(n):
+            for i in range(n):
+                produced.append(i)
+                yield i
+
+        node_repr = NodeRepr(uid='test_node',
+                             inputs=('num',),
+                             outputs=('res',),
+                             op_info={'type': 'lambda', 'operator': _gen, 'tag': 'main', 'init_args': None, 'init_kws': None},
+                             iter_info={'type': 'flat_map', 'param': None},
+                             config={'name': 'test'},
+                             next_nodes=['_output'])
+        in_que = DataQueue([('num', ColumnType.SCALAR)])
+        in_que.put((1000,))
+        in_que.seal()
+        out_que = DataQueue([('res', ColumnType.QUEUE)], max_size=4)
+        node = create_node(node_repr, self.op_pool, [in_que], [out_que])
+        self.assertTrue(node.initialize())
+        f = self.thread_pool.submit(node.process)
+        time.sleep(0.1)
+        # The generator waits for the consumer instead of running to the end.
+        self.assertLessEqual(len(produced), 5)
+        self.assertEqual([out_que.get()[0] for _ in range(1000)], list(range(1000)))
+        f.result()
+        self.assertEqual(node.status, NodeStatus.FINISHED)
+
     def test_multi_input(self):
         node_info = {
             'inputs': ('num1', 'num2'),
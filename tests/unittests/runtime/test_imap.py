@@ -0,0 +1,89 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+import itertools
+import threading
+import unittest
+
+from towhee import pipe
+
+
+class TestImap(unittest.TestCase):
+    """
+    Test the bounded in-flight `imap` of pipelines.
+    """
+    def setUp(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+
+        def _work(x):
+            with self.lock:
+                self.running += 1
+                self.max_running = max(self.max_running, self.running)
+            time.sleep(0.05 if x == 0 else 0.001)
+            with self.lock:
+                self.running -= 1
+            if x < 0:
+                raise ValueError('negative')
+            return x * 2
+
+        self.pipe = pipe.input('x').map('x', 'y', _work).output('y')
+
+    def test_ordered(self):
+        res = [q.get()[0] for q in self.pipe.imap(range(50), max_inflight=4)]
+        self.assertEqual(res, [x * 2 for x in range(50)])
+        self.assertLessEqual(self.max_running, 4)
+
+    def test_unordered(self):
+        res = [q.get()[0] for q in self.pipe.imap(range(10), max_inflight=4, ordered=False)]
+        self.assertEqual(sorted(res), [x * 2 for x in range(10)])
+        self.assertNotEqual(res[0], 0)
+        self.assertLessEqual(self.max_running, 4)
+
+    def test_lazy(self):
+        gen = self.pipe.imap(itertools.count(1), max_inflight=3)
+        self.assertEqual([next(gen).get()[0] for _ in range(5)], [2, 4, 6, 8, 10])
+        gen.close()
+        self.assertEqual(self.pipe(1).get(), [2])
+
+    def test_error(self):
+        with self.assertRaises(RuntimeError):
+            list(self.pipe.imap([1, 2, -1, 3, 4], max_inflight=2))
+        self.assertEqual(self.pipe(1).get(), [2])
+
+    def test_multi_inputs(self):
+        p = pipe.input('a', 'b').map(('a', 'b'), 'c', lambda a, b: a + b).output('c')
+        self.assertEqual([q.get()[0] for q in p.imap([(1, 2), (3, 4)])], [3, 7])
+
+    def test_limit(self):
+        self.pipe.limit(2)
+        res = [q.get()[0] for q in self.pipe.imap(range(10), max_inflight=8, ordered=False)]
+        self.assertEqual(sorted(res), [x * 2 for x in range(10)])
+        self.assertLessEqual(self.max_running, 2)
+
+    def test_done_callback(self):
+        done = []
+        f = self.pipe.async_call(0)
+        f.add_done_callback(lambda r: done.append(r.done()))
+        self.assertEqual(f.result().get(), [0])
+        self.assertEqual(done, [True])
+        f.add_done_callback(lambda r: done.append(r.done()))
+        self.assertEqual(done, [True, True])
+
+        f = self.pipe.async_call(0)
+        f.add_done_callback(lambda r: done.append(r.cancelled()))
+        f.cancel()
+        self.assertEqual(done, [True, True, True])
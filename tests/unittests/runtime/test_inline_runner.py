@@ -0,0 +1,128 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import unittest
+
+from towhee import pipe
+from towhee.runtime import tracing
+from towhee.runtime.cancellation import cancel_scope, PipelineCancelledError
+from towhee.runtime.data_queue import Empty
+from towhee.runtime.inline_runner import linear_chain
+from towhee.runtime.thread_budget import get_intra_op_threads
+
+
+class TestInlineRunner(unittest.TestCase):
+    """
+    Test the inline calls of the linear pipelines.
+    """
+    def _assert_same(self, p, *inputs):
+        inline = p.inline(True)(*inputs).to_list()
+        graph = p.inline(False)(*inputs).to_list()
+        p.inline(True)
+        self.assertEqual(inline, graph)
+        return inline
+
+    def test_linear_chain(self):
+        p = pipe.input('a').map('a', 'b', lambda x: x + 1).filter('b', 'c', 'b', lambda x: x > 1).output('c')
+        self.assertEqual(len(linear_chain(p.plan)), 4)
+        self.assertTrue(p.runs_inline)
+        self.assertFalse(p.inline(False).runs_inline)
+
+        self.assertFalse(pipe.input('a').flat_map('a', 'b', lambda x: [x]).output('b').runs_inline)
+        self.assertFalse(pipe.input('a').window_all('a', 'b', lambda x: x).output('b').runs_inline)
+        p0 = pipe.input('a')
+        p1 = p0.map('a', 'b', lambda x: x)
+        p2 = p0.map('a', 'c', lambda x: x)
+        self.assertFalse(p1.concat(p2).output('b', 'c').runs_inline)
+
+    def test_outputs(self):
+        p = (pipe.input('a', 'b')
+             .map('a', 'c', lambda x: x + 1)
+             .filter(('a', 'c'), ('d', 'e'), 'c', lambda x: x > 1)
+             .map('b', ('f', 'g'), lambda x: (x, x * 2))
+             .output('d', 'e', 'f', 'g', 'b'))
+        self.assertEqual(self._assert_same(p, 1, 3), [[1, 2, 3, 6, 3]])
+        self.assertEqual(self._assert_same(p, 0, 3), [[Empty(), Empty(), 3, 6, 3]])
+
+        p = pipe.input('a').map('a', 'b', lambda x: (i for i in range(x))).output('b')
+        self.assertEqual(self._assert_same(p, 2), [[[0, 1]]])
+
+        p = pipe.input('a').filter('a', 'b', 'a', lambda x: x > 0).output('b')
+        self.assertEqual(self._assert_same(p, 0), [])
+
+    def test_errors(self):
+        p = pipe.input('a').map('a', 'b', lambda x: 1 / x).output('b')
+        for inline in [True, False]:
+            p.inline(inline)
+            with self.assertRaises(RuntimeError) as e:
+                p(0)
+            self.assertIn('runs failed, error msg: division by zero', str(e.exception))
+        p.inline()
+        self.assertEqual(p(1).get(), [1.0])
+
+        p.on_error('skip')
+        self.assertEqual(self._assert_same(p, 0), [])
+        self.assertEqual(len(p.dead_letters.records), 2)
+
+        p.on_error('default', default=-1)
+        self.assertEqual(self._assert_same(p, 0), [[-1]])
+
+    def test_fallback(self):
+        threads = []
+        p = pipe.input('a').map('a', 'b', lambda x: threading.current_thread()).output('b')
+        self.assertIs(p(1).get()[0], threading.current_thread())
+        self.assertIsNot(p(1, timeout=10).get()[0], threading.current_thread())
+        tracing.set_tracer(tracing.Tracer(tracing.InMemorySpanExporter()))
+        try:
+            threads.append(p(1).get()[0])
+        finally:
+            tracing.set_tracer(None)
+        p.limit(max_concurrency=1)
+        threads.append(p(1).get()[0])
+        self.assertNotIn(threading.current_thread(), threads)
+
+    def test_not_recorded(self):
+        p = pipe.input('a').map('a', 'b', lambda x: threading.current_thread()).output('b')
+        with cancel_scope():
+            self.assertIs(p(1).get()[0], threading.current_thread())
+        exporter = tracing.InMemorySpanExporter()
+        tracing.set_tracer(tracing.Tracer(exporter, sample_rate=0))
+        try:
+            self.assertIs(p(1).get()[0], threading.current_thread())
+        finally:
+            tracing.set_tracer(None)
+        self.assertEqual(exporter.spans, [])
+
+    def test_cancel(self):
+        calls = []
+        with cancel_scope() as token:
+            p = (pipe.input('a')
+                 .map('a', 'b', lambda x: token.cancel() or calls.append('first') or x)
+                 .map('b', 'c', lambda x: calls.append('second') or x)
+                 .output('c'))
+            with self.assertRaises(PipelineCancelledError):
+                p(1)
+        self.assertEqual(calls, ['first'])
+
+    def test_intra_op_threads(self):
+        p = pipe.input('a').map('a', 'b', lambda x: get_intra_op_threads(), config={'intra_op_threads': 2}).output('b')
+        self.assertEqual(p(1).get(), [2])
+        self.assertIsNone(get_intra_op_threads())
+
+    def test_latency_stats(self):
+        p = pipe.input('a').map('a', 'b', lambda x: x).output('b')
+        for _ in range(3):
+            p(1)
+        self.assertEqual(p.latency_stats()['normal']['count'], 3)
@@ -644,3 +644,12 @@ class TestMapNode(unittest.TestCase):
                                 'res1': Empty(),
                                 'res2': Empty()
                             })
+
+    def test_row_layouts(self):
+        in_que = DataQueue([('url', ColumnType.SCALAR), ('num', ColumnType.QUEUE), ('vec', ColumnType.QUEUE)])
+        out_que1 = DataQueue([('vec', ColumnType.QUEUE), ('url', ColumnType.SCALAR), ('other', ColumnType.QUEUE)])
+        out_que2 = DataQueue([('num', ColumnType.QUEUE)])
+        node = create_node(self.node_repr, self.op_pool, [in_que], [out_que1, out_que2])
+        # row + outputs + [Empty()]: url 0, num 1, the old vec 2, the new vec 3, Empty 4.
+        self.assertEqual(node.input_index, [1])
+        self.assertEqual(node.row_layouts, [[3, 0, 4], [1]])
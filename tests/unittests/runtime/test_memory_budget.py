@@ -0,0 +1,147 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from towhee import pipe
+from towhee.runtime.admission import PipelineOverloadedError
+from towhee.runtime.data_queue import DataQueue, ColumnType
+from towhee.runtime.memory_budget import MemoryBudget, PipelineMemoryError, sizeof
+
+
+def _arrays(n):
+    return [np.zeros(1024, dtype=np.uint8)] * n
+
+
+class TestMemoryBudget(unittest.TestCase):
+    """
+    Test the memory budget of the pipelines.
+    """
+    def test_sizeof(self):
+        self.assertEqual(sizeof(np.zeros((4, 4), dtype=np.float64)), 128)
+        self.assertEqual(sizeof('abcd'), 4)
+        self.assertEqual(sizeof(None), 0)
+        self.assertEqual(sizeof({'a': b'xy', 'b': [np.zeros(3, dtype=np.uint8)]}), 7)
+
+    def test_budget(self):
+        with self.assertRaises(ValueError):
+            MemoryBudget(0)
+        with self.assertRaises(ValueError):
+            MemoryBudget(10, policy='drop')
+
+        budget = MemoryBudget(100, timeout=0.05)
+        budget.account('a').charge(100)
+        with self.assertRaises(PipelineMemoryError):
+            budget.admit()
+        self.assertEqual(budget.stats()['rejected'], 1)
+
+        threading.Timer(0.05, budget.account('a').credit, args=(100, )).start()
+        budget = MemoryBudget(100)
+        budget.account('a').charge(100)
+        threading.Timer(0.05, budget.account('a').credit, args=(100, )).start()
+        budget.admit()
+        self.assertEqual(budget.stats()['used_bytes'], 0)
+
+    def test_charge_blocks(self):
+        budget = MemoryBudget(100)
+        account = budget.account('a')
+        account.charge(80)
+        start = time.perf_counter()
+        threading.Timer(0.1, account.credit, args=(80, )).start()
+        account.charge(80)
+        self.assertTrue(time.perf_counter() - start >= 0.09)
+        self.assertEqual(budget.stats()['peak_bytes'], 80)
+
+    def test_data_queue(self):
+        budget = MemoryBudget()
+        que = DataQueue([('a', ColumnType.QUEUE), ('b', ColumnType.SCALAR)], memory=budget.account('a'))
+        que.put((np.zeros(10, dtype=np.uint8), 'abc'))
+        que.put((np.zeros(20, dtype=np.uint8), 'abc'))
+        self.assertEqual(que.nbytes, 33)
+        que.get()
+        self.assertEqual(que.nbytes, 23)
+        self.assertEqual(que.peak_nbytes, 33)
+        self.assertEqual(budget.stats()['nodes'], {'a': 23})
+        que.clear_and_seal()
+        self.assertEqual(que.nbytes, 0)
+        self.assertEqual(budget.stats()['used_bytes'], 0)
+
+    def test_queue_wakes_put(self):
+        budget = MemoryBudget(100)
+        for read in [True, False]:
+            que = DataQueue([('a', ColumnType.QUEUE)], memory=budget.account('a'))
+            que.put((np.zeros(80, dtype=np.uint8),))
+            ret = []
+            t = threading.Thread(target=lambda q, r: r.append(q.put((np.zeros(80, dtype=np.uint8),))), args=(que, ret))
+            t.start()
+            time.sleep(0.05)
+            self.assertEqual(budget.stats()['blocked'], 1)
+            # The put waiting for the budget goes on once the row is read, or the queue is sealed.
+            if read:
+                que.get()
+            else:
+                que.seal()
+            t.join(1)
+            self.assertFalse(t.is_alive())
+            self.assertEqual(ret, [read])
+            que.release_memory()
+        self.assertEqual(budget.stats()['used_bytes'], 0)
+
+    def test_pipeline(self):
+        p = (pipe.input('n')
+             .flat_map('n', 'x', _arrays)
+             .map('x', 'y', lambda x: x.sum())
+             .output('y')
+             .memory_limit(8 * 1024))
+        self.assertEqual([len(ret.to_list()) for ret in p.batch([200, 300])], [200, 300])
+        stats = p.memory_stats()
+        self.assertEqual(stats['used_bytes'], 0)
+        # An empty queue always takes a row, a row of every call may be over the budget.
+        self.assertTrue(0 < stats['peak_bytes'] <= 11 * 1024)
+
+    def test_reject(self):
+        event = threading.Event()
+        p = (pipe.input('n')
+             .flat_map('n', 'x', _arrays)
+             .map('x', 'y', lambda x: event.wait() and x.sum())
+             .output('y')
+             .memory_limit(2048, policy='reject'))
+        t = threading.Thread(target=p, args=(10, ))
+        t.start()
+        while p.memory_stats()['blocked'] == 0:
+            time.sleep(0.01)
+        with self.assertRaises(PipelineOverloadedError):
+            p(1)
+        event.set()
+        t.join()
+        self.assertEqual(p(2).to_list(), [[0], [0]])
+        self.assertEqual(p.memory_stats()['rejected'], 1)
+
+    def test_profiler(self):
+        p = pipe.input('n').flat_map('n', 'x', _arrays, config={'name': 'gen'}).map('x', 'y', lambda x: x.sum()).output('y')
+        report = p.debug(4, profiler=True).profiler.node_report
+        uid = [uid for uid, node in p.plan.nodes.items() if node.name == 'gen'][0]
+        self.assertEqual(report[uid]['peak_bytes'], 4 * 1024)
+        self.assertIsNone(p.memory_stats())
+
+        # The plain calls do not count the bytes.
+        with mock.patch('towhee.runtime.runtime_pipeline.MemoryBudget') as budget:
+            self.assertEqual(len(p.batch([2, 3])), 2)
+            p(2)
+            budget.assert_not_called()
@@ -0,0 +1,69 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import unittest
+import multiprocessing
+
+from towhee import pipe, ops
+from towhee.operator import PyOperator
+from towhee.runtime.operator_manager import OperatorRegistry
+from towhee.runtime.multiprocess_pipeline import MultiProcessPipeline
+
+register = OperatorRegistry.register
+
+
+# pylint: disable=unused-variable
+@register(name='test_multiprocess/worker_pid')
+class WorkerPid(PyOperator):
+    def __init__(self):
+        self._pid = os.getpid()
+
+    def __call__(self, x):
+        return x, self._pid, os.getpid()
+
+
+@unittest.skipIf('fork' not in multiprocessing.get_all_start_methods(), 'requires fork')
+class TestMultiProcessPipeline(unittest.TestCase):
+    """
+    Test running pipelines in worker processes.
+    """
+    def test_call(self):
+        p = (pipe.input('a', 'b')
+             .map(('a', 'b'), 'c', lambda a, b: a + b)
+             .flat_map('c', 'd', lambda c: range(c))
+             .output('c', 'd'))
+        with MultiProcessPipeline(p, num_workers=2) as mp:
+            self.assertEqual(mp.num_workers, 2)
+            self.assertEqual(mp(1, 2).to_list(), p(1, 2).to_list())
+            res = mp.batch([(1, 1), (2, 1), (0, 1)])
+            self.assertEqual([q.to_list() for q in res], [[[2, 0], [2, 1]], [[3, 0], [3, 1], [3, 2]], [[1, 0]]])
+
+    def test_workers(self):
+        p = pipe.input('x').map('x', ('y', 'init_pid', 'pid'), ops.test_multiprocess.worker_pid()).output('y', 'init_pid', 'pid')
+        with p.multiprocess(num_workers=2, chunk_size=4) as mp:
+            res = [q.get() for q in mp.batch(range(40))]
+        self.assertEqual([r[0] for r in res], list(range(40)))
+        pids = set(r[2] for r in res)
+        self.assertNotIn(os.getpid(), pids)
+        self.assertLessEqual(len(pids), 2)
+        for _, init_pid, pid in res:
+            self.assertEqual(init_pid, pid)
+
+    def test_error(self):
+        p = pipe.input('x').map('x', 'y', lambda x: 1 / x).output('y')
+        with p.multiprocess(num_workers=1) as mp:
+            with self.assertRaises(RuntimeError):
+                mp.batch([1, 0])
+            self.assertEqual(mp(2).get(), [0.5])
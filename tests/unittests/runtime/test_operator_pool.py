@@ -12,9 +12,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import threading
+import time
 import unittest
 
+import towhee
+from towhee import ops
 from towhee.operator import Operator
+from towhee.runtime.node_config import NodeConfig
 from towhee.runtime.operator_manager import OperatorPool
 
 
@@ -102,3 +107,65 @@ class TestOperatorPool(unittest.TestCase):
 
         self._op_pool.release_op(op1)
         self.assertEqual(len(self._op_pool), 0)
+
+    def test_max_instances(self):
+        hub_op_id = 'local/generator_operator'
+        op1 = self._op_pool.acquire_op(self._key, hub_op_id, None, None, 'main', False, max_instances=2)
+        op2 = self._op_pool.acquire_op(self._key, hub_op_id, None, None, 'main', False, max_instances=2)
+        with self.assertRaises(TimeoutError):
+            self._op_pool.acquire_op(self._key, hub_op_id, None, None, 'main', False, max_instances=2, timeout=0.05)
+
+        threading.Timer(0.05, self._op_pool.release_op, args=(op1, )).start()
+        op3 = self._op_pool.acquire_op(self._key, hub_op_id, None, None, 'main', False, max_instances=2)
+        self.assertIs(op3, op1)
+        self._op_pool.release_op(op2)
+        self._op_pool.release_op(op3)
+        self.assertEqual(self._op_pool.stats()[self._key], {
+            'instances': 2, 'idle': 2, 'hits': 1, 'misses': 2, 'waits': 2, 'timeouts': 1, 'evictions': 0
+        })
+
+    def test_min_instances(self):
+        hub_op_id = 'local/generator_operator'
+        op = self._op_pool.acquire_op(self._key, hub_op_id, None, None, 'main', False, min_instances=3, idle_timeout=0.05)
+        self.assertEqual(self._op_pool.stats()[self._key]['instances'], 3)
+        self.assertEqual(len(self._op_pool), 2)
+        self._op_pool.release_op(op)
+
+        time.sleep(0.1)
+        self._op_pool.evict_idle()
+        self.assertEqual(self._op_pool.stats()[self._key]['instances'], 3)
+
+        ops_ = [self._op_pool.acquire_op(self._key, hub_op_id, None, None, 'main', False) for _ in range(5)]
+        for op in ops_:
+            self._op_pool.release_op(op)
+        time.sleep(0.1)
+        self._op_pool.evict_idle()
+        self.assertEqual(self._op_pool.stats()[self._key]['instances'], 3)
+        self.assertEqual(self._op_pool.stats()[self._key]['evictions'], 2)
+
+        with self.assertRaises(ValueError):
+            self._op_pool.acquire_op('other', hub_op_id, None, None, 'main', False, max_instances=1, min_instances=2)
+
+    def test_pipeline(self):
+        p = (towhee.pipe.input('a')
+             .flat_map('a', 'b', ops.local.generator_operator(), config={'name': 'gen', 'max_instances': 1})
+             .output('b'))
+        rets = []
+        threads = [threading.Thread(target=lambda: rets.append([r[0].sum for r in p(3).to_list()])) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(rets, [[0, 1, 2]] * 4)
+        self.assertEqual(p.operator_stats()['gen']['instances'], 1)
+
+        with self.assertRaises(ValueError):
+            towhee.pipe.input('a').map('a', 'b', lambda x: x, config={'max_instances': 1, 'min_instances': 2}).output('b')
+
+    def test_timeout_config(self):
+        conf = NodeConfig(name='op', acquire_timeout=0.5, idle_timeout=0.5)
+        self.assertEqual((conf.acquire_timeout, conf.idle_timeout), (0.5, 0.5))
+        for key in ['acquire_timeout', 'idle_timeout']:
+            for value in [0, -1]:
+                with self.assertRaises(ValueError):
+                    NodeConfig(name='op', **{key: value})
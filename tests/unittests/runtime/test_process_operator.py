@@ -0,0 +1,140 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import time
+import unittest
+import multiprocessing
+
+import numpy as np
+
+from towhee import pipe, ops
+from towhee.operator import PyOperator
+from towhee.runtime.operator_manager import OperatorRegistry
+from towhee.runtime.operator_manager.process_operator import ProcessOperator
+
+register = OperatorRegistry.register
+
+
+# pylint: disable=unused-variable
+@register(name='test_process_operator/pid')
+class Pid(PyOperator):
+    def __init__(self):
+        self._pid = os.getpid()
+
+    def __call__(self, x):
+        return x, self._pid, os.getpid()
+
+
+@unittest.skipIf('fork' not in multiprocessing.get_all_start_methods(), 'requires fork')
+class TestProcessOperator(unittest.TestCase):
+    """
+    Test running the operator of a node in processes.
+    """
+    def test_hub_op(self):
+        p = (pipe.input('x')
+             .map('x', ('y', 'init_pid', 'pid'), ops.test_process_operator.pid(), config={'num_processes': 2})
+             .map('x', 'thread_pid', lambda x: os.getpid())
+             .output('y', 'init_pid', 'pid', 'thread_pid'))
+        res = [q.get() for q in p.batch(range(20))]
+        self.assertEqual([r[0] for r in res], list(range(20)))
+        for _, init_pid, pid, thread_pid in res:
+            self.assertEqual(init_pid, pid)
+            self.assertNotEqual(pid, os.getpid())
+            self.assertEqual(thread_pid, os.getpid())
+        self.assertLessEqual(len(set(r[2] for r in res)), 2)
+
+    def test_lambda(self):
+        p = (pipe.input('x')
+             .map('x', 'y', lambda x: x * 2, config={'num_processes': 1})
+             .flat_map('x', 'z', lambda x: (i for i in range(x)), config={'num_processes': 1})
+             .output('y', 'z'))
+        self.assertEqual(p(3).to_list(), [[6, 0], [6, 1], [6, 2]])
+
+        arr = np.arange(12).reshape(3, 4)
+        p = pipe.input('x').map('x', 'y', lambda x: x + 1, config={'num_processes': 1}).output('y')
+        self.assertTrue(np.array_equal(p(arr).get()[0], arr + 1))
+
+    def test_error(self):
+        p = pipe.input('x').map('x', 'y', lambda x: 1 / x, config={'num_processes': 1}).output('y')
+        with self.assertRaises(RuntimeError):
+            p(0)
+        self.assertEqual(p(2).get(), [0.5])
+
+        p = (pipe.input('x')
+             .map('x', 'y', lambda x: 1 / x, config={'num_processes': 1, 'error_policy': 'default', 'error_default': -1})
+             .output('y'))
+        self.assertEqual(p(0).get(), [-1])
+
+    def test_stream_generator(self):
+        produced = multiprocessing.get_context('fork').Value('i', 0)
+
+        def _gen(n):
+            for i in range(n):
+                with produced.get_lock():
+                    produced.value += 1
+                yield i
+
+        op = ProcessOperator(lambda: _gen, 1)
+        try:
+            gen = op(1000)
+            self.assertEqual(next(gen), 0)
+            time.sleep(0.2)
+            # The worker runs a few items ahead of the caller instead of draining the generator.
+            self.assertLess(produced.value, 20)
+            gen.close()
+            self.assertEqual(list(op(5)), list(range(5)))
+            self.assertEqual(list(op(0)), [])
+        finally:
+            op.close()
+
+    def test_close_stream(self):
+        def _gen(n):
+            for i in range(n):
+                yield np.full(100 << 10, i, dtype=np.uint8)
+
+        op = ProcessOperator(lambda: _gen, 1, shared_memory=True)
+        try:
+            for _ in range(5):
+                gen = op(100)
+                self.assertEqual(int(next(gen)[0]), 0)
+                gen.close()
+            # The items sent ahead of the caller are released.
+            self.assertEqual(op._arena.stats()['used_blocks'], 0)  # pylint: disable=protected-access
+            self.assertEqual([int(x[0]) for x in op(3)], [0, 1, 2])
+        finally:
+            op.close()
+
+    def test_interleave_stream(self):
+        def _op(n):
+            if n < 0:
+                return -n
+            return (i for i in range(n))
+
+        op = ProcessOperator(lambda: _op, 1)
+        try:
+            gen = op(100)
+            self.assertEqual(next(gen), 0)
+            # The single worker runs the other calls while the stream is not fully consumed.
+            for i in range(1, 4):
+                self.assertEqual(op(-i), i)
+                self.assertEqual(next(gen), i)
+            self.assertEqual(list(op(3)), [0, 1, 2])
+            self.assertEqual(sum(gen), sum(range(4, 100)))
+        finally:
+            op.close()
+
+    def test_invalid_config(self):
+        with self.assertRaises(ValueError):
+            pipe.input('x').map('x', 'y', lambda x: x, config={'num_processes': 0}).output('y')
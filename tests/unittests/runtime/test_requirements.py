@@ -0,0 +1,78 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from towhee.hub import cache_manager
+from towhee.runtime.operator_manager import requirements
+from towhee.runtime.operator_manager.requirements import RequirementsCache, missing_requirements
+
+
+class TestRequirements(unittest.TestCase):
+    """
+    Test the cached requirements of the operators.
+    """
+    def test_missing_requirements(self):
+        reqs = ['NumPy', 'py_yaml_not_exist', 'numpy<1.0', 'numpy>=1.0  # comment', 'numpy; python_version < "3"',
+                '', 'not-exist-package==1.0']
+        # The installed packages are not upgraded or downgraded unless asked.
+        self.assertEqual(missing_requirements(reqs), ['py_yaml_not_exist', 'not-exist-package==1.0'])
+        self.assertEqual(missing_requirements(reqs, check_versions=True), ['py_yaml_not_exist', 'numpy<1.0', 'not-exist-package==1.0'])
+
+    def test_cache(self):
+        with tempfile.TemporaryDirectory() as root, mock.patch('subprocess.check_call') as check_call:
+            req_file = Path(root) / 'requirements.txt'
+            req_file.write_text('numpy\nnot-exist-package\n', encoding='utf-8')
+            cache = RequirementsCache(Path(root) / 'cache.json')
+            self.assertEqual(cache.ensure(req_file), ['not-exist-package'])
+            self.assertEqual(check_call.call_count, 1)
+            self.assertIn('not-exist-package', check_call.call_args[0][0])
+
+            # Satisfied in this process and by the cache file.
+            self.assertEqual(cache.ensure(req_file), [])
+            self.assertEqual(RequirementsCache(Path(root) / 'cache.json').ensure(req_file), [])
+            self.assertEqual(check_call.call_count, 1)
+
+            # A changed file is checked again.
+            req_file.write_text('numpy\nnot-exist-package-2\n', encoding='utf-8')
+            self.assertEqual(cache.ensure(req_file), ['not-exist-package-2'])
+
+            # So are all the files in a changed environment.
+            with open(Path(root) / 'cache.json', encoding='utf-8') as f:
+                self.assertEqual(len(json.load(f)['satisfied']), 2)
+            with mock.patch.object(requirements, 'environment_key', return_value='other'):
+                self.assertEqual(RequirementsCache(Path(root) / 'cache.json').ensure(req_file), ['not-exist-package-2'])
+
+            req_file.write_text('--extra-index-url https://example.com\nnumpy\n', encoding='utf-8')
+            self.assertEqual(cache.ensure(req_file), ['-r', str(req_file)])
+
+            req_file.write_text('numpy<1.0\n', encoding='utf-8')
+            self.assertEqual(cache.ensure(req_file), [])
+            cache.check_versions = True
+            self.assertEqual(cache.ensure(req_file), ['numpy<1.0'])
+
+            cache.reset()
+            self.assertTrue((Path(root) / 'cache.json').exists())
+            self.assertEqual(cache.ensure(req_file), [])
+
+            cache.clear()
+            self.assertFalse((Path(root) / 'cache.json').exists())
+
+    def test_default_file(self):
+        with tempfile.TemporaryDirectory() as root, mock.patch.object(cache_manager, '_HUB_ROOT', root):
+            self.assertEqual(RequirementsCache().file_path, Path(root) / 'operators' / 'requirements_cache.json')
@@ -0,0 +1,133 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from towhee import pipe
+from towhee.runtime.node_repr import NodeRepr
+from towhee.runtime.nodes import create_node, NodeStatus
+from towhee.runtime.data_queue import DataQueue, ColumnType
+from towhee.runtime.operator_manager import OperatorPool
+from towhee.runtime.execution_plan import dag_fingerprint
+
+
+class TestRouteNode(unittest.TestCase):
+    """
+    Route node test.
+    """
+    def _node_repr(self, fn, branches):
+        return NodeRepr(uid=uuid.uuid4().hex,
+                        inputs=('num',),
+                        outputs=(),
+                        op_info={'type': 'lambda', 'operator': fn, 'tag': 'main', 'init_args': None, 'init_kws': None},
+                        iter_info={'type': 'route', 'param': {'branches': branches}},
+                        config={'name': 'route'},
+                        next_nodes=['even', 'odd', 'other'])
+
+    def test_normal(self):
+        calls = []
+
+        def _select(x):
+            calls.append(x)
+            return x % 3
+
+        node_repr = self._node_repr(_select, {'even': (0,), 'odd': (1,)})
+        in_que = DataQueue([('url', ColumnType.SCALAR), ('num', ColumnType.QUEUE)])
+        for i in range(9):
+            in_que.put(('test_url', i))
+        in_que.seal()
+        out_ques = [DataQueue([('url', ColumnType.SCALAR), ('num', ColumnType.QUEUE)]) for _ in range(3)]
+        node = create_node(node_repr, OperatorPool(), [in_que], out_ques)
+        self.assertTrue(node.initialize())
+        with ThreadPoolExecutor() as pool:
+            pool.submit(node.process).result()
+
+        self.assertEqual(node.status, NodeStatus.FINISHED)
+        self.assertEqual(calls, list(range(9)))
+        self.assertTrue(all(que.sealed for que in out_ques))
+        self.assertEqual([row[1] for row in out_ques[0].to_list()], [0, 3, 6])
+        self.assertEqual([row[1] for row in out_ques[1].to_list()], [1, 4, 7])
+        # The rows of no branch go to the default branch.
+        self.assertEqual([row[1] for row in out_ques[2].to_list()], [2, 5, 8])
+
+    def test_failed(self):
+        node_repr = self._node_repr(lambda x: 1 / x, {})
+        in_que = DataQueue([('num', ColumnType.QUEUE)])
+        in_que.put((0,))
+        in_que.seal()
+        out_ques = [DataQueue([('num', ColumnType.QUEUE)]) for _ in range(3)]
+        node = create_node(node_repr, OperatorPool(), [in_que], out_ques)
+        self.assertTrue(node.initialize())
+        node.process()
+        self.assertEqual(node.status, NodeStatus.FAILED)
+        self.assertIn('division by zero', node.err_msg)
+
+
+class TestRoutePipeline(unittest.TestCase):
+    """
+    Route pipeline test.
+    """
+    def test_branches(self):
+        r = pipe.input('type', 'x').route('type', lambda t: t)
+        image = r.branch('image', 'video').map('x', 'image', lambda x: x + 1)
+        text = r.branch('text').map('x', 'text', lambda x: x * 10)
+        other = r.map('x', 'other', lambda x: -x)
+        p = image.concat(text, other).output('image', 'text', 'other')
+
+        self.assertEqual(p('video', 1).to_list(kv_format=True)[0]['image'], 2)
+        res = p('text', 2).to_list(kv_format=True)[0]
+        self.assertEqual(res['text'], 20)
+        self.assertEqual(p('audio', 3).to_list(kv_format=True)[0]['other'], -3)
+
+    def test_drop(self):
+        p = pipe.input('x').route('x', lambda x: x % 2).branch(0).map('x', 'y', lambda x: x * 2).output('y')
+        self.assertEqual(p(1).size, 0)
+        self.assertEqual(p(2).get(), [4])
+
+        p = pipe.input('x').flat_map('x', 'x', lambda x: x).route('x', lambda x: x % 2).branch(1).output('x')
+        self.assertEqual(p([1, 2, 3, 4, 5]).to_list(), [[1], [3], [5]])
+
+    def test_unhashable_key(self):
+        r = pipe.input('x').route('x', lambda x: x)
+        p = r.branch(1).map('x', 'y', lambda x: x).concat(r.map('x', 'z', len)).output('y', 'z')
+        self.assertEqual(p([1, 2]).to_list(kv_format=True)[0]['z'], 2)
+        self.assertEqual(p({'a': 1}).to_list(kv_format=True)[0]['z'], 1)
+
+    def test_sub_pipeline(self):
+        sub = pipe.input('x').route('x', lambda x: x > 0).branch(True).output('x')
+        p = pipe.input('x').map('x', 'y', sub).output('y')
+        self.assertEqual(p(1).get(), [1])
+        self.assertIsNone(p(-1).get())
+
+    def test_invalid_branch(self):
+        with self.assertRaises(ValueError):
+            pipe.input('x').map('x', 'y', lambda x: x).branch(1)
+        with self.assertRaises(ValueError):
+            pipe.input('x').route('x', lambda x: x).branch()
+
+    def test_fingerprint(self):
+        def _build():
+            r = pipe.input('x').route('x', lambda x: x % 2)
+            return r.branch(0).map('x', 'y', lambda x: x).concat(r.branch(1).map('x', 'z', lambda x: x)).dag
+
+        self.assertEqual(dag_fingerprint(_build()), dag_fingerprint(_build()))
+        r = pipe.input('x').route('x', lambda x: x % 2)
+        swapped = r.branch(1).map('x', 'y', lambda x: x).concat(r.branch(0).map('x', 'z', lambda x: x)).dag
+        self.assertNotEqual(dag_fingerprint(_build()), dag_fingerprint(swapped))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sys
+import time
+import threading
+import unittest
+
+from towhee import pipe
+from towhee.runtime.scheduler import Priority, PriorityThreadPoolExecutor, LatencyStats
+
+
+class TestScheduler(unittest.TestCase):
+    """
+    Test the priority and deadline ordering of the runtime thread pool.
+    """
+    def test_priority_value(self):
+        self.assertEqual(Priority.value('HIGH'), Priority.HIGH)
+        self.assertEqual(Priority.value(None), Priority.NORMAL)
+        self.assertEqual(Priority.name(Priority.LOW), 'low')
+        with self.assertRaises(ValueError):
+            Priority.value('urgent')
+        with self.assertRaises(ValueError):
+            Priority.value(5)
+
+    def test_order(self):
+        pool = PriorityThreadPoolExecutor(max_workers=1)
+        gate = threading.Event()
+        order = []
+        pool.submit_with_priority(gate.wait)
+        now = time.monotonic()
+        tasks = [
+            ('low', Priority.LOW, None),
+            ('normal', Priority.NORMAL, None),
+            ('normal_late', Priority.NORMAL, now + 10),
+            ('normal_early', Priority.NORMAL, now + 1),
+            ('high', Priority.HIGH, None),
+            ('plain', None, None),
+        ]
+        fs = []
+        for name, priority, deadline in tasks:
+            if priority is None:
+                fs.append(pool.submit(order.append, name))
+            else:
+                fs.append(pool.submit_with_priority(lambda name=name: order.append(name), priority, deadline))
+        self.assertEqual(pool.queued, 6)
+        gate.set()
+        for f in fs:
+            f.result(5)
+        self.assertEqual(order, ['high', 'normal_early', 'normal_late', 'normal', 'plain', 'low'])
+        pool.shutdown()
+
+    def test_shutdown(self):
+        pool = PriorityThreadPoolExecutor(max_workers=2)
+        fs = [pool.submit_with_priority(lambda i=i: i, Priority.LOW) for i in range(10)]
+        pool.shutdown(wait=True)
+        self.assertEqual([f.result() for f in fs], list(range(10)))
+
+    def test_shutdown_queued(self):
+        # `cancel_futures` is new in Python 3.9.
+        for cancel_futures in [False, True] if sys.version_info >= (3, 9) else [False]:
+            pool = PriorityThreadPoolExecutor(max_workers=1)
+            gate = threading.Event()
+            order = []
+            pool.submit_with_priority(gate.wait)
+            fs = [pool.submit_with_priority(lambda i=i, order=order: order.append(i), priority)
+                  for i, priority in enumerate([Priority.LOW, Priority.HIGH, Priority.NORMAL])]
+            self.assertEqual(pool.queued, 3)
+            if cancel_futures:
+                pool.shutdown(wait=False, cancel_futures=True)
+            t = threading.Thread(target=pool.shutdown, kwargs={'wait': True})
+            t.start()
+            time.sleep(0.05)
+            gate.set()
+            t.join(5)
+            self.assertFalse(t.is_alive())
+            if cancel_futures:
+                self.assertTrue(all(f.cancelled() for f in fs))
+                self.assertEqual(order, [])
+            else:
+                # The queued tasks run by priority before the workers exit.
+                self.assertEqual(order, [1, 2, 0])
+
+    def test_latency_stats(self):
+        stats = LatencyStats(window=10)
+        for i in range(20):
+            stats.record(Priority.LOW, i / 1000)
+        stats.record(Priority.HIGH, 0.001)
+        summary = stats.summary()
+        self.assertEqual(list(summary), ['high', 'low'])
+        self.assertEqual(summary['low']['count'], 20)
+        self.assertTrue(10 <= summary['low']['p50_ms'] <= summary['low']['p99_ms'] <= 19)
+        stats.reset()
+        self.assertEqual(stats.summary(), {})
+
+    def test_pipeline(self):
+        p = pipe.input('a').map('a', 'b', lambda x: x + 1).output('b')
+        self.assertEqual(p(1, priority='high').get(), [2])
+        self.assertEqual(p(1, priority='low', timeout=5).get(), [2])
+        self.assertEqual([r.get() for r in p.batch([1, 2], priority=Priority.LOW)], [[2], [3]])
+        self.assertEqual(p.async_call(1, priority='high', deadline=time.monotonic() + 1).result().get(), [2])
+        self.assertEqual(p(1).get(), [2])
+        stats = p.latency_stats()
+        self.assertEqual(stats['high']['count'], 2)
+        self.assertEqual(stats['low']['count'], 3)
+        self.assertEqual(stats['normal']['count'], 1)
+        with self.assertRaises(ValueError):
+            p(1, priority='urgent')
@@ -0,0 +1,131 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import unittest
+import multiprocessing
+
+import numpy as np
+
+from towhee import pipe
+from towhee.types import Image, VideoFrame, AudioFrame
+from towhee.runtime.shm_transport import SharedArena, dumps, loads, discard
+
+
+class Array(np.ndarray):
+    pass
+
+
+@unittest.skipIf('fork' not in multiprocessing.get_all_start_methods(), 'requires fork')
+class TestShmTransport(unittest.TestCase):
+    """
+    Test sending arrays through shared memory.
+    """
+    def setUp(self):
+        self.arena = SharedArena(slab_size=1 << 20, min_block=64 << 10)
+
+    def tearDown(self):
+        self.arena.close()
+
+    def test_types(self):
+        data = {
+            'img': Image(np.random.randint(0, 256, (256, 256, 3), dtype=np.uint8), 'BGR'),
+            'frame': VideoFrame(np.zeros((256, 256, 3), dtype=np.uint8), 'RGB', 40, 1),
+            'audio': AudioFrame(np.ones((2, 16000), dtype=np.float32), 16000, 20, 'stereo'),
+            'arr': np.arange(20000, dtype=np.int64)[::2],
+            'small': np.arange(10),
+            'text': 'towhee',
+        }
+        payload = dumps(data, self.arena)
+        self.assertLess(len(payload), 4096)
+        self.assertEqual(self.arena.stats()['used_blocks'], 4)
+
+        out = loads(payload)
+        self.assertEqual(out['text'], 'towhee')
+        for key in ['img', 'frame', 'audio', 'arr', 'small']:
+            self.assertIs(type(out[key]), type(data[key]))
+            self.assertTrue(np.array_equal(out[key], data[key]))
+        self.assertEqual(out['img'].mode, 'BGR')
+        self.assertEqual((out['frame'].mode, out['frame'].timestamp, out['frame'].key_frame), ('RGB', 40, 1))
+        self.assertEqual((out['audio'].sample_rate, out['audio'].timestamp, out['audio'].layout), (16000, 20, 'stereo'))
+
+        del out
+        self.assertEqual(self.arena.stats()['used_blocks'], 0)
+
+    def test_reuse_block(self):
+        arr = np.ones((256, 256), dtype=np.float32)
+        for _ in range(10):
+            out = loads(dumps(arr, self.arena))
+            self.assertTrue(np.array_equal(out, arr))
+            del out
+        self.assertEqual(self.arena.stats()['slabs'], 1)
+
+        # Send a view of an array on a shared block again without copying.
+        out = loads(dumps(arr, self.arena))
+        view = loads(dumps(out[128:], self.arena))
+        self.assertEqual(self.arena.stats()['used_blocks'], 1)
+        self.assertEqual(view.__array_interface__['data'][0], out[128:].__array_interface__['data'][0])
+        del out
+        self.assertTrue(np.array_equal(view, arr[128:]))
+        self.assertEqual(self.arena.stats()['used_blocks'], 1)
+        del view
+        self.assertEqual(self.arena.stats()['used_blocks'], 0)
+
+    def test_large_block(self):
+        arr = np.ones((1024, 1024, 2), dtype=np.uint8)
+        out = loads(dumps(arr, self.arena))
+        self.assertTrue(np.array_equal(out, arr))
+        self.assertEqual(self.arena.block_size(0), 2 << 20)
+
+    def test_processes(self):
+        frame = VideoFrame(np.random.randint(0, 256, (240, 320, 3), dtype=np.uint8), 'RGB', 0, 0)
+        p = (pipe.input('x')
+             .map('x', ('y', 'pid'), lambda x: (x, os.getpid()), config={'num_processes': 2, 'shared_memory': True})
+             .output('y', 'pid'))
+        res = [q.get() for q in p.batch([frame] * 8)]
+        p.release_process_ops()
+        for y, pid in res:
+            self.assertNotEqual(pid, os.getpid())
+            self.assertEqual(y.mode, 'RGB')
+            self.assertTrue(np.array_equal(y, frame))
+
+        with pipe.input('x').map('x', 'y', lambda x: x + 1).output('y').multiprocess(1, shared_memory=True) as mp:
+            self.assertTrue(np.array_equal(mp(frame).get()[0], frame + 1))
+
+    def test_subclass(self):
+        arr = np.arange(20000, dtype=np.int64).view(Array)
+        arr.tag = 'towhee'
+        masked = np.ma.masked_array(np.arange(20000), mask=np.arange(20000) % 2)
+        out = loads(dumps([arr, masked], self.arena))
+        self.assertIs(type(out[0]), Array)
+        self.assertEqual(out[0].tag, 'towhee')
+        self.assertTrue(np.array_equal(out[0], arr))
+        self.assertIs(type(out[1]), np.ma.MaskedArray)
+        self.assertTrue(np.array_equal(out[1].mask, masked.mask))
+
+    def test_discard(self):
+        discard(dumps([np.ones(1 << 17), np.ones(1 << 17)], self.arena))
+        self.assertEqual(self.arena.stats()['used_blocks'], 0)
+
+        p = pipe.input('x').map('x', 'y', lambda x: x + 1 if x[0] else 1 / 0).output('y')
+        with p.multiprocess(1, chunk_size=1, shared_memory=True) as mp:
+            with self.assertRaises(RuntimeError):
+                mp.batch([np.zeros(1 << 17), np.ones(1 << 17)])
+            self.assertEqual(mp._arena.stats()['used_blocks'], 0)  # pylint: disable=protected-access
+
+    def test_close(self):
+        arena = SharedArena(slab_size=1 << 20)
+        arena.allocate(100)
+        arena.close()
+        self.assertFalse(any(name.startswith(arena.name) for name in os.listdir('/dev/shm')))
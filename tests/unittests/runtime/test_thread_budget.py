@@ -0,0 +1,102 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sys
+import types
+import threading
+import unittest
+
+from towhee import pipe, ops, AutoConfig
+from towhee.operator import PyOperator
+from towhee.runtime.operator_manager import OperatorRegistry
+from towhee.runtime.thread_budget import get_intra_op_threads, intra_op_threads, split_thread_budget, process_thread_limit
+
+register = OperatorRegistry.register
+
+
+# pylint: disable=unused-variable
+@register(name='test_thread_budget/threads')
+class Threads(PyOperator):
+    def __init__(self):
+        self._init_threads = get_intra_op_threads()
+
+    def __call__(self, x):
+        return self._init_threads, get_intra_op_threads()
+
+
+class TestThreadBudget(unittest.TestCase):
+    """
+    Test the intra-op thread budget.
+    """
+    def test_split(self):
+        self.assertEqual(split_thread_budget(['a', 'b'], {}, 8), {'a': 4, 'b': 4})
+        self.assertEqual(split_thread_budget(['a', 'b', 'c'], {'a': 6}, 8, 4), {'a': 6, 'b': 1, 'c': 1})
+        self.assertEqual(split_thread_budget(['a'], {'a': 2}, 8), {'a': 2})
+
+    def test_context(self):
+        self.assertIsNone(get_intra_op_threads())
+        with intra_op_threads(3):
+            self.assertEqual(get_intra_op_threads(), 3)
+            with intra_op_threads(None):
+                self.assertEqual(get_intra_op_threads(), 3)
+        self.assertIsNone(get_intra_op_threads())
+
+    def test_process_limits(self):
+        threads = [8]
+        torch = types.SimpleNamespace(get_num_threads=lambda: threads[0], set_num_threads=lambda n: threads.__setitem__(0, n))
+        sys.modules['torch'] = torch
+        try:
+            entered, leave = threading.Barrier(3), threading.Event()
+
+            def _node(n):
+                with intra_op_threads(n):
+                    entered.wait()
+                    leave.wait()
+
+            nodes = [threading.Thread(target=_node, args=(n, )) for n in [2, 4]]
+            for t in nodes:
+                t.start()
+            entered.wait()
+            # The concurrent nodes share the largest limit, whatever order they started in.
+            self.assertEqual((process_thread_limit(), threads[0]), (4, 4))
+            leave.set()
+            for t in nodes:
+                t.join()
+            self.assertEqual((process_thread_limit(), threads[0]), (None, 8))
+        finally:
+            del sys.modules['torch']
+
+    def test_node_config(self):
+        p = (pipe.input('x')
+             .map('x', 'y', ops.test_thread_budget.threads(), config=AutoConfig.LocalCPUConfig(intra_op_threads=2))
+             .map('x', 'z', lambda x: get_intra_op_threads())
+             .output('y', 'z'))
+        self.assertEqual(p(1).get(), [(2, 2), None])
+
+        with self.assertRaises(ValueError):
+            pipe.input('x').map('x', 'y', lambda x: x, config={'intra_op_threads': 0}).output('y')
+
+    def test_pipeline_budget(self):
+        p = (pipe.input('x')
+             .map('x', 'y', ops.test_thread_budget.threads())
+             .map('x', 'z', lambda x: get_intra_op_threads(), config={'intra_op_threads': 2})
+             .map('x', 'w', lambda x: get_intra_op_threads())
+             .output('y', 'z', 'w'))
+        p.thread_budget(10)
+        # The operator is created by `output`, before the budget.
+        self.assertEqual(p(1).get(), [(None, 4), 2, 4])
+        self.assertEqual(sorted(p.intra_op_threads().values()), [2, 4, 4])
+
+        p.limit(4)
+        self.assertEqual(p(1).get(), [(None, 1), 2, 1])
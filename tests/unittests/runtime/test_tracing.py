@@ -0,0 +1,158 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from towhee import pipe
+from towhee.runtime import tracing
+from towhee.runtime.cancellation import CancelToken, PipelineCancelledError, cancel_scope
+
+
+class TestTracing(unittest.TestCase):
+    """
+    Test tracing spans of the pipeline.
+    """
+    def setUp(self):
+        self.exporter = tracing.InMemorySpanExporter()
+        tracing.set_tracer(tracing.Tracer(self.exporter))
+
+    def tearDown(self):
+        tracing.set_tracer(None)
+
+    def test_pipeline_spans(self):
+        p = pipe.input('a').map('a', 'b', lambda x: x + 1).flat_map('b', 'c', lambda x: range(x)).output('c')
+        self.assertEqual(p(2).to_list(), [[0], [1], [2]])
+
+        spans = self.exporter.spans
+        roots = [s for s in spans if s.name == 'towhee.pipeline']
+        self.assertEqual(len(roots), 1)
+        root = roots[0]
+        self.assertEqual(root.parent_id, None)
+        self.assertEqual(root.status, tracing.StatusCode.OK)
+        self.assertTrue(all(s.trace_id == root.trace_id for s in spans))
+
+        nodes = dict((s.span_id, s) for s in spans if s.parent_id == root.span_id)
+        self.assertEqual(len(nodes), 4)
+        self.assertEqual(
+            sorted(s.attributes['towhee.node.type'] for s in nodes.values()),
+            ['flat_map', 'map', 'map', 'map']
+        )
+
+        calls = [s for s in spans if s.name == 'call_op']
+        self.assertTrue(all(s.parent_id in nodes for s in calls))
+        self.assertEqual(len(calls), 3)
+
+    def test_failed_pipeline(self):
+        def fail(x):
+            raise ValueError('bad input')
+
+        p = pipe.input('a').map('a', 'b', fail).output('b')
+        with self.assertRaises(RuntimeError):
+            p(1)
+
+        spans = self.exporter.spans
+        root = [s for s in spans if s.name == 'towhee.pipeline'][0]
+        self.assertEqual(root.status, tracing.StatusCode.ERROR)
+        calls = [s for s in spans if s.name == 'call_op' and s.status == tracing.StatusCode.ERROR]
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(calls[0].status_message, 'bad input')
+        node = [s for s in spans if s.span_id == calls[0].parent_id][0]
+        self.assertEqual(node.name, 'fail-0')
+        self.assertEqual(node.status, tracing.StatusCode.ERROR)
+
+    def test_unstarted_pipeline(self):
+        p = pipe.input('a').map('a', 'b', lambda x: x + 1).output('b')
+        token = CancelToken()
+        token.cancel()
+        with cancel_scope(token), self.assertRaises(PipelineCancelledError):
+            p(1)
+        with mock.patch.object(p, '_graph', side_effect=RuntimeError('no graph')), self.assertRaises(RuntimeError):
+            p(1)
+
+        roots = [s for s in self.exporter.spans if s.name == 'towhee.pipeline']
+        self.assertEqual([(s.status, s.status_message) for s in roots],
+                         [(tracing.StatusCode.ERROR, 'The pipeline call has been cancelled.'),
+                          (tracing.StatusCode.ERROR, 'no graph')])
+
+    def test_batch(self):
+        p = pipe.input('a').map('a', 'b', lambda x: x + 1).output('b')
+        p.batch([1, 2, 3])
+        roots = [s for s in self.exporter.spans if s.name == 'towhee.pipeline']
+        self.assertEqual(len(roots), 3)
+        self.assertEqual(len(set(s.trace_id for s in roots)), 3)
+
+    def test_sample_rate(self):
+        tracing.set_tracer(tracing.Tracer(self.exporter, sample_rate=0))
+        p = pipe.input('a').map('a', 'b', lambda x: x + 1).output('b')
+        self.assertEqual(p(1).get(), [2])
+        self.assertEqual(self.exporter.spans, [])
+
+        with self.assertRaises(ValueError):
+            tracing.Tracer(self.exporter, sample_rate=2)
+
+    def test_disabled(self):
+        tracing.set_tracer(None)
+        p = pipe.input('a').map('a', 'b', lambda x: x + 1).output('b')
+        self.assertEqual(p(1).get(), [2])
+        self.assertEqual(self.exporter.spans, [])
+
+    def test_remote_parent(self):
+        traceparent = '00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01'
+        p = pipe.input('a').map('a', 'b', lambda x: x + 1).output('b')
+        with tracing.server_span('request', {'Traceparent': traceparent}) as span:
+            p(1)
+            self.assertEqual(tracing.inject()['traceparent'].split('-')[2], span.span_id)
+
+        spans = self.exporter.spans
+        self.assertTrue(all(s.trace_id == '0af7651916cd43dd8448eb211c80319c' for s in spans))
+        self.assertEqual(span.parent_id, 'b7ad6b7169203331')
+        root = [s for s in spans if s.name == 'towhee.pipeline'][0]
+        self.assertEqual(root.parent_id, span.span_id)
+
+    def test_remote_not_sampled(self):
+        traceparent = '00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-00'
+        p = pipe.input('a').map('a', 'b', lambda x: x + 1).output('b')
+        with tracing.server_span('request', [('traceparent', traceparent)]) as span:
+            self.assertIsNone(span)
+            p(1)
+        self.assertEqual(self.exporter.spans, [])
+
+    def test_traceparent(self):
+        self.assertIsNone(tracing.SpanContext.from_traceparent('invalid'))
+        self.assertIsNone(tracing.SpanContext.from_traceparent('00-' + '0' * 32 + '-b7ad6b7169203331-01'))
+        self.assertIsNone(tracing.extract({}))
+        ctx = tracing.SpanContext.from_traceparent('00-0AF7651916CD43DD8448EB211C80319C-B7AD6B7169203331-00')
+        self.assertFalse(ctx.sampled)
+        self.assertTrue(ctx.remote)
+        self.assertEqual(ctx.to_traceparent(), '00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-00')
+
+    def test_file_exporter(self):
+        with tempfile.TemporaryDirectory() as root:
+            file_path = Path(root) / 'spans.jsonl'
+            tracing.set_tracer(tracing.Tracer(tracing.FileSpanExporter(file_path), service_name='test'))
+            p = pipe.input('a').map('a', 'b', lambda x: x + 1).output('b')
+            p(1)
+            tracing.set_tracer(None)
+
+            with open(file_path, encoding='utf-8') as f:
+                spans = [json.loads(line) for line in f]
+            self.assertEqual(len(spans), 6)
+            root = [s for s in spans if s['name'] == 'towhee.pipeline'][0]
+            self.assertEqual(root['parentSpanId'], '')
+            self.assertEqual(root['resource']['service.name'], 'test')
+            self.assertTrue(root['startTimeUnixNano'] <= root['endTimeUnixNano'])
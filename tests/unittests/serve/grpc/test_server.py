@@ -12,7 +12,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import time
 import unittest
+import threading
 import typing as T
 import asyncio
 
@@ -21,7 +23,10 @@ import numpy as np
 
 from towhee import api_service, pipe
 from towhee.serve.grpc.server import GRPCServer
-from towhee.serve.grpc.client import Client, AsyncClient
+from towhee.serve.grpc.client import Client, AsyncClient, _gen_input
+from towhee.serve.grpc import service_pb2_grpc
+from towhee.runtime.cancellation import PipelineCancelledError
+from towhee.utils.thirdparty.grpc_utils import grpc
 from towhee.serve.io import JSON, NDARRAY, BYTES
 from towhee.utils.serializer import from_json
 
@@ -294,3 +299,52 @@ class TestGRPC(unittest.TestCase):
                     await aclient('/echo', 'error_type', NDARRAY())
 
         asyncio.run(run_async())
+
+    def test_client_cancel(self):
+        gate = threading.Event()
+        errors = []
+        # The inline calls stop before the next node, the graph stops the call while the operator runs.
+        p = pipe.input('x').map('x', 'y', lambda x: gate.wait(5) and x).output('y').inline(False)
+
+        def call(x):
+            try:
+                return p(x).get()[0]
+            except Exception as e:
+                errors.append(e)
+                raise
+
+        self.server = GRPCServer(api_service.build_service((call, '/call')))
+        self.server.start('localhost', 50001)
+        try:
+            with grpc.insecure_channel('localhost:50001') as channel:
+                stub = service_pb2_grpc.PipelineServicesStub(channel)
+                future = stub.Predict.future(_gen_input('/call', 1, None))
+                time.sleep(0.2)
+                future.cancel()
+            for _ in range(50):
+                if errors:
+                    break
+                time.sleep(0.05)
+        finally:
+            gate.set()
+        self.assertIsInstance(errors[0], PipelineCancelledError)
+
+    def test_overloaded(self):
+        gate = threading.Event()
+        p = pipe.input('x').map('x', 'y', lambda x: gate.wait(5) and x).output('y').limit(1)
+        self.server = GRPCServer(api_service.build_service((lambda x: p(x).get()[0], '/call')))
+        self.server.start('localhost', 50001)
+
+        t = threading.Thread(target=p, args=(1,))
+        t.start()
+        try:
+            while p.admission_stats()['running'] == 0:
+                time.sleep(0.01)
+            with grpc.insecure_channel('localhost:50001') as channel:
+                stub = service_pb2_grpc.PipelineServicesStub(channel)
+                with self.assertRaises(grpc.RpcError) as cm:
+                    stub.Predict(_gen_input('/call', 1, None))
+                self.assertEqual(cm.exception.code(), grpc.StatusCode.RESOURCE_EXHAUSTED)
+        finally:
+            gate.set()
+            t.join()
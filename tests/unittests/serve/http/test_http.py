@@ -12,7 +12,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import time
+import asyncio
 import unittest
+import threading
 import typing as T
 from pydantic import BaseModel
 import numpy as np
@@ -24,6 +27,8 @@ from fastapi.testclient import TestClient
 from towhee import api_service, pipe
 from towhee.serve.http.server import HTTPServer
 from towhee.serve.io import JSON, NDARRAY, BYTES
+from towhee.runtime import tracing
+from towhee.runtime.cancellation import PipelineCancelledError
 from towhee.utils.serializer import to_json, from_json
 
 
@@ -167,3 +172,90 @@ class TestHTTPServer(unittest.TestCase):
         client = TestClient(server.app)
         response = client.post('/no_input')
         self.assertEqual(from_json(response.content), 'No input')
+
+    def test_trace_context(self):
+        exporter = tracing.InMemorySpanExporter()
+        tracing.set_tracer(tracing.Tracer(exporter))
+        try:
+            server = HTTPServer(
+                api_service.build_service(
+                    (pipe.input('nums').map('nums', 'sum', sum).output('sum'), '/sum')
+                )
+            )
+            client = TestClient(server.app)
+            traceparent = '00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01'
+            response = client.post('/sum', json=[1, 2, 3], headers={'traceparent': traceparent})
+            assert response.status_code == 200
+        finally:
+            tracing.set_tracer(None)
+
+        spans = exporter.spans
+        self.assertTrue(all(s.trace_id == '0af7651916cd43dd8448eb211c80319c' for s in spans))
+        server_span = [s for s in spans if s.name == 'POST /sum'][0]
+        self.assertEqual(server_span.parent_id, 'b7ad6b7169203331')
+        root = [s for s in spans if s.name == 'towhee.pipeline'][0]
+        self.assertEqual(root.parent_id, server_span.span_id)
+
+    def test_client_disconnect(self):
+        gate = threading.Event()
+        errors = []
+        # The inline calls stop before the next node, the graph stops the call while the operator runs.
+        p = pipe.input('x').map('x', 'y', lambda x: gate.wait(5) and x).output('y').inline(False)
+
+        def call(x):
+            try:
+                return p(x).get()[0]
+            except Exception as e:
+                errors.append(e)
+                raise
+
+        server = HTTPServer(api_service.build_service((call, '/call')))
+
+        async def request():
+            messages = [{'type': 'http.request', 'body': b'1', 'more_body': False}]
+
+            async def receive():
+                if messages:
+                    return messages.pop(0)
+                return {'type': 'http.disconnect'}
+
+            async def send(_):
+                pass
+
+            scope = {
+                'type': 'http', 'http_version': '1.1', 'method': 'POST', 'scheme': 'http',
+                'path': '/call', 'raw_path': b'/call', 'root_path': '', 'query_string': b'',
+                'headers': [(b'content-type', b'application/json')],
+                'client': ('testclient', 50000), 'server': ('testserver', 80),
+            }
+            try:
+                await server.app(scope, receive, send)
+            except RuntimeError:
+                pass
+
+        start = time.time()
+        try:
+            asyncio.run(request())
+        finally:
+            gate.set()
+        self.assertLess(time.time() - start, 4)
+        self.assertIsInstance(errors[0], PipelineCancelledError)
+
+    def test_overloaded(self):
+        gate = threading.Event()
+        p = pipe.input('x').map('x', 'y', lambda x: gate.wait(5) and x).output('y').limit(1)
+        client = TestClient(HTTPServer(api_service.build_service((lambda x: p(x).get()[0], '/call'))).app)
+
+        t = threading.Thread(target=p, args=(1,))
+        t.start()
+        try:
+            while p.admission_stats()['running'] == 0:
+                time.sleep(0.01)
+            response = client.post('/call', json=1)
+            self.assertEqual(response.status_code, 429)
+        finally:
+            gate.set()
+            t.join()
+        response = client.post('/call', json=2)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), 2)
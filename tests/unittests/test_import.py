@@ -0,0 +1,58 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import re
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+import towhee
+
+# The cumulative microseconds of `import towhee`, the lazy imports take about 1ms and the eager ones took about
+# 300ms, the budget leaves room for slow CI machines.
+IMPORT_BUDGET_US = 100000
+HEAVY_MODULES = ['towhee.runtime', 'towhee.hub', 'towhee.serve.triton', 'pkg_resources', 'numpy', 'torch', 'requests']
+
+
+def _run(code: str) -> subprocess.CompletedProcess:
+    root = Path(__file__).parents[2]
+    return subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=root, capture_output=True, text=True,
+                          check=True)
+
+
+class TestImport(unittest.TestCase):
+    """
+    Test the lazy attributes of the top-level package.
+    """
+    def test_import_time(self):
+        ret = _run('import towhee')
+        cumulative = [int(m.group(1)) for m in re.finditer(r'^import time:\s+\d+ \|\s+(\d+) \| towhee$', ret.stderr, re.M)]
+        self.assertEqual(len(cumulative), 1)
+        self.assertLess(cumulative[0], IMPORT_BUDGET_US)
+
+    def test_no_heavy_modules(self):
+        # Checked in a new interpreter, the heavy modules are only imported once the lazy names are used.
+        ret = _run('import sys, towhee; print(",".join(sorted(set(sys.modules) & set({}))))'.format(HEAVY_MODULES))
+        self.assertEqual(ret.stdout.strip(), '')
+
+    def test_lazy_attrs(self):
+        from towhee import pipe, ops, AutoPipes  # pylint: disable=import-outside-toplevel
+        self.assertIs(towhee.pipe, pipe)
+        self.assertIs(towhee.ops, ops)
+        self.assertIs(towhee.AutoPipes, AutoPipes)
+        self.assertIs(towhee._types.Image, towhee.types.Image)  # pylint: disable=protected-access
+        self.assertIn('pipe', dir(towhee))
+        with self.assertRaises(AttributeError):
+            towhee.not_an_attr  # pylint: disable=pointless-statement
@@ -0,0 +1,86 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import time
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+
+from towhee import pipe
+from towhee.tools.autotune import autotune, apply_config, find_bottlenecks, default_config
+
+
+async def _async_sleep(x):
+    await asyncio.sleep(0.001)
+    return x
+
+
+class TestAutotune(unittest.TestCase):
+    """
+    Test the pipeline tuner.
+    """
+    def test_apply_config(self):
+        p = pipe.input('a').map('a', 'b', lambda x: x + 1, config={'name': 'add'}).output('b')
+        config = default_config()
+        config['max_workers'] = 2
+        config['nodes']['add'] = {'queue_size': 4, 'intra_op_threads': 1}
+        tuned = apply_config(p, config)
+        self.assertEqual(tuned(1).get(), [2])
+        node = [n for n in tuned.plan.nodes.values() if n.name == 'add'][0]
+        self.assertEqual((node.config.queue_size, node.config.intra_op_threads), (4, 1))
+        # The original pipeline is not changed.
+        node = [n for n in p.plan.nodes.values() if n.name == 'add'][0]
+        self.assertIsNone(node.config.queue_size)
+
+        with self.assertRaises(ValueError):
+            apply_config(p, {'nodes': {'add': {'queue_size': 0}}})
+
+    def test_queue_size(self):
+        p = (pipe.input('a')
+             .flat_map('a', 'b', lambda x: range(x), config={'queue_size': 2})
+             .map('b', 'c', lambda x: x * 2)
+             .output('c'))
+        self.assertEqual([r[0] for r in p(10).to_list()], [i * 2 for i in range(10)])
+
+    def test_find_bottlenecks(self):
+        p = (pipe.input('a')
+             .map('a', 'b', lambda x: x, config={'name': 'fast'})
+             .map('b', 'c', lambda x: time.sleep(0.005) or x, config={'name': 'slow'})
+             .output('c'))
+        bottlenecks = find_bottlenecks(p, list(range(4)))
+        self.assertEqual([name for name, _ in bottlenecks], ['slow', 'fast'])
+        self.assertTrue(bottlenecks[0][1] >= 0.02)
+
+    def test_autotune(self):
+        p = pipe.input('a').map('a', 'b', lambda x: time.sleep(0.005) or x, config={'name': 'slow'}).output('b')
+        result = autotune(p, list(range(32)), parallelism=(), queue_sizes=(8,), max_inflight=(1, 16), min_gain=0)
+        self.assertEqual(result.bottlenecks[0][0], 'slow')
+        self.assertEqual(len(result.trials), 2)
+        self.assertEqual(result.config['max_inflight'], 16)
+        self.assertTrue(result.speedup >= 1)
+
+        with tempfile.TemporaryDirectory() as root:
+            result.save(Path(root) / 'tune.json')
+            with open(Path(root) / 'tune.json', encoding='utf-8') as f:
+                saved = json.load(f)
+        self.assertEqual(saved['config'], result.config)
+        self.assertEqual(len(saved['trials']), 2)
+        self.assertEqual(result.apply(p)(1).get(), [1])
+
+    def test_async_parallelism(self):
+        p = pipe.input('a').map('a', 'b', _async_sleep, config={'name': 'remote'}).output('b')
+        result = autotune(p, list(range(8)), parallelism=(2, ), queue_sizes=(), max_inflight=())
+        self.assertEqual([t.config['nodes'] for t in result.trials], [{'remote': {'max_concurrency': 2}}])
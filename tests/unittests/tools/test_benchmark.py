@@ -0,0 +1,95 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import tempfile
+import unittest
+import argparse
+from pathlib import Path
+
+from towhee.tools import benchmark
+from towhee.command.benchmark import BenchCommand
+
+
+class TestBenchmark(unittest.TestCase):
+    """
+    Test the runtime benchmark.
+    """
+    config = benchmark.BenchConfig(rows=20, calls=2, cost='cpu', cost_amount=1, concurrency=[1, 2], queue_widths=[1, 10],
+                                   frame_shape=(240, 320, 3))
+
+    def test_synthetic_op(self):
+        for kind in ['cpu', 'sleep', 'alloc', 'matmul']:
+            self.assertEqual(benchmark.synthetic_op(kind, 10)('x'), 'x')
+        with self.assertRaises(ValueError):
+            benchmark.synthetic_op('gpu', 10)
+
+    def test_groups(self):
+        self.assertEqual(benchmark.bench_groups(), [
+            'node',
+            'queue',
+            'batch',
+            'concurrency',
+            'build',
+            'priority',
+            'multiprocess',
+            'transport',
+            'threads',
+            'route',
+            'chain',
+            'inline',
+            'requirements',
+        ])
+
+    def test_run(self):
+        results = benchmark.run_runtime_bench(['node'], self.config)
+        names = set(results['results'])
+        for node in ['map', 'flat_map', 'filter', 'window', 'time_window', 'window_all', 'reduce', 'concat']:
+            self.assertIn('node/' + node, names)
+        for res in results['results'].values():
+            self.assertTrue(res['rows_per_sec'] > 0)
+            self.assertTrue(res['latency_ms']['p50'] <= res['latency_ms']['p99'] <= res['latency_ms']['max'])
+        self.assertEqual(results['meta']['config']['rows'], 20)
+
+        with self.assertRaises(ValueError):
+            benchmark.run_runtime_bench(['unknown'], self.config)
+
+    def test_compare(self):
+        results = benchmark.run_runtime_bench(['batch'], self.config)
+        self.assertEqual(benchmark.compare_results(results, results), [])
+
+        baseline = copy.deepcopy(results)
+        baseline['results']['batch/call']['rows_per_sec'] *= 2
+        baseline['results']['batch/batch']['latency_ms']['p99'] /= 2
+        baseline['results']['removed'] = baseline['results']['batch/call']
+        regressions = benchmark.compare_results(results, baseline, 0.2)
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(regressions[0].startswith('batch/call: rows_per_sec'))
+        self.assertTrue(regressions[1].startswith('batch/batch: p99'))
+
+    def test_command(self):
+        with tempfile.TemporaryDirectory() as root:
+            output = str(Path(root) / 'bench.json')
+            args = argparse.Namespace(action='bench', target='runtime', groups=['queue'], rows=10, calls=1, cost='sleep',
+                                      cost_amount=1, concurrency=[1], queue_widths=[1], output=output, baseline=None, tolerance=0.2)
+            BenchCommand(args)()
+            results = benchmark.load_results(output)
+            self.assertEqual(list(results['results']), ['queue/width_1'])
+
+            results['results']['queue/width_1']['rows_per_sec'] = float('inf')
+            benchmark.save_results(results, output)
+            args.output = None
+            args.baseline = output
+            with self.assertRaises(SystemExit):
+                BenchCommand(args)()
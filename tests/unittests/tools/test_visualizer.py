@@ -160,6 +160,21 @@ class TestVisualizer(unittest.TestCase):
         self.assertEqual(t['lambda-1'].next_node, ['_output'])
         self.assertEqual(t['lambda-1'].previous_node, ['lambda-0'])
 
+    def test_tracer_caps(self):
+        p = (
+            pipe.input('a')
+                .flat_map('a', 'b', lambda x: range(x))
+                .map('b', 'c', lambda x: x + 1)
+                .output('c')
+        )
+        v = p.debug([10, 10, 10, 10], batch=True, tracer=True, trace_rows=3, trace_every=2)
+        self.assertEqual([len(r.to_list()) for r in v.result], [10, 10, 10, 10])
+        self.assertEqual(len(v.tracer), 2)
+        self.assertEqual([len(i) for i in v.node_collection[0]['lambda-1']['out']], [3])
+
+        with self.assertRaises(ValueError):
+            p.debug([1], batch=True, tracer=True, trace_every=0)
+
     def test_json(self):
         p = (
             pipe.input('a')
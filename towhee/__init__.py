@@ -16,23 +16,51 @@
 # pylint: disable=import-outside-toplevel
 
 import sys
+from pkgutil import extend_path
 
-from towhee.runtime import register, pipe, ops, accelerate, AutoConfig, AutoPipes
-from towhee.data_loader import DataLoader
-from towhee.serve.triton import triton_client
 from towhee.utils.lazy_import import LazyImport
 
-# Legacy towhee._types
-from towhee import types
-_types = types  # pylint: disable=protected-access
-sys.modules['towhee._types'] = sys.modules['towhee.types']
-
+# The other distributions of the `towhee` namespace, e.g. towhee.models.
+__path__ = extend_path(__path__, __name__)  # pylint: disable=used-before-assignment
+
+# The names imported at the first access, so that `import towhee` does not load the runtime, the hub and the
+# triton client, see PEP 562.
+_LAZY_ATTRS = {
+    'register': 'towhee.runtime',
+    'pipe': 'towhee.runtime',
+    'ops': 'towhee.runtime',
+    'accelerate': 'towhee.runtime',
+    'AutoConfig': 'towhee.runtime',
+    'AutoPipes': 'towhee.runtime',
+    'DataLoader': 'towhee.data_loader',
+    'triton_client': 'towhee.serve.triton',
+}
 
 datacollection = LazyImport('datacollection', globals(), 'towhee.datacollection')
 server_builder = LazyImport('server_builder', globals(), 'towhee.serve.server_builder')
 api_service = LazyImport('api_service', globals(), 'towhee.serve.api_service')
+types = LazyImport('types', globals(), 'towhee.types')
+
+# Legacy towhee._types
+_types = types  # pylint: disable=protected-access
+sys.modules['towhee._types'] = types
 
 
+def __getattr__(name):  # pylint: disable=invalid-name
+    if name not in _LAZY_ATTRS:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    import importlib
+    value = getattr(importlib.import_module(_LAZY_ATTRS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():  # pylint: disable=invalid-name
+    return sorted(list(globals()) + list(_LAZY_ATTRS))
+
+
+# The lazy names are resolved by `__getattr__`.
+# pylint: disable=undefined-all-variable
 __all__ = [
     'dataset',
     'pipe',
@@ -44,8 +72,7 @@ __all__ = [
     'AutoPipes',
     'DataLoader'
 ]
-
-__import__('pkg_resources').declare_namespace(__name__)
+# pylint: enable=undefined-all-variable
 
 
 def build_docker_image(
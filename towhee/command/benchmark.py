@@ -0,0 +1,81 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import sys
+import argparse
+
+from tabulate import tabulate
+
+from towhee.utils.lazy_import import LazyImport
+
+benchmark = LazyImport('benchmark', globals(), 'towhee.tools.benchmark')
+
+runtime_parser = argparse.ArgumentParser(add_help=False)
+runtime_parser.add_argument('--groups', nargs='*', help='The benchmark groups to run, defaults to all groups.')
+runtime_parser.add_argument('--rows', type=int, default=1000, help='The rows processed by one pipeline call.')
+runtime_parser.add_argument('--calls', type=int, default=10, help='How many times every case is repeated.')
+runtime_parser.add_argument('--cost', choices=['cpu', 'sleep', 'alloc', 'matmul'], default='cpu', help='The synthetic operator.')
+runtime_parser.add_argument('--cost-amount', type=int, default=10,
+                            help='Microseconds of the cpu or sleep operator, bytes of the alloc operator.')
+runtime_parser.add_argument('--concurrency', type=int, nargs='*', default=[1, 4, 16], help='The numbers of concurrent callers.')
+runtime_parser.add_argument('--queue-widths', type=int, nargs='*', default=[1, 16, 256, 1000], help='The max sizes of the data queues.')
+runtime_parser.add_argument('-o', '--output', help='Write the results to the json file.')
+runtime_parser.add_argument('-b', '--baseline', help='Compare the results with the baseline json file.')
+runtime_parser.add_argument('--tolerance', type=float, default=0.2, help='The allowed regression ratio, defaults to 0.2.')
+
+
+class BenchCommand:
+    """
+    Implementation for subcmd `towhee bench`. Run the benchmarks.
+    """
+    def __init__(self, args):
+        self._args = args
+
+    @staticmethod
+    def install(subparsers):
+        bench = subparsers.add_parser('bench', help='Run the benchmarks.')
+        targets = bench.add_subparsers(dest='target', description='benchmark targets.')
+        targets.add_parser('runtime', parents=[runtime_parser], help='Benchmark the pipeline engine.')
+
+    def __call__(self):
+        if self._args.target == 'runtime':
+            self._runtime()
+
+    def _runtime(self):
+        args = self._args
+        config = benchmark.BenchConfig(
+            rows=args.rows,
+            calls=args.calls,
+            cost=args.cost,
+            cost_amount=args.cost_amount,
+            concurrency=args.concurrency,
+            queue_widths=args.queue_widths,
+        )
+        results = benchmark.run_runtime_bench(args.groups, config)
+        headers = ['case', 'rows/s', 'p50(ms)', 'p90(ms)', 'p99(ms)']
+        table = [[name, res['rows_per_sec'], res['latency_ms']['p50'], res['latency_ms']['p90'], res['latency_ms']['p99']]
+                 for name, res in results['results'].items()]
+        print(tabulate(table, headers=headers))
+
+        if args.output:
+            benchmark.save_results(results, args.output)
+            print(f'Results saved to {args.output}.')
+
+        if args.baseline:
+            regressions = benchmark.compare_results(results, benchmark.load_results(args.baseline), args.tolerance)
+            if regressions:
+                print('Regressions against {}:'.format(args.baseline))
+                for r in regressions:
+                    print('  ' + r)
+                sys.exit(1)
+            print('No regression against {}.'.format(args.baseline))
@@ -17,6 +17,7 @@ import argparse
 
 from towhee.command.initialize import InitCommand
 from towhee.command.service import ServerCommand
+from towhee.command.benchmark import BenchCommand
 
 
 def main_body(args):
@@ -25,7 +26,8 @@ def main_body(args):
 
     actions = {
         'init': InitCommand,
-        'server': ServerCommand
+        'server': ServerCommand,
+        'bench': BenchCommand,
     }
 
     for _, impl in actions.items():
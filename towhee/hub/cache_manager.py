@@ -15,6 +15,7 @@
 import os
 from pathlib import Path
 import threading
+from contextlib import contextmanager
 
 from .downloader import download_operator, download_pipeline, repo_tag_path
 
@@ -34,6 +35,20 @@ def get_local_dir():
     return cache_root
 
 
+@contextmanager
+def local_dir(d):
+    """
+    Use `d` as the local cache dir in the context, the previous one is restored on exit.
+    """
+    global _HUB_ROOT
+    hub_root = _HUB_ROOT
+    set_local_dir(d)
+    try:
+        yield get_local_dir()
+    finally:
+        _HUB_ROOT = hub_root
+
+
 class CacheManager:
     """
     Downloading from hub
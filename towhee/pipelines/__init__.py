@@ -13,13 +13,21 @@
 # limitations under the License.
 
 
+import json
+import os
+import threading
+import time
 from pathlib import Path
+from typing import Callable, List, Optional
 
 from towhee.utils.log import engine_log
 
 
 BUILT_IN_PIPES_ROOT = Path(__file__).absolute().parent
 
+_model_names = {}
+_model_names_lock = threading.Lock()
+
 
 def get_builtin_pipe_file(name: str) -> Path:
     file_name = name + '.py'
@@ -28,3 +36,75 @@ def get_builtin_pipe_file(name: str) -> Path:
         engine_log.info('%s not a built-in pipeline', name)
         return None
     return file_path
+
+
+def _model_names_file(name: str) -> Path:
+    from towhee.hub.cache_manager import get_local_dir  # pylint: disable=import-outside-toplevel
+    return Path(get_local_dir()) / 'pipelines' / 'model_names' / (name + '.json')
+
+
+def operator_version(operator: str, tag: str = 'main') -> Optional[str]:
+    """
+    The version of a hub operator in the local cache, the modification time of its directory, which changes when
+    the operator is downloaded again. None if it is not downloaded.
+
+    Args:
+        operator (`str`):
+            The operator in 'author/repo' format, e.g. 'sentence-embedding/transformers'.
+        tag (`str`):
+            The tag of the operator.
+    """
+    from towhee.hub.cache_manager import get_local_dir  # pylint: disable=import-outside-toplevel
+    from towhee.hub.downloader import repo_tag_path  # pylint: disable=import-outside-toplevel
+    author, repo = operator.split('/')
+    try:
+        return str(repo_tag_path(Path(get_local_dir()) / 'operators' / author / repo, tag).stat().st_mtime_ns)
+    except OSError:
+        return None
+
+
+def cached_model_names(name: str, load: Callable[[], List[str]], version: Callable[[], Optional[str]] = None,
+                       max_age: float = 24 * 3600) -> List[str]:
+    """
+    The model names supported by an operator of the built-in pipelines, `load` is only called if they are not cached
+    in the process or on disk, under `$TOWHEE_HOME/pipelines/model_names`. The cached names are loaded again once
+    the `version` of the operator changes or they are older than `max_age` seconds. Remove the file to load them again.
+
+    Args:
+        name (`str`):
+            The name of the cache, e.g. 'sentence_embedding.transformers'.
+        load (`Callable[[], List[str]]`):
+            Load the model names, e.g. from the operator.
+        version (`Callable[[], Optional[str]]`):
+            The version of the operator, e.g. by `operator_version`, checked before the cache is read and after
+            `load`, which may download the operator.
+        max_age (`float`):
+            The seconds the names are cached.
+    """
+    current = version() if version is not None else None
+    with _model_names_lock:
+        cached = _model_names.get(name)
+        if cached is not None and cached[0] == current and time.time() - cached[1] < max_age:
+            return cached[2]
+        file_path = _model_names_file(name)
+        try:
+            if time.time() - file_path.stat().st_mtime >= max_age:
+                raise ValueError('Expired model names.')
+            with open(file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data['version'] != current:
+                raise ValueError('The operator has changed.')
+            names, created = data['names'], file_path.stat().st_mtime
+        except (OSError, ValueError, TypeError, KeyError):
+            names, created = list(load()), time.time()
+            current = version() if version is not None else None
+            try:
+                file_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = file_path.with_suffix('.{}.tmp'.format(os.getpid()))
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump({'version': current, 'names': names}, f)
+                os.replace(tmp_path, file_path)
+            except OSError as e:
+                engine_log.warning('Can not cache the model names of %s: %s', name, str(e))
+        _model_names[name] = (current, created, names)
+        return names
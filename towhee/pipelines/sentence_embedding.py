@@ -16,6 +16,7 @@ from typing import Optional, Any
 from pydantic import BaseModel
 
 from towhee import ops, pipe, AutoPipes, AutoConfig
+from towhee.pipelines import cached_model_names, operator_version
 
 
 @AutoConfig.register
@@ -30,13 +31,24 @@ class SentenceSimilarityConfig(BaseModel):
     device: Optional[int] = -1
 
 
-_hf_models = ops.sentence_embedding.transformers().get_op().supported_model_names()
-_sbert_models = ops.sentence_embedding.sbert().get_op().supported_model_names()
 _openai_models = ['text-embedding-ada-002', 'text-similarity-davinci-001',
                   'text-similarity-curie-001', 'text-similarity-babbage-001',
                   'text-similarity-ada-001']
 
 
+# The operators are only loaded to list their models when a pipeline is built, and the lists are cached.
+def _hf_models():
+    return cached_model_names('sentence_embedding.transformers',
+                              lambda: ops.sentence_embedding.transformers().get_op().supported_model_names(),
+                              lambda: operator_version('sentence-embedding/transformers'))
+
+
+def _sbert_models():
+    return cached_model_names('sentence_embedding.sbert',
+                              lambda: ops.sentence_embedding.sbert().get_op().supported_model_names(),
+                              lambda: operator_version('sentence-embedding/sbert'))
+
+
 def _get_embedding_op(config):
     if config.device == -1:
         device = 'cpu'
@@ -46,16 +58,16 @@ def _get_embedding_op(config):
     if config.customize_embedding_op is not None:
         return True, config.customize_embedding_op
 
-    if config.model in _hf_models:
+    if config.model in _openai_models:
+        return False, ops.sentence_embedding.openai(model_name=config.model,
+                                                api_key=config.openai_api_key)
+    if config.model in _hf_models():
         return True, ops.sentence_embedding.transformers(model_name=config.model,
                                                          device=device)
-    if config.model in _sbert_models:
+    if config.model in _sbert_models():
         return True, ops.sentence_embedding.sbert(model_name=config.model,
                                                   device=device)
-    if config.model in _openai_models:
-        return False, ops.sentence_embedding.openai(model_name=config.model,
-                                                api_key=config.openai_api_key)
-    raise RuntimeError('Unknown model: [%s], only support: %s' % (config.model, _hf_models + _openai_models))
+    raise RuntimeError('Unknown model: [%s], only support: %s' % (config.model, _hf_models() + _sbert_models() + _openai_models))
 
 
 @AutoPipes.register
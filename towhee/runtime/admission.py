@@ -0,0 +1,140 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+import heapq
+import itertools
+import threading
+from typing import Dict
+
+from .cancellation import PipelineTimeoutError
+from .scheduler import Priority
+
+
+class PipelineOverloadedError(RuntimeError):
+    """
+    The pipeline call is rejected because the pipeline is running its maximum number of calls and
+    its wait queue is full, or the call waited longer than the queue timeout.
+    """
+
+
+class AdmissionController:
+    """
+    Limit the concurrent calls of a pipeline, the calls over the limit wait in a bounded queue ordered
+    by priority and then deadline, and are rejected with `PipelineOverloadedError` once the queue is full.
+
+    If `target_latency` is set, the limit adapts to the observed latency: it grows by one every `limit`
+    calls finishing within the target and shrinks by `backoff` on every slower call, staying in
+    `[min_concurrency, max_concurrency]`.
+
+    Args:
+        max_concurrency (`int`): The maximum running calls.
+        max_queue (`int`): The maximum calls waiting to run, 0 rejects the calls over the limit at once.
+        queue_timeout (`float`): The maximum seconds a call waits in the queue, defaults to wait forever.
+        target_latency (`float`): The target latency in seconds, enables the adaptive limit.
+        min_concurrency (`int`): The lower bound of the adaptive limit.
+        backoff (`float`): The ratio the adaptive limit is multiplied by on a slow call.
+
+    Examples:
+        >>> from towhee.runtime.admission import AdmissionController, PipelineOverloadedError
+        >>> admission = AdmissionController(max_concurrency=1, max_queue=0)
+        >>> admission.acquire()
+        >>> try:
+        ...     admission.acquire()
+        ... except PipelineOverloadedError:
+        ...     print('rejected')
+        rejected
+        >>> admission.release()
+        >>> admission.stats()['rejected']
+        1
+    """
+    def __init__(self,
+                 max_concurrency: int,
+                 max_queue: int = 0,
+                 queue_timeout: float = None,
+                 target_latency: float = None,
+                 min_concurrency: int = 1,
+                 backoff: float = 0.9):
+        if max_concurrency < 1 or max_queue < 0 or not 1 <= min_concurrency <= max_concurrency:
+            raise ValueError('Invalid admission limits: max_concurrency={}, max_queue={}, min_concurrency={}.'.format(
+                max_concurrency, max_queue, min_concurrency))
+        self._max_concurrency = max_concurrency
+        self._max_queue = max_queue
+        self._queue_timeout = queue_timeout
+        self._target_latency = target_latency
+        self._min_concurrency = min_concurrency
+        self._backoff = backoff
+        self._limit = float(max_concurrency)
+        self._cond = threading.Condition()
+        self._running = 0
+        self._waiters = []
+        self._seq = itertools.count()
+        self._rejected = 0
+
+    @property
+    def limit(self) -> int:
+        return max(int(self._limit), self._min_concurrency)
+
+    def acquire(self, priority: int = Priority.NORMAL, timeout: float = None):
+        """
+        Take a slot for a call, waiting at most `timeout` seconds, the deadline of the call.
+
+        Raises:
+            PipelineOverloadedError: The queue is full or the call waited longer than `queue_timeout`.
+            PipelineTimeoutError: The call reached its deadline while waiting.
+        """
+        with self._cond:
+            if self._running < self.limit and not self._waiters:
+                self._running += 1
+                return
+            if len(self._waiters) >= self._max_queue:
+                self._rejected += 1
+                raise PipelineOverloadedError('The pipeline is overloaded: {} calls running and {} calls waiting.'.format(
+                    self._running, len(self._waiters)))
+
+            wait = min(t for t in (timeout, self._queue_timeout, float('inf')) if t is not None)
+            end = time.monotonic() + wait
+            entry = (priority, time.monotonic() + timeout if timeout is not None else float('inf'), next(self._seq))
+            heapq.heappush(self._waiters, entry)
+            try:
+                while self._waiters[0] != entry or self._running >= self.limit:
+                    remaining = end - time.monotonic()
+                    if remaining <= 0:
+                        if timeout is not None and timeout <= wait:
+                            raise PipelineTimeoutError('The pipeline call did not start in {} seconds.'.format(timeout))
+                        self._rejected += 1
+                        raise PipelineOverloadedError('The pipeline call waited {} seconds in the queue.'.format(wait))
+                    self._cond.wait(remaining if remaining != float('inf') else None)
+                self._running += 1
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+    def release(self, latency: float = None):
+        """
+        Return the slot of a call, `latency` is the seconds the call took, None if it did not finish.
+        """
+        with self._cond:
+            self._running -= 1
+            if self._target_latency is not None and latency is not None:
+                if latency > self._target_latency:
+                    self._limit = max(self._limit * self._backoff, self._min_concurrency)
+                else:
+                    self._limit = min(self._limit + 1 / self._limit, self._max_concurrency)
+            self._cond.notify_all()
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {'limit': self.limit, 'running': self._running, 'queued': len(self._waiters), 'rejected': self._rejected}
@@ -0,0 +1,135 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import time
+import asyncio
+import inspect
+import threading
+from typing import Callable, Dict, Tuple
+from concurrent.futures import Future
+
+
+_LOOP_LOCK = threading.Lock()
+_LOOP = None
+_LOOP_PID = None
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    The event loop shared by the async operators of all the pipelines, running in a daemon thread.
+    """
+    global _LOOP, _LOOP_PID  # pylint: disable=global-statement
+    with _LOOP_LOCK:
+        # The thread of the loop does not survive forking.
+        if _LOOP is None or _LOOP_PID != os.getpid():
+            _LOOP = asyncio.new_event_loop()
+            _LOOP_PID = os.getpid()
+            threading.Thread(target=_LOOP.run_forever, name='towhee-async-ops', daemon=True).start()
+        return _LOOP
+
+
+def is_async_op(op: Callable) -> bool:
+    """
+    Whether `op` is an `async def` function or an operator with `async def __call__`.
+    """
+    return inspect.iscoroutinefunction(op) or inspect.iscoroutinefunction(getattr(op, '__call__', None))
+
+
+class TokenBucket:
+    """
+    Allow `rate` calls per second on average and bursts of `burst` calls, used in the event loop.
+
+    Args:
+        rate (`float`): The calls per second.
+        burst (`int`): The maximum calls at once, defaults to 1.
+    """
+    def __init__(self, rate: float, burst: int = None):
+        if rate <= 0:
+            raise ValueError('The rate limit should be positive, got {}.'.format(rate))
+        self._rate = rate
+        self._burst = max(1, burst or 1)
+        self._tokens = float(self._burst)
+        self._last = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self._burst, self._tokens + (now - self._last) * self._rate)
+            self._last = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self._rate)
+
+
+class AsyncRunner:
+    """
+    Run the calls of an async operator on the shared event loop, at most `max_concurrency` calls at a time
+    and at most `rate_limit` calls per second.
+
+    Args:
+        max_concurrency (`int`): The maximum outstanding calls.
+        rate_limit (`float`): The maximum calls per second, defaults to no limit.
+        burst (`int`): The maximum calls started at once under the rate limit.
+
+    Examples:
+        >>> import asyncio
+        >>> from towhee.runtime.async_runner import AsyncRunner
+        >>> async def add_one(x):
+        ...     await asyncio.sleep(0.01)
+        ...     return x + 1
+        >>> runner = AsyncRunner(max_concurrency=8)
+        >>> [f.result() for f in [runner.submit(add_one, (i,)) for i in range(4)]]
+        [1, 2, 3, 4]
+    """
+    def __init__(self, max_concurrency: int = 64, rate_limit: float = None, burst: int = None):
+        self._max_concurrency = max_concurrency
+        self._bucket = TokenBucket(rate_limit, burst) if rate_limit is not None else None
+        self._semaphore = None
+        self._running = 0
+        self._waiting = 0
+
+    @property
+    def max_concurrency(self) -> int:
+        return self._max_concurrency
+
+    async def _run(self, op: Callable, args: Tuple):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        self._waiting += 1
+        started = False
+        try:
+            async with self._semaphore:
+                if self._bucket is not None:
+                    await self._bucket.acquire()
+                self._waiting -= 1
+                started = True
+                self._running += 1
+                try:
+                    return await op(*args)
+                finally:
+                    self._running -= 1
+        finally:
+            if not started:
+                self._waiting -= 1
+
+    def submit(self, op: Callable, args: Tuple) -> Future:
+        """
+        Start `op(*args)` on the event loop, `future.cancel()` cancels the call.
+        """
+        return asyncio.run_coroutine_threadsafe(self._run(op, args), get_event_loop())
+
+    def stats(self) -> Dict:
+        return {'running': self._running, 'waiting': self._waiting}
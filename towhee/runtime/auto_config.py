@@ -14,29 +14,14 @@
 
 import threading
 from functools import wraps
-import contextvars
-import contextlib
 
 import towhee.runtime.pipeline_loader as pipe_loader
 import towhee.runtime.node_config as nd_conf
 from towhee.utils.log import engine_log
 
 
-_AUTO_CONFIG_VAR: contextvars.ContextVar = contextvars.ContextVar('auto_config_var')
-
-
-@contextlib.contextmanager
-def set_config_name(name: str):
-    token = _AUTO_CONFIG_VAR.set(name)
-    yield
-    _AUTO_CONFIG_VAR.reset(token)
-
-
 def get_config_name():
-    try:
-        return _AUTO_CONFIG_VAR.get()
-    except:  # pylint: disable=bare-except
-        return None
+    return pipe_loader.PipelineLoader.loading_name()
 
 
 # pylint: disable=invalid-name
@@ -79,25 +64,28 @@ class AutoConfig:
             if name in AutoConfig._REGISTERED_CONFIG:
                 return AutoConfig._REGISTERED_CONFIG[name](*args, **kwargs)
 
-            with set_config_name(name):
-                pipe_loader.PipelineLoader.load_pipeline(name)
+            pipe_loader.PipelineLoader.load_pipeline(name)
             if name in AutoConfig._REGISTERED_CONFIG:
                 return AutoConfig._REGISTERED_CONFIG[name](*args, **kwargs)
             engine_log.error('Can not find config: %s', name)
             return None
 
     @staticmethod
-    def LocalCPUConfig():
+    def LocalCPUConfig(intra_op_threads: int = None):
         """
         Auto configuration to run with local CPU.
 
+        Args:
+            intra_op_threads (`int`): The threads of the torch, OpenMP and BLAS thread pools used by the operator,
+                defaults to the libraries' own setting or the thread budget of the pipeline.
+
         Examples:
             >>> from towhee import pipe, AutoConfig
             >>> p = (pipe.input('a')
             ...          .flat_map('a', 'b', lambda x: [y for y in x], config=AutoConfig.LocalCPUConfig())
             ...          .output('b'))
         """
-        return nd_conf.TowheeConfig.set_local_config(device=-1)
+        return nd_conf.TowheeConfig.set_local_config(device=-1, intra_op_threads=intra_op_threads)
 
     @staticmethod
     def LocalGPUConfig(device: int = 0):
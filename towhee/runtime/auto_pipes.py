@@ -15,29 +15,14 @@
 from functools import wraps
 from typing import Optional
 import threading
-import contextvars
-import contextlib
 
 
 import towhee.runtime.pipeline_loader as pipe_loader
 from towhee.utils.log import engine_log
 
 
-_AUTO_PIPES_VAR: contextvars.ContextVar = contextvars.ContextVar('auto_pipes_var')
-
-
-@contextlib.contextmanager
-def set_pipe_name(name: str):
-    token = _AUTO_PIPES_VAR.set(name)
-    yield
-    _AUTO_PIPES_VAR.reset(token)
-
-
 def get_pipe_name():
-    try:
-        return _AUTO_PIPES_VAR.get()
-    except:  # pylint: disable=bare-except
-        return None
+    return pipe_loader.PipelineLoader.loading_name()
 
 
 class AutoPipes:
@@ -77,8 +62,7 @@ class AutoPipes:
             if name in AutoPipes._PIPES_DEF:
                 return AutoPipes._PIPES_DEF[name](*args, **kwargs)
 
-            with set_pipe_name(name):
-                pipe_loader.PipelineLoader.load_pipeline(name)
+            pipe_loader.PipelineLoader.load_pipeline(name)
             if name in AutoPipes._PIPES_DEF:
                 return AutoPipes._PIPES_DEF[name](*args, **kwargs)
 
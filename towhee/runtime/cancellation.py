@@ -0,0 +1,116 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import contextlib
+import contextvars
+from concurrent.futures import CancelledError
+from typing import Callable, Optional
+
+from towhee.utils.log import engine_log
+
+
+class PipelineTimeoutError(TimeoutError):
+    """
+    The pipeline call did not finish before its deadline, the call has been cancelled.
+    """
+
+
+class PipelineCancelledError(CancelledError):
+    """
+    The pipeline call has been cancelled.
+    """
+
+
+class CancelToken:
+    """
+    Cancel the pipeline calls made in a `cancel_scope`, for example when the client of a served request
+    disconnects.
+
+    Examples:
+        >>> from towhee.runtime.cancellation import CancelToken
+        >>> token = CancelToken()
+        >>> _ = token.add_callback(lambda: print('cancelled'))
+        >>> token.cancel()
+        cancelled
+        >>> token.cancelled
+        True
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._callbacks = {}
+        self._next_id = 0
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def add_callback(self, callback: Callable[[], None]) -> Optional[int]:
+        """
+        Register the callback called on cancel, it is called immediately if the token is already cancelled.
+        Returns the handle to remove the callback.
+        """
+        with self._lock:
+            if not self._cancelled:
+                self._next_id += 1
+                self._callbacks[self._next_id] = callback
+                return self._next_id
+        callback()
+        return None
+
+    def remove_callback(self, handle: Optional[int]):
+        with self._lock:
+            self._callbacks.pop(handle, None)
+
+    def cancel(self):
+        with self._lock:
+            if self._cancelled:
+                return
+            self._cancelled = True
+            callbacks = list(self._callbacks.values())
+            self._callbacks = {}
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:  # pylint: disable=broad-except
+                engine_log.warning('Cancel callback failed: %s', str(e))
+
+
+_CANCEL_TOKEN_VAR: contextvars.ContextVar = contextvars.ContextVar('towhee_cancel_token', default=None)
+
+
+def current_token() -> Optional[CancelToken]:
+    return _CANCEL_TOKEN_VAR.get()
+
+
+@contextlib.contextmanager
+def cancel_scope(token: CancelToken = None):
+    """
+    Cancel the pipeline calls made in the scope with the token.
+
+    Examples:
+        >>> from towhee import pipe
+        >>> from towhee.runtime.cancellation import cancel_scope
+        >>> p = pipe.input('a').map('a', 'b', lambda x: x + 1).output('b')
+        >>> with cancel_scope() as token:
+        ...     p(1).get()
+        [2]
+    """
+    token = token if token is not None else CancelToken()
+    reset = _CANCEL_TOKEN_VAR.set(token)
+    try:
+        yield token
+    finally:
+        _CANCEL_TOKEN_VAR.reset(reset)
@@ -0,0 +1,89 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterable, Set, Tuple, Union
+
+
+class Checkpoint:
+    """
+    The progress of a bulk run stored in a sqlite file: the input offset, before which all the rows
+    have completed, and the ids of the rows completed after the offset.
+
+    Args:
+        file_path (`Union[str, Path]`): The sqlite file, created if it does not exist.
+
+    Examples:
+        >>> import tempfile
+        >>> from pathlib import Path
+        >>> from towhee.runtime.checkpoint import Checkpoint
+        >>> with tempfile.TemporaryDirectory() as root:
+        ...     with Checkpoint(Path(root) / 'job.ckpt') as ckpt:
+        ...         ckpt.commit(2, [('4', 4)])
+        ...     with Checkpoint(Path(root) / 'job.ckpt') as ckpt:
+        ...         print(ckpt.offset, ckpt.is_done('4'), ckpt.is_done('3'))
+        2 True False
+    """
+    def __init__(self, file_path: Union[str, Path]):
+        self._file_path = Path(file_path)
+        self._file_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self._file_path), check_same_thread=False)
+        with self._conn:
+            self._conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER)')
+            self._conn.execute('CREATE TABLE IF NOT EXISTS done (id TEXT PRIMARY KEY, idx INTEGER)')
+            self._conn.execute('INSERT OR IGNORE INTO meta VALUES (\'offset\', 0)')
+
+    @property
+    def file_path(self) -> Path:
+        return self._file_path
+
+    @property
+    def offset(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT value FROM meta WHERE key = \'offset\'').fetchone()[0]
+
+    def is_done(self, row_id: str) -> bool:
+        with self._lock:
+            return self._conn.execute('SELECT 1 FROM done WHERE id = ?', (row_id,)).fetchone() is not None
+
+    def done_ids(self) -> Set[str]:
+        with self._lock:
+            return set(row[0] for row in self._conn.execute('SELECT id FROM done'))
+
+    def commit(self, offset: int, done: Iterable[Tuple[str, int]] = ()):
+        """
+        Save the offset and the `(row_id, index)` of the rows completed after it in one transaction,
+        the ids before the offset are dropped.
+        """
+        with self._lock, self._conn:
+            self._conn.executemany('INSERT OR REPLACE INTO done VALUES (?, ?)', [(i, idx) for i, idx in done if idx >= offset])
+            self._conn.execute('UPDATE meta SET value = ? WHERE key = \'offset\'', (offset,))
+            self._conn.execute('DELETE FROM done WHERE idx < ?', (offset,))
+
+    def reset(self):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM done')
+            self._conn.execute('UPDATE meta SET value = 0 WHERE key = \'offset\'')
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
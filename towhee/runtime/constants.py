@@ -25,6 +25,14 @@ class FilterConst:
     param = _Param()
 
 
+class RouteConst:
+    class _Param:
+        branches = 'branches'
+
+    name = 'route'
+    param = _Param()
+
+
 class WindowConst:
     class _Param:
         step = 'step'
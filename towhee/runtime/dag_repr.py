@@ -30,6 +30,7 @@ from towhee.runtime.constants import (
     MapConst,
     ReduceConst,
     FilterConst,
+    RouteConst,
     TimeWindowConst,
     FlatMapConst,
     InputConst,
@@ -280,7 +281,8 @@ class DAGRepr(BaseModel):
             if node.op_info.type == OPType.LAMBDA:
                 return 'lambda'
             if node.op_info.type == OPType.CALLABLE:
-                return node.op_info.operator.__name__
+                # The callable objects have no `__name__`.
+                return getattr(node.op_info.operator, '__name__', type(node.op_info.operator).__name__)
             return node.op_info.operator
 
         info = {}
@@ -312,20 +314,14 @@ class DAGRepr(BaseModel):
         return json.dumps(self.to_dict(), **kws)
 
     @staticmethod
-    def from_dict(dag: Dict[str, Any]):
-        """Return a DAGRepr from a dag dictionary.
+    def set_node_configs(dag: Dict[str, Any]):
+        """Set the config with the node name for all the nodes of the dag dictionary.
 
-        Args:
-            dag (`str`): The dag dictionary.
+        The node dicts are replaced with copies, the dicts shared with the pipeline builder are not modified.
 
-        Returns:
-            DAGRepr
+        Args:
+            dag (`Dict[str, Any]`): The dag dictionary.
         """
-        dag_dict = deepcopy(dag)
-        for uid, node in dag_dict.items():
-            if node['op_info']['type'] == OPType.PIPELINE:
-                DAGRepr.rebuild_dag(dag, uid, node['op_info'], node['iter_info'], node['inputs'], node['outputs'])
-
         def _get_name(val):
             if val['op_info']['type'] == OPType.CALLABLE:
                 if isinstance(val['op_info']['operator'], types.FunctionType):
@@ -343,9 +339,10 @@ class DAGRepr(BaseModel):
 
             return name
 
-        nodes = {}
         node_index = 0
-        for key, val in dag.items():
+        for key in dag:
+            val = dict(dag[key])
+            dag[key] = val
             # Deal with AutoConfig
             if 'config' in val and val['config'] is not None and isinstance(val['config'], TowheeConfig):
                 val['config'] = val['config'].config
@@ -368,14 +365,33 @@ class DAGRepr(BaseModel):
 
             # Process dict config.
             elif isinstance(val['config'], dict):
+                val['config'] = dict(val['config'])
                 if 'name' not in val['config']:
                     name = _get_name(val)
                     val['config']['name'] = name + '-' + str(node_index)
                 elif val['config']['name'] in [InputConst.name, OutputConst.name]:
                     val['config']['name'] = val['config']['name'] + '-' + str(node_index)
                 node_index += 1
+        return dag
+
+    @staticmethod
+    def from_dict(dag: Dict[str, Any]):
+        """Return a DAGRepr from a dag dictionary, the dictionary is not modified.
+
+        Args:
+            dag (`str`): The dag dictionary.
+
+        Returns:
+            DAGRepr
+        """
+        dag_dict = dag
+        dag = dict(dag_dict)
+        for uid, node in dag_dict.items():
+            if node['op_info']['type'] == OPType.PIPELINE:
+                DAGRepr.rebuild_dag(dag, uid, node['op_info'], node['iter_info'], node['inputs'], node['outputs'])
 
-            nodes[key] = NodeRepr(uid=key, **val)
+        DAGRepr.set_node_configs(dag)
+        nodes = dict((key, NodeRepr(uid=key, **val)) for key, val in dag.items())
         top_sort = DAGRepr.get_top_sort(nodes)
         DAGRepr.check_nodes(nodes, top_sort)
         dag_nodes, schema_edges = DAGRepr.set_edges(nodes, top_sort)
@@ -460,6 +476,10 @@ class DAGRepr(BaseModel):
         dag[uid] = output_info
         dag[mark_node]['next_nodes'].remove('_output')
         dag[mark_node]['next_nodes'].append(uid)
+        if dag[mark_node]['iter_info']['type'] == RouteConst.name:
+            branches = dag[mark_node]['iter_info']['param'][RouteConst.param.branches]
+            if '_output' in branches:
+                branches[uid] = branches.pop('_output')
 
     @staticmethod
     def _rename_group_schemas(dag, top_sort, ori_input_schema, input_schema):
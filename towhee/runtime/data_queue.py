@@ -15,33 +15,49 @@
 import threading
 import copy
 from enum import Enum, auto
-from typing import List, Tuple, Union, Dict, Optional
+from typing import Callable, List, Tuple, Union, Dict, Optional
 
 from collections import deque, namedtuple
 
+import numpy as np
+
+from .memory_budget import sizeof
+
 
 class DataQueue:
     """
     Col-based storage.
+
+    With `keep_data`, the rows of the queue columns are kept after they are read, for the tracer, at most `keep_rows`
+    rows and `keep_bytes` bytes of every column. The rows are read as snapshots, references to the immutable values
+    and the read-only arrays and copies of the writable arrays, or always references if `copy_data` is False.
     """
 
-    def __init__(self, schema_info, max_size=1000, keep_data=False):
+    def __init__(self, schema_info, max_size=1000, keep_data=False, memory: 'MemoryAccount' = None, keep_rows: int = None,
+                 keep_bytes: int = None, copy_data: bool = True):
         self._max_size = max_size
+        self._memory = memory
+        self._nbytes = 0
+        self._peak_nbytes = 0
         self._schema = _Schema(schema_info)
         self._data = []
         self._queue_index = []
         self._scalar_index = []
         self._has_all_scalars = False
         self._readed = False
+        # Shared by the columns, so that they keep the same rows.
+        trace_cap = _TraceCap(keep_rows, keep_bytes) if keep_data else None
         for index in range(len(self._schema.col_types)):
             col_type = self._schema.col_types[index]
             if col_type == ColumnType.QUEUE:
-                self._data.append(_QueueColumn() if not keep_data else _ListColumn())
+                self._data.append(_QueueColumn() if not keep_data else _ListColumn(trace_cap, copy_data))
                 self._queue_index.append(index)
             else:
                 self._data.append(_ScalarColumn())
                 self._scalar_index.append(index)
 
+        # The bytes of the items of every column, if the memory is accounted.
+        self._item_bytes = [deque() for _ in self._data] if memory is not None else None
         self._sealed = False
         self._size = 0
         self._lock = threading.Lock()
@@ -50,16 +66,21 @@ class DataQueue:
 
     def put(self, inputs: Union[Tuple, List]) -> bool:
         assert len(inputs) == self._schema.size()
+        sizes = self._charge([[item] for item in inputs]) if self._memory is not None else None
         with self._not_full:
             if self._sealed:
-                return False
+                return self._refund(sizes)
 
             if self._max_size > 0:
-                while self.size >= self._max_size:
+                while self.size >= self._max_size and not self._sealed:
                     self._not_full.wait()
+                if self._sealed:
+                    return self._refund(sizes)
 
             for i in range(len(inputs)):
                 self._data[i].put(inputs[i])
+            if sizes is not None:
+                self._add_bytes(sizes)
 
             self._size = self._get_size()
             if self._size > 0:
@@ -72,13 +93,16 @@ class DataQueue:
 
     def batch_put(self, batch_inputs: List[List]) -> bool:
         assert len(batch_inputs) == self._schema.size()
+        sizes = self._charge(batch_inputs) if self._memory is not None else None
         with self._not_full:
             if self._sealed:
-                return False
+                return self._refund(sizes)
 
             if self._max_size > 0:
-                while self.size >= self._max_size:
+                while self.size >= self._max_size and not self._sealed:
                     self._not_full.wait()
+                if self._sealed:
+                    return self._refund(sizes)
 
             for col_index in range(self._schema.size()):
                 if self._schema.get_col_type(col_index) == ColumnType.SCALAR:
@@ -86,6 +110,8 @@ class DataQueue:
                 else:
                     for item in batch_inputs[col_index]:
                         self._data[col_index].put(item)
+            if sizes is not None:
+                self._add_bytes(sizes)
 
             self._size = self._get_size()
             if self._size > 0:
@@ -117,27 +143,111 @@ class DataQueue:
             ret = []
             for col in self._data:
                 ret.append(col.get())
+            if self._item_bytes is not None:
+                self._free_bytes(ret)
             self._size -= 1
             self._readed = True
             self._not_full.notify()
             return ret
 
+    def wait_readable(self, ready: Callable[[], bool]):
+        """
+        Wait until a row can be read, the queue is sealed, or `ready()` becomes True, `wake` makes the reader
+        check `ready()` again.
+        """
+        with self._not_empty:
+            while self._size <= 0 and not self._sealed and not ready():
+                self._not_empty.wait()
+
+    def wake(self):
+        with self._not_empty:
+            self._not_empty.notify_all()
+
     def get_dict(self, cols: List[str] = None) -> Optional[Dict]:
         data = self.get()
         if data is None:
             return None
 
-        ret = {}
         names = self._schema.col_names
         if cols is None:
-            for i, name in enumerate(names):
+            return dict(zip(names, data))
+
+        ret = {}
+        for i, name in enumerate(names):
+            if name in cols:
                 ret[name] = data[i]
-        else:
-            for i, name in enumerate(names):
-                if name in cols:
-                    ret[name] = data[i]
         return ret
 
+    def _charge(self, cols: List[List]) -> List[List[int]]:
+        """
+        Charge the bytes of the items to the memory account, waiting for the budget unless the queue is empty,
+        so that the calls always make progress.
+        """
+        sizes = []
+        for i, items in enumerate(cols):
+            if self._schema.col_types[i] == ColumnType.SCALAR:
+                items = items[:1]
+            sizes.append([sizeof(item) for item in items if item is not Empty()])
+        total = sum(sum(col_sizes) for col_sizes in sizes)
+        if total > 0:
+            self._memory.charge(total, lambda: self._sealed or self._nbytes == 0)
+        return sizes
+
+    def _refund(self, sizes: List[List[int]]) -> bool:
+        if sizes is not None:
+            self._memory.credit(sum(sum(col_sizes) for col_sizes in sizes))
+        return False
+
+    def _add_bytes(self, sizes: List[List[int]]):
+        freed = 0
+        for i, col_sizes in enumerate(sizes):
+            if not col_sizes:
+                continue
+            if i in self._scalar_index:
+                # The new value of a scalar column replaces the old one.
+                while self._item_bytes[i]:
+                    freed += self._item_bytes[i].pop()
+            self._item_bytes[i].extend(col_sizes)
+        self._nbytes += sum(sum(col_sizes) for col_sizes in sizes) - freed
+        self._peak_nbytes = max(self._peak_nbytes, self._nbytes)
+        if freed:
+            self._memory.credit(freed)
+
+    def _free_bytes(self, row: List):
+        freed = 0
+        for i in self._queue_index:
+            if row[i] is not Empty() and self._item_bytes[i]:
+                freed += self._item_bytes[i].popleft()
+        if freed:
+            self._nbytes -= freed
+            self._memory.credit(freed)
+
+    def release_memory(self):
+        """
+        Credit the bytes of the rows left in the queue back to the memory account, e.g. the scalar columns
+        once the call finishes.
+        """
+        if self._memory is None:
+            return
+        with self._lock:
+            freed = self._nbytes
+            self._nbytes = 0
+            for col_bytes in self._item_bytes:
+                col_bytes.clear()
+        if freed:
+            self._memory.credit(freed)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The approximate bytes of the rows in the queue, 0 if the memory is not accounted.
+        """
+        return self._nbytes
+
+    @property
+    def peak_nbytes(self) -> int:
+        return self._peak_nbytes
+
     def to_list(self, kv_format=False):
         if not self.sealed:
             raise RuntimeError('The queue is not sealed')
@@ -173,6 +283,7 @@ class DataQueue:
             self._sealed = True
             self._not_empty.notify_all()
             self._not_full.notify_all()
+        self.release_memory()
 
     def seal(self):
         with self._lock:
@@ -184,6 +295,9 @@ class DataQueue:
                 self._size = self._get_size()
             self._not_empty.notify_all()
             self._not_full.notify_all()
+        if self._memory is not None:
+            # The puts waiting for the memory budget go on once the queue is sealed.
+            self._memory.notify()
 
     @property
     def sealed(self) -> bool:
@@ -243,6 +357,13 @@ class DataQueue:
     def col_type(self, col_name):
         return self.type_schema[self.schema.index(col_name)]
 
+    @property
+    def dropped_rows(self) -> int:
+        """
+        For debug, the rows of the queue columns not kept by the caps of `keep_rows` and `keep_bytes`.
+        """
+        return max((col.dropped for col in self._data if isinstance(col, _ListColumn)), default=0)
+
     def reset_size(self):
         """
         For debug, read data repeatedly.
@@ -274,17 +395,20 @@ class _Schema:
         for col in schema_info:
             self._cols.append(_ColumnInfo(*col))
         self._size = len(schema_info)
+        # Read on every row, built once.
+        self._col_names = [col.name for col in self._cols]
+        self._col_types = [col.col_type for col in self._cols]
 
     def size(self):
         return self._size
 
     @property
     def col_names(self):
-        return [col.name for col in self._cols]
+        return self._col_names
 
     @property
     def col_types(self):
-        return [col.col_type for col in self._cols]
+        return self._col_types
 
     def get_col_name(self, index):
         assert index < self._size
@@ -337,32 +461,107 @@ class _QueueColumn:
         return len(self._q)
 
 
+_IMMUTABLE_TYPES = (int, float, complex, bool, str, bytes, type(None), Empty, np.generic)
+
+
+def snapshot(data, copy_data: bool = True):
+    """
+    A snapshot of a traced value that the next nodes can not change: the immutable values and the read-only arrays
+    are referenced, the writable arrays are copied and the other values are deep-copied. With `copy_data` False the
+    value is always referenced.
+
+    Examples:
+        >>> import numpy as np
+        >>> from towhee.runtime.data_queue import snapshot
+        >>> arr, frozen = np.zeros(3), np.zeros(3)
+        >>> frozen.flags.writeable = False
+        >>> snapshot(arr) is arr, snapshot(frozen) is frozen, snapshot(('a', frozen))[1] is frozen
+        (False, True, True)
+    """
+    if not copy_data or isinstance(data, _IMMUTABLE_TYPES):
+        return data
+    if isinstance(data, np.ndarray):
+        return data if not data.flags.writeable else data.copy()
+    if isinstance(data, tuple) and type(data) is tuple:  # pylint: disable=unidiomatic-typecheck
+        items = tuple(snapshot(item) for item in data)
+        return data if all(a is b for a, b in zip(items, data)) else items
+    return copy.deepcopy(data)
+
+
+class _TraceCap:
+    """
+    The rows kept by the list columns of a queue: the first `keep_rows` rows within `keep_bytes` bytes. The first
+    column putting a row decides, the other columns follow for their row at the same position.
+    """
+
+    def __init__(self, keep_rows: int = None, keep_bytes: int = None):
+        self._keep_rows = keep_rows
+        self._keep_bytes = keep_bytes
+        self._kept_rows = 0
+        self._kept_bytes = 0
+
+    def keep(self, position: int, data) -> bool:
+        if position < self._kept_rows:
+            if self._keep_bytes is not None:
+                self._kept_bytes += sizeof(data)
+            return True
+        if position > self._kept_rows or (self._keep_rows is not None and self._kept_rows >= self._keep_rows):
+            return False
+        if self._keep_bytes is not None:
+            nbytes = sizeof(data)
+            if self._kept_bytes + nbytes > self._keep_bytes:
+                # Stop at the first row over the bytes, the later rows are not kept either.
+                self._keep_rows = self._kept_rows
+                return False
+            self._kept_bytes += nbytes
+        self._kept_rows += 1
+        return True
+
+
 class _ListColumn:
     """
-    List column, for debug.
+    List column, for debug. The rows kept by the cap are read again after `reset_size`, the others are dropped
+    once read.
     """
 
-    def __init__(self):
+    def __init__(self, cap: _TraceCap = None, copy_data: bool = True):
         self._q = []
         self._index = 0
+        self._rest = deque()
+        self._cap = cap if cap is not None else _TraceCap()
+        self._copy_data = copy_data
+        self._dropped = 0
 
     def get(self):
-        if len(self._q) == self._index:
-            return Empty()
-        self._index += 1
-        return copy.deepcopy(self._q[self._index - 1])
+        if self._index < len(self._q):
+            self._index += 1
+            return snapshot(self._q[self._index - 1], self._copy_data)
+        if self._rest:
+            return self._rest.popleft()
+        return Empty()
 
     def put(self, data) -> bool:
         if data is Empty():
             return
-        self._q.append(data)
+        if not self._rest and self._cap.keep(len(self._q), data):
+            self._q.append(data)
+        else:
+            self._dropped += 1
+            self._rest.append(data)
 
     def size(self):
-        return len(self._q) - self._index
+        return len(self._q) - self._index + len(self._rest)
 
     def reset_size(self):
         self._index = 0
 
+    @property
+    def dropped(self) -> int:
+        """
+        The rows not kept.
+        """
+        return self._dropped
+
 
 class _ScalarColumn:
     """
@@ -0,0 +1,163 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, List, Union
+
+from towhee.utils.log import engine_log
+
+
+class DeadLetterSink:
+    """
+    Where the rows failed in the nodes with a 'skip' or 'default' error policy are recorded.
+
+    A record is a dict with the keys 'node', 'row' (the index of the row in the input of the node
+    for the current call), 'inputs', 'error' and 'traceback'.
+    """
+    def write(self, record: Dict):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class ListSink(DeadLetterSink):
+    """
+    Keep the records in memory.
+
+    Args:
+        max_size (`int`): Keep the last `max_size` records only, defaults to keep all.
+    """
+    def __init__(self, max_size: int = None):
+        self._lock = threading.Lock()
+        self._records = deque(maxlen=max_size)
+
+    def write(self, record: Dict):
+        with self._lock:
+            self._records.append(record)
+
+    @property
+    def records(self) -> List[Dict]:
+        with self._lock:
+            return list(self._records)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+    def __len__(self):
+        return len(self._records)
+
+
+class JSONLSink(DeadLetterSink):
+    """
+    Append the records to a JSON Lines file, the inputs that can not be serialized are written as their repr.
+
+    Args:
+        file_path (`Union[str, Path]`): The file path.
+    """
+    def __init__(self, file_path: Union[str, Path]):
+        self._file_path = Path(file_path)
+        self._lock = threading.Lock()
+        self._file = None
+
+    @property
+    def file_path(self) -> Path:
+        return self._file_path
+
+    def write(self, record: Dict):
+        line = json.dumps(record, default=repr)
+        with self._lock:
+            if self._file is None:
+                self._file_path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self._file_path, 'a', encoding='utf-8')  # pylint: disable=consider-using-with
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class ErrorPolicy:
+    """
+    What a node does when its operator raises on a row, `reduce` always fails the call.
+
+    - 'fail': the call fails, the default.
+    - 'skip': the row is dropped, the window nodes output nothing for the window and `filter` drops the row
+      from its outputs.
+    - 'default': the row outputs `default` instead, `filter` keeps the row whatever the default.
+
+    The failed rows of 'skip' and 'default' are recorded to `sink`, defaults to a `ListSink`.
+
+    Args:
+        policy (`str`): One of 'fail', 'skip' and 'default'.
+        default (`Any`): The output of the failed rows for 'default'.
+        sink (`DeadLetterSink`): Where the failed rows are recorded.
+
+    Examples:
+        >>> from towhee.runtime.error_policy import ErrorPolicy
+        >>> policy = ErrorPolicy('skip')
+        >>> policy.record('node', 0, (1,), ValueError('bad row'), 'Traceback...')
+        >>> policy.sink.records[0]['error']
+        'ValueError: bad row'
+    """
+    FAIL = 'fail'
+    SKIP = 'skip'
+    DEFAULT = 'default'
+
+    def __init__(self, policy: str = FAIL, default: Any = None, sink: DeadLetterSink = None):
+        if policy not in (self.FAIL, self.SKIP, self.DEFAULT):
+            raise ValueError('Unknown error policy {}, should be one of {}.'.format(policy, [self.FAIL, self.SKIP, self.DEFAULT]))
+        self._policy = policy
+        self._default = default
+        self._sink = sink if sink is not None else ListSink()
+
+    @property
+    def policy(self) -> str:
+        return self._policy
+
+    @property
+    def default(self) -> Any:
+        return self._default
+
+    @property
+    def sink(self) -> DeadLetterSink:
+        return self._sink
+
+    def with_node_config(self, config: 'NodeConfig') -> 'ErrorPolicy':
+        """
+        The policy of a node, the `error_policy` and `error_default` of the node config override this policy.
+        """
+        node_policy = getattr(config, 'error_policy', None)
+        if node_policy is None:
+            return self
+        return ErrorPolicy(node_policy, getattr(config, 'error_default', None), self._sink)
+
+    def record(self, node: str, row: int, inputs: Any, error: Exception, tb: str):
+        try:
+            self._sink.write({
+                'node': node,
+                'row': row,
+                'inputs': inputs,
+                'error': '{}: {}'.format(type(error).__name__, error),
+                'traceback': tb,
+            })
+        except Exception as e:  # pylint: disable=broad-except
+            engine_log.error('Write the dead letter of node %s failed: %s', node, str(e))
@@ -0,0 +1,304 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import json
+import hashlib
+import threading
+from pathlib import Path
+from types import MappingProxyType
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple, Union
+
+from towhee.runtime.dag_repr import DAGRepr
+from towhee.runtime.data_queue import ColumnType
+from towhee.runtime.node_config import NodeConfig
+from towhee.runtime.node_repr import NodeRepr, IterationRepr, OperatorRepr
+from towhee.runtime.schema_repr import SchemaRepr
+from towhee.runtime.constants import InputConst, OutputConst, OPType, RouteConst
+from towhee.utils.log import engine_log
+
+
+PLAN_VERSION = 1
+
+_MEMORY_CACHE_SIZE = 128
+
+
+def dag_fingerprint(dag: Dict[str, Any]) -> Optional[str]:
+    """
+    The hash of the structure of a dag dictionary.
+
+    Only the schemas, the iterations and the order of the nodes are hashed, the node ids, operators
+    and configs are not, so the pipelines built by the same code share the fingerprint. Returns None
+    if the dag can not be cached, i.e. it contains pipeline operators which are inlined at compile time.
+
+    Examples:
+        >>> from towhee import pipe
+        >>> from towhee.runtime.execution_plan import dag_fingerprint
+        >>> p1 = pipe.input('a').map('a', 'b', lambda x: x + 1)
+        >>> p2 = pipe.input('a').map('a', 'b', lambda x: x * 2)
+        >>> dag_fingerprint(p1.dag) == dag_fingerprint(p2.dag)
+        True
+    """
+    index = dict((uid, i) for i, uid in enumerate(dag))
+    items = []
+    for uid, node in dag.items():
+        if node['op_info']['type'] == OPType.PIPELINE:
+            return None
+        next_nodes = node.get('next_nodes') or []
+        if any(n not in index for n in next_nodes):
+            return None
+        param = node['iter_info']['param']
+        if node['iter_info']['type'] == RouteConst.name:
+            # The branches are keyed by the node ids.
+            param = sorted([index[n], list(keys)] for n, keys in param[RouteConst.param.branches].items() if n in index)
+        items.append([
+            uid if uid in [InputConst.name, OutputConst.name] else '',
+            node['inputs'],
+            node['outputs'],
+            node['iter_info']['type'],
+            param,
+            [index[n] for n in next_nodes],
+        ])
+    data = json.dumps([PLAN_VERSION, items], sort_keys=True, default=repr)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+class ExecutionPlan:
+    """
+    The compiled form of a pipeline dag: the validated nodes, the topological order, the schemas of
+    the edges and the column index of every edge. The plan is read only and shared by all the calls
+    of a pipeline.
+
+    Args:
+        dag_repr (`DAGRepr`): The validated dag.
+        fingerprint (`str`): The structural fingerprint of the dag, None if the plan can not be cached.
+    """
+    def __init__(self, dag_repr: DAGRepr, fingerprint: str = None):
+        self._dag_repr = dag_repr
+        self._fingerprint = fingerprint
+        self._top_sort = tuple(dag_repr.top_sort)
+        self._nodes = MappingProxyType(dag_repr.nodes)
+        self._edges = MappingProxyType(dag_repr.edges)
+        self._column_index = MappingProxyType(dict(
+            (eid, MappingProxyType(dict((name, i) for i, (name, _) in enumerate(edge['data']))))
+            for eid, edge in dag_repr.edges.items()
+        ))
+
+    @property
+    def dag_repr(self) -> DAGRepr:
+        return self._dag_repr
+
+    @property
+    def fingerprint(self) -> Optional[str]:
+        return self._fingerprint
+
+    @property
+    def top_sort(self) -> Tuple[str]:
+        return self._top_sort
+
+    @property
+    def nodes(self) -> MappingProxyType:
+        return self._nodes
+
+    @property
+    def edges(self) -> MappingProxyType:
+        return self._edges
+
+    @property
+    def column_index(self) -> MappingProxyType:
+        """
+        The position of every column in the rows of an edge, `{edge_id: {column: index}}`.
+        """
+        return self._column_index
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        The json serializable structure of the plan, the nodes are referred to by their position in the dag.
+        """
+        if self._fingerprint is None:
+            raise ValueError('The plan can not be serialized, its dag contains pipeline operators.')
+
+        def _schema(schema):
+            return list(schema) if schema is not None else None
+
+        index = dict((uid, i) for i, uid in enumerate(self._nodes))
+        return {
+            'version': PLAN_VERSION,
+            'fingerprint': self._fingerprint,
+            'top_sort': [index[uid] for uid in self._top_sort],
+            'nodes': [
+                {
+                    'inputs': _schema(node.inputs),
+                    'outputs': _schema(node.outputs),
+                    'in_edges': node.in_edges,
+                    'out_edges': node.out_edges,
+                } for node in self._nodes.values()
+            ],
+            'edges': dict(
+                (
+                    str(eid),
+                    {
+                        'schema': [[name, s.type.name] for name, s in edge['schema'].items()],
+                        'data': [[name, t.name] for name, t in edge['data']],
+                    }
+                ) for eid, edge in self._edges.items()
+            ),
+        }
+
+    @staticmethod
+    def from_dict(plan_dict: Dict[str, Any], dag: Dict[str, Any]) -> 'ExecutionPlan':
+        """
+        Bind a serialized plan to the nodes and operators of a dag dictionary with the same fingerprint.
+        """
+        fingerprint = dag_fingerprint(dag)
+        if plan_dict.get('version') != PLAN_VERSION or fingerprint is None or plan_dict.get('fingerprint') != fingerprint:
+            raise ValueError('The plan does not match the dag.')
+
+        def _schema(schema):
+            return tuple(schema) if schema is not None else None
+
+        dag = DAGRepr.set_node_configs(dict(dag))
+        uids = list(dag)
+        nodes = {}
+        for uid, node in zip(uids, plan_dict['nodes']):
+            val = dag[uid]
+            nodes[uid] = NodeRepr.construct(
+                uid=uid,
+                inputs=_schema(node['inputs']),
+                outputs=_schema(node['outputs']),
+                iter_info=IterationRepr(**val['iter_info']),
+                op_info=OperatorRepr(**val['op_info']),
+                config=NodeConfig(**val['config']),
+                next_nodes=val['next_nodes'],
+                in_edges=list(node['in_edges']),
+                out_edges=list(node['out_edges']),
+            )
+
+        edges = {}
+        for eid, edge in plan_dict['edges'].items():
+            edges[int(eid)] = {
+                'schema': dict((name, SchemaRepr.construct(name=name, type=ColumnType[t])) for name, t in edge['schema']),
+                'data': [(name, ColumnType[t]) for name, t in edge['data']],
+            }
+        top_sort = [uids[i] for i in plan_dict['top_sort']]
+        return ExecutionPlan(DAGRepr.construct(nodes=nodes, edges=edges, dag_dict=dag, top_list=top_sort), fingerprint)
+
+    def save(self, file_path: Union[str, Path]):
+        """
+        Write the plan to a json file.
+        """
+        file_path = Path(file_path)
+        tmp_path = file_path.with_name(file_path.name + '.{}.tmp'.format(os.getpid()))
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, file_path)
+
+    @staticmethod
+    def load(file_path: Union[str, Path], dag: Dict[str, Any]) -> 'ExecutionPlan':
+        """
+        Read the plan from a json file written by `save` and bind it to the dag dictionary.
+        """
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return ExecutionPlan.from_dict(json.load(f), dag)
+
+
+_PLAN_CACHE: 'OrderedDict[str, Dict]' = OrderedDict()
+_PLAN_CACHE_LOCK = threading.Lock()
+_PLAN_CACHE_DIR: Optional[Path] = None
+
+
+def set_plan_cache_dir(cache_dir: Union[str, Path, None]):
+    """
+    Keep the compiled plans in the directory, so the processes building the same pipelines skip the
+    compilation, set None to disable the disk cache.
+    """
+    global _PLAN_CACHE_DIR
+    _PLAN_CACHE_DIR = Path(cache_dir) if cache_dir is not None else None
+    if _PLAN_CACHE_DIR is not None:
+        _PLAN_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def clear_plan_cache():
+    with _PLAN_CACHE_LOCK:
+        _PLAN_CACHE.clear()
+
+
+def _get_cached(fingerprint: str) -> Optional[Dict]:
+    with _PLAN_CACHE_LOCK:
+        if fingerprint in _PLAN_CACHE:
+            _PLAN_CACHE.move_to_end(fingerprint)
+            return _PLAN_CACHE[fingerprint]
+
+    if _PLAN_CACHE_DIR is None:
+        return None
+    file_path = _PLAN_CACHE_DIR / (fingerprint + '.json')
+    if not file_path.is_file():
+        return None
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            plan_dict = json.load(f)
+    except (OSError, ValueError) as e:
+        engine_log.warning('Read the cached plan %s failed: %s', file_path, str(e))
+        return None
+    _put_cached(fingerprint, plan_dict)
+    return plan_dict
+
+
+def _put_cached(fingerprint: str, plan_dict: Dict):
+    with _PLAN_CACHE_LOCK:
+        _PLAN_CACHE[fingerprint] = plan_dict
+        _PLAN_CACHE.move_to_end(fingerprint)
+        while len(_PLAN_CACHE) > _MEMORY_CACHE_SIZE:
+            _PLAN_CACHE.popitem(last=False)
+
+
+def compile_dag(dag: Dict[str, Any]) -> ExecutionPlan:
+    """
+    Compile the dag dictionary to an `ExecutionPlan`.
+
+    The validation, topological sort and schema inference run once for every dag structure, later
+    pipelines with the same fingerprint reuse the plan from the memory cache, or from the disk cache
+    if `set_plan_cache_dir` is set.
+
+    Examples:
+        >>> from towhee import pipe
+        >>> from towhee.runtime.execution_plan import compile_dag
+        >>> p = pipe.input('a').map('a', 'b', lambda x: x + 1).output('b')
+        >>> plan = compile_dag(p.dag_repr.dag_dict)
+        >>> [plan.nodes[uid].name for uid in plan.top_sort]
+        ['_input', 'lambda-0', '_output']
+        >>> dict(plan.column_index[plan.nodes['_output'].out_edges[0]])
+        {'b': 0}
+    """
+    fingerprint = dag_fingerprint(dag)
+    if fingerprint is None:
+        return ExecutionPlan(DAGRepr.from_dict(dag))
+
+    plan_dict = _get_cached(fingerprint)
+    if plan_dict is not None:
+        try:
+            return ExecutionPlan.from_dict(plan_dict, dag)
+        except Exception as e:  # pylint: disable=broad-except
+            engine_log.warning('Bind the cached plan %s failed, compile the dag again: %s', fingerprint, str(e))
+
+    plan = ExecutionPlan(DAGRepr.from_dict(dag), fingerprint)
+    plan_dict = plan.to_dict()
+    _put_cached(fingerprint, plan_dict)
+    if _PLAN_CACHE_DIR is not None:
+        try:
+            plan.save(_PLAN_CACHE_DIR / (fingerprint + '.json'))
+        except OSError as e:
+            engine_log.warning('Save the plan %s failed: %s', fingerprint, str(e))
+    return plan
@@ -0,0 +1,150 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import traceback
+from collections import deque
+from typing import Dict, List, Optional, Tuple, Union
+
+from towhee.runtime.data_queue import DataQueue, ColumnType, Empty
+from towhee.runtime.constants import InputConst, OutputConst, MapConst, FilterConst
+from towhee.runtime.nodes import create_node
+from towhee.runtime.time_profiler import TimeProfiler
+from towhee.runtime.thread_budget import intra_op_threads
+from towhee.runtime.cancellation import PipelineCancelledError, current_token
+
+
+def linear_chain(plan: 'ExecutionPlan') -> Optional[List[str]]:
+    """
+    The nodes from `_input` to `_output` if the pipeline is a chain of map and filter nodes on scalar columns,
+    None otherwise.
+    """
+    if any(col_type != ColumnType.SCALAR for edge in plan.edges.values() for _, col_type in edge['data']):
+        return None
+    nodes = plan.nodes
+    chain = []
+    uid = InputConst.name
+    while uid not in chain:
+        node = nodes[uid]
+        chain.append(uid)
+        if uid == OutputConst.name:
+            return chain if len(chain) == len(nodes) else None
+        if node.iter_info.type not in (MapConst.name, FilterConst.name) or len(node.in_edges) != 1 \
+                or len(node.next_nodes) != 1:
+            return None
+        uid = node.next_nodes[0]
+    return None
+
+
+class InlineRunner:
+    """
+    Run the calls of a pipeline of map and filter nodes on scalar columns on the calling thread, without the
+    data queues between the nodes and the thread pool. Every row is passed from node to node as a list, the
+    outputs are the same as running the graph.
+
+    The nodes are created at the first call and reused by the following calls, the hub operators are acquired
+    from the operator pool at the start of every call and released at the end of it.
+
+    Args:
+        plan (`ExecutionPlan`): The plan of the pipeline, `linear_chain(plan)` should not be None.
+        operator_pool (`OperatorPool`): The pool of the operators.
+
+    Examples:
+        >>> from towhee import pipe
+        >>> from towhee.runtime.inline_runner import InlineRunner
+        >>> p = pipe.input('a').map('a', 'b', lambda x: x + 1).filter('b', 'b', 'b', lambda x: x > 1).output('b')
+        >>> runner = InlineRunner(p.plan, p._operator_pool)
+        >>> runner((1, )).get(), runner((0, )).size
+        ([2], 0)
+    """
+    def __init__(self, plan: 'ExecutionPlan', operator_pool: 'OperatorPool'):
+        self._plan = plan
+        self._operator_pool = operator_pool
+        self._chain = linear_chain(plan)
+        assert self._chain is not None, 'The pipeline can not run inline.'
+        out_edge = plan.nodes[OutputConst.name].out_edges[0]
+        self._output_schema = plan.edges[out_edge]['data']
+        self._input_size = len(plan.edges[plan.nodes[InputConst.name].in_edges[0]]['data'])
+        self._lock = threading.Lock()
+        # The idle node chains.
+        self._free = deque()
+
+    def _create_nodes(self) -> List['Node']:
+        nodes = []
+        time_profiler = TimeProfiler(False)
+        edges = self._plan.edges
+        for uid in self._chain:
+            node_repr = self._plan.nodes[uid]
+            # The queues only carry the schemas, the nodes read their column indexes from them.
+            in_ques = [DataQueue(edges[edge]['data'], max_size=0) for edge in node_repr.in_edges]
+            out_ques = [DataQueue(edges[edge]['data'], max_size=0) for edge in node_repr.out_edges]
+            nodes.append(create_node(node_repr, self._operator_pool, in_ques, out_ques, time_profiler))
+        return nodes
+
+    def _acquire(self) -> List['Node']:
+        with self._lock:
+            if self._free:
+                return self._free.pop()
+        return self._create_nodes()
+
+    def __call__(self, inputs: Union[Tuple, List], error_policies: Dict[str, 'ErrorPolicy'] = None,
+                 node_threads: Dict[str, int] = None) -> DataQueue:
+        """
+        Run the pipeline on `inputs`, the errors are raised as `RuntimeError` with the same message as the graph.
+        The call is stopped before the next node with `PipelineCancelledError` once the token of its `cancel_scope`
+        is cancelled.
+        """
+        assert len(inputs) == self._input_size
+        nodes = self._acquire()
+        initialized = []
+        try:
+            for node in nodes:
+                node.reset()
+                if node_threads and node.uid in node_threads:
+                    node.intra_op_threads = node_threads[node.uid]
+                if not node.initialize():
+                    raise RuntimeError(node.err_msg)
+                initialized.append(node)
+                if error_policies and node.uid in error_policies:
+                    node.error_policy = error_policies[node.uid]
+            return self._run(nodes, list(inputs))
+        finally:
+            for node in initialized:
+                node.release_op()
+            with self._lock:
+                self._free.append(nodes)
+
+    def _run(self, nodes: List['Node'], row: List) -> DataQueue:
+        output = DataQueue(self._output_schema, max_size=0)
+        token = current_token()
+        for node in nodes:
+            if token is not None and token.cancelled:
+                raise PipelineCancelledError('The pipeline call has been cancelled.')
+            # A row without any value is not read from the queue in the graph.
+            if row is None or all(item is Empty() for item in row):
+                break
+            try:
+                if node.intra_op_threads is None:
+                    row = node.process_row(row)
+                else:
+                    with intra_op_threads(node.intra_op_threads):
+                        row = node.process_row(row)
+            except Exception as e:
+                err = '{} runs failed, error msg: {}, {}'.format(str(node), e, traceback.format_exc())
+                raise RuntimeError(err + '\n') from e
+        else:
+            if row is not None:
+                output.put(row)
+        output.seal()
+        return output
@@ -0,0 +1,213 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sys
+import time
+import threading
+from typing import Any, Callable, Dict
+
+import numpy as np
+
+from .admission import PipelineOverloadedError
+
+
+class PipelineMemoryError(PipelineOverloadedError):
+    """
+    The pipeline call is rejected because the data of the running calls is over the memory budget.
+    """
+
+
+def sizeof(obj: Any, depth: int = 3) -> int:
+    """
+    The approximate bytes of a value: the `nbytes` of the arrays and tensors, the length of `bytes` and `str`,
+    the sum of the items of the lists, tuples and dicts up to `depth` levels, and `sys.getsizeof` otherwise.
+
+    Examples:
+        >>> import numpy as np
+        >>> from towhee.runtime.memory_budget import sizeof
+        >>> sizeof(np.zeros((2, 4), dtype=np.float32)), sizeof(b'abc'), sizeof(['ab', np.zeros(8, dtype=np.uint8)])
+        (32, 3, 10)
+    """
+    if obj is None:
+        return 0
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, (bytes, bytearray, str)):
+        return len(obj)
+    if isinstance(obj, memoryview):
+        return obj.nbytes
+    if depth > 0 and isinstance(obj, (list, tuple, set, frozenset)):
+        return sum(sizeof(item, depth - 1) for item in obj)
+    if depth > 0 and isinstance(obj, dict):
+        return sum(sizeof(k, depth - 1) + sizeof(v, depth - 1) for k, v in obj.items())
+    # The torch tensors.
+    if hasattr(obj, 'element_size') and hasattr(obj, 'nelement'):
+        try:
+            return obj.element_size() * obj.nelement()
+        except Exception:  # pylint: disable=broad-except
+            pass
+    return sys.getsizeof(obj)
+
+
+class MemoryAccount:
+    """
+    The bytes of the queues of a node charged to a `MemoryBudget`.
+    """
+    def __init__(self, budget: 'MemoryBudget', key: str):
+        self._budget = budget
+        self._key = key
+
+    @property
+    def key(self) -> str:
+        return self._key
+
+    def charge(self, nbytes: int, exempt: Callable[[], bool] = None):
+        self._budget.charge(self._key, nbytes, exempt)
+
+    def credit(self, nbytes: int):
+        self._budget.credit(self._key, nbytes)
+
+    def notify(self):
+        self._budget.notify()
+
+
+class MemoryBudget:
+    """
+    The approximate bytes of the rows in the queues of the running calls of a pipeline, by the node producing them.
+
+    If `max_bytes` is set, a node putting a row over the budget waits until the next nodes read enough rows, unless
+    the queue is empty, so that the calls always make progress. A new call while the budget is used up or a node
+    waits for it waits until the budget is freed if `policy` is 'block', and is rejected with `PipelineMemoryError`
+    if `policy` is 'reject' or it waited longer than `timeout`.
+
+    Args:
+        max_bytes (`int`): The budget, defaults to only count the bytes.
+        policy (`str`): 'block' or 'reject', what to do with the new calls over the budget.
+        timeout (`float`): The maximum seconds a new call waits for the budget, defaults to wait forever.
+
+    Examples:
+        >>> from towhee.runtime.memory_budget import MemoryBudget, PipelineMemoryError
+        >>> budget = MemoryBudget(max_bytes=100, policy='reject')
+        >>> budget.account('map').charge(120, exempt=lambda: True)
+        >>> try:
+        ...     budget.admit()
+        ... except PipelineMemoryError:
+        ...     print('rejected')
+        rejected
+        >>> budget.account('map').credit(120)
+        >>> budget.admit()
+        >>> budget.stats()['peak_bytes'], budget.stats()['rejected']
+        (120, 1)
+    """
+    def __init__(self, max_bytes: int = None, policy: str = 'block', timeout: float = None):
+        if max_bytes is not None and max_bytes < 1:
+            raise ValueError('The memory budget should be positive, got {}.'.format(max_bytes))
+        if policy not in ['block', 'reject']:
+            raise ValueError('Unknown memory policy {}, should be one of block and reject.'.format(policy))
+        self._max_bytes = max_bytes
+        self._policy = policy
+        self._timeout = timeout
+        self._cond = threading.Condition()
+        self._used = 0
+        self._peak = 0
+        self._nodes = {}
+        self._waiting = 0
+        self._blocked = 0
+        self._rejected = 0
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    def account(self, key: str) -> MemoryAccount:
+        return MemoryAccount(self, key)
+
+    def _full(self, nbytes: int = 0) -> bool:
+        return self._max_bytes is not None and self._used + nbytes > self._max_bytes
+
+    def _overloaded(self) -> bool:
+        # The budget is used up, or a node waits for it.
+        return self._full(1) or self._blocked > 0
+
+    def admit(self, timeout: float = None):
+        """
+        Wait until the budget is not used up for a new call, `timeout` is the remaining time of the call.
+        """
+        timeouts = [t for t in (timeout, self._timeout) if t is not None]
+        timeout = min(timeouts) if timeouts else None
+        with self._cond:
+            if not self._overloaded():
+                return
+            if self._policy == 'reject':
+                self._rejected += 1
+                raise PipelineMemoryError('The pipeline is over its memory budget of {} bytes.'.format(self._max_bytes))
+            deadline = time.monotonic() + timeout if timeout is not None else None
+            self._waiting += 1
+            try:
+                while self._overloaded():
+                    remaining = deadline - time.monotonic() if deadline is not None else None
+                    if remaining is not None and remaining <= 0:
+                        self._rejected += 1
+                        raise PipelineMemoryError('The pipeline call waited {}s for the memory budget of {} bytes.'.format(
+                            timeout, self._max_bytes))
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting -= 1
+
+    def charge(self, key: str, nbytes: int, exempt: Callable[[], bool] = None):
+        """
+        Charge `nbytes` to the node `key`, waiting for the budget until `exempt()` becomes True, if set. The budget
+        is notified when the bytes are credited or by `notify` when `exempt()` may have changed.
+        """
+        with self._cond:
+            if self._full(nbytes) and (exempt is None or not exempt()):
+                self._blocked += 1
+                try:
+                    while self._full(nbytes) and (exempt is None or not exempt()):
+                        self._cond.wait()
+                finally:
+                    self._blocked -= 1
+                    self._cond.notify_all()
+            self._used += nbytes
+            self._peak = max(self._peak, self._used)
+            self._nodes[key] = self._nodes.get(key, 0) + nbytes
+
+    def credit(self, key: str, nbytes: int):
+        with self._cond:
+            self._used -= nbytes
+            self._nodes[key] = self._nodes.get(key, 0) - nbytes
+            self._cond.notify_all()
+
+    def notify(self):
+        """
+        Wake the nodes waiting for the budget to check their `exempt` again.
+        """
+        with self._cond:
+            self._cond.notify_all()
+
+    def stats(self) -> Dict:
+        """
+        The budget, the used and the peak bytes, the bytes of the queues by the node producing them, the calls waiting
+        for the budget, the nodes waiting to put rows and the rejected calls.
+        """
+        with self._cond:
+            return {
+                'max_bytes': self._max_bytes,
+                'used_bytes': self._used,
+                'peak_bytes': self._peak,
+                'nodes': dict(self._nodes),
+                'waiting': self._waiting,
+                'blocked': self._blocked,
+                'rejected': self._rejected,
+            }
@@ -0,0 +1,147 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import multiprocessing
+from multiprocessing import util
+from typing import List
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from .data_queue import DataQueue
+from .runtime_pipeline import RuntimePipeline
+from .shm_transport import SharedArena, dumps, loads, discard, run_payload
+
+
+# The pipeline and the shared arena of the worker process.
+_WORKER_PIPELINE = None
+_WORKER_ARENA = None
+
+
+def _init_worker(dag_repr: 'DAGRepr', max_workers: int, arena: SharedArena):
+    global _WORKER_PIPELINE, _WORKER_ARENA  # pylint: disable=global-statement
+    _WORKER_PIPELINE = RuntimePipeline(dag_repr, max_workers=max_workers)
+    _WORKER_PIPELINE.preload()
+    _WORKER_ARENA = arena
+    # Stop the processes of the nodes before the worker exits, it waits for its child processes.
+    util.Finalize(None, _WORKER_PIPELINE.release_process_ops, exitpriority=10)
+
+
+def _ping():
+    return os.getpid()
+
+
+def _run_batch(payload: bytes) -> bytes:
+    return dumps([que.to_list() for que in _WORKER_PIPELINE.batch(loads(payload))], _WORKER_ARENA)
+
+
+class MultiProcessPipeline:
+    """
+    Run a pipeline in `num_workers` forked processes, for the pipelines bound by the GIL of pure Python operators.
+
+    Every worker builds the pipeline and its operators once at start, the inputs of `batch` are sharded to the
+    workers in chunks of `chunk_size` and the outputs are gathered back in the order of the inputs. The pipeline
+    is inherited by forking, so the operators and lambdas need not be picklable, but the inputs and the outputs
+    are sent with pickle. With `shared_memory`, the large arrays are sent as handles to a `SharedArena`
+    instead of being copied through the pipes.
+
+    Args:
+        pipeline (`RuntimePipeline`): The pipeline.
+        num_workers (`int`): The number of processes, defaults to the number of CPUs.
+        chunk_size (`int`): How many inputs of `batch` a worker runs at a time.
+        max_workers (`int`): The maximum number of threads of the pipeline in every worker.
+        shared_memory (`bool`): Send the large arrays through shared memory.
+
+    Examples:
+        >>> from towhee import pipe
+        >>> p = pipe.input('a').map('a', 'b', lambda x: x + 1).output('b')
+        >>> with p.multiprocess(num_workers=2) as mp:
+        ...     print(mp(1).get(), [q.get() for q in mp.batch([1, 2, 3])])
+        [2] [[2], [3], [4]]
+    """
+    def __init__(self, pipeline: RuntimePipeline, num_workers: int = None, chunk_size: int = 16, max_workers: int = None,
+                 shared_memory: bool = False):
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise RuntimeError('MultiProcessPipeline requires the fork start method, which is not available on this platform.')
+        self._num_workers = num_workers or os.cpu_count()
+        self._chunk_size = chunk_size
+        self._arena = SharedArena() if shared_memory else None
+        plan = pipeline.plan
+        self._output_schema = plan.edges[plan.nodes['_output'].out_edges[0]]['data']
+        self._executor = ProcessPoolExecutor(max_workers=self._num_workers,
+                                             mp_context=multiprocessing.get_context('fork'),
+                                             initializer=_init_worker,
+                                             initargs=(pipeline.dag_repr, max_workers, self._arena))
+        # Fork the workers now, before the pipeline starts more threads in this process.
+        self._executor.submit(_ping).result()
+
+    @property
+    def num_workers(self) -> int:
+        return self._num_workers
+
+    def _to_queue(self, rows: List[List]) -> DataQueue:
+        que = DataQueue(self._output_schema, max_size=0)
+        for row in rows:
+            que.put(row)
+        que.seal()
+        return que
+
+    def __call__(self, *inputs) -> DataQueue:
+        inputs = inputs[0] if len(inputs) == 1 else inputs
+        return self._to_queue(loads(run_payload(self._executor, _run_batch, dumps([inputs], self._arena)))[0])
+
+    def batch(self, batch_inputs) -> List[DataQueue]:
+        batch_inputs = list(batch_inputs)
+        chunks = [batch_inputs[i: i + self._chunk_size] for i in range(0, len(batch_inputs), self._chunk_size)]
+        payloads = [dumps(chunk, self._arena) for chunk in chunks]
+        futures, results, error = [], [], None
+        try:
+            for payload in payloads:
+                futures.append(self._executor.submit(_run_batch, payload))
+        except RuntimeError as e:
+            # The pool is shut down or broken.
+            for payload in payloads[len(futures):]:
+                discard(payload)
+            for future in futures:
+                future.cancel()
+            error = e
+        for payload, future in zip(payloads, futures):
+            try:
+                ret = future.result()
+            except (BrokenProcessPool, CancelledError) as e:
+                discard(payload)
+                error = error or e
+                continue
+            except Exception as e:  # pylint: disable=broad-except
+                error = error or e
+                continue
+            # The results of the other chunks are not loaded once a chunk fails, release them.
+            if error is None:
+                results.extend(loads(ret))
+            else:
+                discard(ret)
+        if error is not None:
+            raise error
+        return [self._to_queue(rows) for rows in results]
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        if self._arena is not None:
+            self._arena.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -12,7 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Dict, Optional, List
+from typing import Any, Dict, Optional, List
 
 from pydantic import BaseModel, Extra, validator
 
@@ -80,6 +80,56 @@ class NodeConfig(BaseModel, extra=Extra.allow):
     device: int = -1
     acc_info: Optional[AcceleratorConf] = None
     server: Optional[ServerConf] = None
+    error_policy: Optional[str] = None
+    error_default: Any = None
+    num_processes: Optional[int] = None
+    shared_memory: bool = False
+    intra_op_threads: Optional[int] = None
+    max_concurrency: Optional[int] = None
+    rate_limit: Optional[float] = None
+    rate_burst: Optional[int] = None
+    queue_size: Optional[int] = None
+    max_instances: Optional[int] = None
+    min_instances: Optional[int] = None
+    acquire_timeout: Optional[float] = None
+    idle_timeout: Optional[float] = None
+
+    @validator('num_processes', 'intra_op_threads', 'max_concurrency', 'rate_burst', 'queue_size',
+               'max_instances', 'min_instances')
+    @classmethod
+    def positive_match(cls, v, field):
+        if v is not None and v < 1:
+            raise ValueError(f'{field.name} should be a positive integer, got {v}')
+        return v
+
+    @validator('rate_limit')
+    @classmethod
+    def rate_limit_match(cls, v):
+        if v is not None and v <= 0:
+            raise ValueError(f'rate_limit should be a positive number, got {v}')
+        return v
+
+    @validator('acquire_timeout', 'idle_timeout')
+    @classmethod
+    def timeout_match(cls, v, field):
+        if v is not None and v <= 0:
+            raise ValueError(f'{field.name} should be a positive number of seconds, got {v}')
+        return v
+
+    @validator('min_instances')
+    @classmethod
+    def min_instances_match(cls, v, values):
+        max_instances = values.get('max_instances')
+        if v is not None and max_instances is not None and v > max_instances:
+            raise ValueError(f'min_instances {v} should not be larger than max_instances {max_instances}')
+        return v
+
+    @validator('error_policy')
+    @classmethod
+    def error_policy_match(cls, v):
+        if v is not None and v not in ['fail', 'skip', 'default']:
+            raise ValueError(f'Unkown error policy: {v}')
+        return v
 
 
 class TowheeConfig:
@@ -94,10 +144,12 @@ class TowheeConfig:
         return self._config
 
     @classmethod
-    def set_local_config(cls, device: int) -> 'TowheeConfig':
+    def set_local_config(cls, device: int, intra_op_threads: int = None) -> 'TowheeConfig':
         config = {
             'device': device
         }
+        if intra_op_threads is not None:
+            config['intra_op_threads'] = intra_op_threads
         return cls(config)
 
     @classmethod
@@ -19,6 +19,7 @@ from towhee.runtime.constants import (
     WindowConst,
     ReduceConst,
     FilterConst,
+    RouteConst,
     TimeWindowConst,
     FlatMapConst,
     ConcatConst,
@@ -33,6 +34,7 @@ from ._window_all import WindowAll
 from ._reduce import Reduce
 from ._concat import Concat
 from ._filter import Filter
+from ._route import Route
 from ._flat_map import FlatMap
 from ._output import Output
 from .node import NodeStatus
@@ -51,6 +53,9 @@ def create_node(node_repr, op_pool, inputs, outputs, time_profiler=None):
     if node_repr.iter_info.type == FilterConst.name:
         assert len(inputs) == 1
         return Filter(node_repr, op_pool, inputs, outputs, time_profiler)
+    if node_repr.iter_info.type == RouteConst.name:
+        assert len(inputs) == 1
+        return Route(node_repr, op_pool, inputs, outputs, time_profiler)
     if node_repr.iter_info.type == TimeWindowConst.name:
         assert len(inputs) == 1
         return TimeWindow(node_repr, op_pool, inputs, outputs, time_profiler)
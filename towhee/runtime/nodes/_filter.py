@@ -16,6 +16,7 @@ from typing import List
 
 from towhee.runtime.constants import FilterConst
 from towhee.runtime.data_queue import Empty
+from towhee.runtime.error_policy import ErrorPolicy
 from towhee.runtime.time_profiler import Event
 
 from .node import Node
@@ -39,16 +40,28 @@ class Filter(Node, SingleInputMixin):
                  out_ques: List['DataQueue'],
                  time_profiler: 'TimeProfiler'):
         super().__init__(node_repr, op_pool, in_ques, out_ques, time_profiler)
-        self._key_map = dict(zip(self._node_repr.outputs, self._node_repr.inputs))
+        self._filter_index = None
+
+    @property
+    def filter_index(self):
+        if self._filter_index is None:
+            schema = self.input_que.schema
+            self._filter_index = [schema.index(key) for key in self._node_repr.iter_info.param[FilterConst.param.filter_by]]
+        return self._filter_index
+
+    def _failed_outputs(self, policy: ErrorPolicy):
+        # Whatever the default, a failed row is kept under the 'default' policy, and dropped under 'skip'.
+        return policy.policy == ErrorPolicy.DEFAULT
 
     def process_step(self):
         self._time_profiler.record(self.uid, Event.queue_in)
-        data = self.read_row()
-        if data is None or not self.side_by_to_next(data):
+        data = self.read_values()
+        if data is None:
             return None
 
-        process_data = [data.get(key) for key in self._node_repr.iter_info.param[FilterConst.param.filter_by]]
+        process_data = [data[i] for i in self.filter_index]
         if any((i is Empty() for i in process_data)):
+            self.row_to_next(data)
             return None
 
         self._time_profiler.record(self.uid, Event.process_in)
@@ -56,8 +69,19 @@ class Filter(Node, SingleInputMixin):
         self._time_profiler.record(self.uid, Event.process_out)
         assert succ, msg
         self._time_profiler.record(self.uid, Event.queue_out)
-        if is_need:
-            output_map = {new_key: data[old_key] for new_key, old_key in self._key_map.items()}
-            self.data_to_next(output_map)
+        if is_need and is_need is not Empty():
+            # The outputs are the inputs renamed.
+            self.row_to_next(data, [data[i] for i in self.input_index])
+        else:
+            self.row_to_next(data)
 
+    def process_row(self, row):
+        process_data = [row[i] for i in self.filter_index]
+        if any((i is Empty() for i in process_data)):
+            return self.next_row(row)
 
+        succ, is_need, msg = self._call(process_data)
+        assert succ, msg
+        if is_need and is_need is not Empty():
+            return self.next_row(row, [row[i] for i in self.input_index])
+        return self.next_row(row)
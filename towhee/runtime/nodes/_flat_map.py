@@ -31,27 +31,37 @@ class FlatMap(Node, SingleInputMixin):
             ---0---1---2---3--->
     """
     def process_step(self):
+        if self._async_runner is not None:
+            return self.process_step_async()
         self._time_profiler.record(self.uid, Event.queue_in)
-        data = self.read_row()
-        if data is None or not self.side_by_to_next(data):
+        data = self.read_values()
+        if data is None:
             return None
-        process_data = [data.get(key) for key in self._node_repr.inputs]
+        process_data = [data[i] for i in self.input_index]
 
         if any((item is Empty() for item in process_data)):
+            self.row_to_next(data)
             return None
 
         self._time_profiler.record(self.uid, Event.process_in)
         succ, outputs, msg = self._call(process_data)
         assert succ, msg
+        self.emit(data, outputs)
+
+    def emit(self, data, outputs) -> bool:
+        # The row is dropped by the error policy.
+        if outputs is Empty() or not self.row_to_next(data):
+            return False
 
         size = len(self._node_repr.outputs)
         for output in outputs:
             if size > 1:
-                output_map = {self._node_repr.outputs[i]: output[i] for i in range(size)}
+                output_values = [output[i] for i in range(size)]
             else:
-                output_map = {self._node_repr.outputs[0]: output}
-            if not self.data_to_next(output_map):
-                return None
+                output_values = [output]
+            if not self.row_to_next(None, output_values):
+                return False
 
         self._time_profiler.record(self.uid, Event.process_out)
         self._time_profiler.record(self.uid, Event.queue_out)
+        return True
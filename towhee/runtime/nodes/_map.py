@@ -12,7 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Generator
+from typing import Callable
+from collections.abc import Generator
 
 from towhee.runtime.data_queue import Empty
 from towhee.runtime.time_profiler import Event
@@ -43,44 +44,77 @@ class Map(Node, SingleInputMixin):
                ---1---2---3---4--->
            [   map('input', 'output', func)    ]
                ---[0]---[0, 1]---[0, 1, 2]---[0, 1, 2, 3]--->
+
+           The items of the generator make up one row, so they are collected before the row moves on,
+           use flat_map to stream them row by row.
     """
 
     def process_step(self):
         """
         Called for each element.
         """
+        if self._async_runner is not None:
+            return self.process_step_async()
         self._time_profiler.record(self.uid, Event.queue_in)
-        data = self.read_row()
-        if data is None or not self.side_by_to_next(data):
+        data = self.read_values()
+        if data is None:
             return None
-        process_data = [data.get(key) for key in self._node_repr.inputs]
+        process_data = [data[i] for i in self.input_index]
 
         if any((item is Empty() for item in process_data)):
+            self.row_to_next(data)
             return None
 
         self._time_profiler.record(self.uid, Event.process_in)
         succ, outputs, msg = self._call(process_data)
         assert succ, msg
-        if isinstance(outputs, Generator):
-            outputs = self._get_from_generator(outputs, len(self._node_repr.outputs))
+        self.emit(data, outputs)
+
+    def emit(self, data, outputs) -> bool:
+        # The row is dropped by the error policy.
+        if outputs is Empty():
+            return False
+        output_values = self._output_values(outputs)
         self._time_profiler.record(self.uid, Event.process_out)
+        self._time_profiler.record(self.uid, Event.queue_out)
+        return self.row_to_next(data, output_values)
 
+    def process_row(self, row):
+        process_data = [row[i] for i in self.input_index]
+        if any((item is Empty() for item in process_data)):
+            return self.next_row(row)
+
+        succ, outputs, msg = self._call(process_data)
+        assert succ, msg
+        if outputs is Empty():
+            return None
+        return self.next_row(row, self._output_values(outputs))
+
+    def _call(self, inputs, fn: Callable = None):
+        """
+        Call the operator and collect the items of the generator it returns, so that the errors raised by the
+        generator are handled by the error policy as well.
+        """
+        if fn is None:
+            fn = self._op if self._async_runner is None else self._call_async
+        return super()._call(inputs, lambda *args: self._collect(fn(*args)))
+
+    def _collect(self, outputs):
+        if isinstance(outputs, Generator):
+            return self._get_from_generator(outputs, len(self._node_repr.outputs))
+        return outputs
+
+    def _output_values(self, outputs):
         size = len(self._node_repr.outputs)
         if size > 1:
-            output_map = dict((self._node_repr.outputs[i], outputs[i])
-                              for i in range(size))
-        elif size == 0:
+            return [outputs[i] for i in range(size)]
+        if size == 0:
             # ignore the op result
             # eg: ignore the milvus result
             # .map('vec', (), ops.ann_insert.milvus()),
-            output_map = {}
-        else:
-            # Use one col to store all op result.
-            output_map = {}
-            output_map[self._node_repr.outputs[0]] = outputs
-
-        self._time_profiler.record(self.uid, Event.queue_out)
-        self.data_to_next(output_map)
+            return []
+        # Use one col to store all op result.
+        return [outputs]
 
     def _get_from_generator(self, gen, size):
         if size == 1:
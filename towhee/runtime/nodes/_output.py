@@ -31,15 +31,18 @@ class Output(Node, SingleInputMixin):
     def process_step(self):
         self._time_profiler.record(self.uid, Event.queue_in)
 
-        data = self.read_row()
+        data = self.read_values()
         if data is None:
             return
 
         self._time_profiler.record(self.uid, Event.process_in)
         self._time_profiler.record(self.uid, Event.process_out)
 
-        if not self.data_to_next(data):
+        # The outputs of the node are the input columns.
+        if not self.row_to_next(None, [data[i] for i in self.input_index]):
             return
 
         self._time_profiler.record(self.uid, Event.queue_out)
 
+    def process_row(self, row):
+        return self.next_row(None, [row[i] for i in self.input_index])
@@ -30,6 +30,8 @@ class Reduce(Node, SingleInputMixin):
     Reduce the sequence to a single value
 
     """
+    # The operator consumes the whole stream, a failure can not be skipped.
+    row_level = False
 
     def __init__(self, node_repr: 'NodeRepr',
                  op_pool: 'OperatorPool',
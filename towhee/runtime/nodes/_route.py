@@ -0,0 +1,82 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import List
+
+from towhee.runtime.constants import RouteConst
+from towhee.runtime.data_queue import Empty
+from towhee.runtime.time_profiler import Event
+
+from .node import Node
+from ._single_input import SingleInputMixin
+
+
+class Route(Node, SingleInputMixin):
+    """
+    Route Operator.
+
+    Call the selector on the input columns once per row, and send the row only to the branches registered
+    with the returned key, the rows of no branch go to the default branches, which are the next nodes added
+    without `branch`. The other branches do not see the row at all.
+
+    i.e.
+            ---a---b---c--->
+        [   route('type', lambda t: t)   ]
+            ---a------c--->   .branch('a', 'c')
+            ------b------->   .branch('b')
+    """
+    def __init__(self, node_repr: 'NodeRepr',
+                 op_pool: 'OperatorPool',
+                 in_ques: List['DataQueue'],
+                 out_ques: List['DataQueue'],
+                 time_profiler: 'TimeProfiler'):
+        super().__init__(node_repr, op_pool, in_ques, out_ques, time_profiler)
+        branches = (self._node_repr.iter_info.param or {}).get(RouteConst.param.branches) or {}
+        self._branch_ques = {}
+        self._default_ques = []
+        # The out queues are in the order of the next nodes.
+        for i, uid in enumerate(self._node_repr.next_nodes[:len(self._output_ques)]):
+            keys = branches.get(uid)
+            if not keys:
+                self._default_ques.append(i)
+                continue
+            for key in keys:
+                self._branch_ques.setdefault(key, []).append(i)
+
+    def _select(self, data):
+        process_data = [data[i] for i in self.input_index]
+        if any((i is Empty() for i in process_data)):
+            return self._default_ques
+
+        self._time_profiler.record(self.uid, Event.process_in)
+        succ, key, msg = self._call(process_data)
+        self._time_profiler.record(self.uid, Event.process_out)
+        assert succ, msg
+        if key is Empty():
+            return self._default_ques
+        try:
+            return self._branch_ques.get(key, self._default_ques)
+        except TypeError:
+            # An unhashable key, e.g. a list, is never the key of a branch.
+            return self._default_ques
+
+    def process_step(self):
+        self._time_profiler.record(self.uid, Event.queue_in)
+        data = self.read_values()
+        if data is None:
+            return
+
+        out_ques = self._select(data)
+        self._time_profiler.record(self.uid, Event.queue_out)
+        self.row_to_next(data, ques=out_ques)
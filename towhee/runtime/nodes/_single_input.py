@@ -12,6 +12,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from towhee.runtime.data_queue import Empty
+from towhee.runtime.time_profiler import Event
+
 
 class SingleInputMixin:
     """
@@ -28,6 +31,35 @@ class SingleInputMixin:
             self._side_by_cols = list(set(self.input_que.schema) - set(self._node_repr.outputs))
         return self._side_by_cols
 
+    @property
+    def input_index(self):
+        """
+        The positions of the inputs of the node in the rows of the input queue.
+        """
+        if not hasattr(self, '_input_index'):
+            schema = self.input_que.schema
+            self._input_index = [schema.index(col) for col in self._node_repr.inputs]
+        return self._input_index
+
+    @property
+    def row_layouts(self):
+        """
+        For every output queue, the position of each of its columns in `row + outputs + [Empty()]`, where `row` is
+        a row of the input queue and `outputs` are the output values of the node.
+        """
+        if not hasattr(self, '_row_layouts'):
+            outputs = list(self._node_repr.outputs)
+            in_schema = self.input_que.schema
+            side_by = dict((col, i) for i, col in enumerate(in_schema) if col not in outputs)
+            empty = len(in_schema) + len(outputs)
+            self._row_layouts = [
+                [len(in_schema) + outputs.index(col) if col in outputs else side_by.get(col, empty) for col in que.schema]
+                for que in self._output_ques
+            ]
+            self._empty_row = [Empty()] * len(in_schema)
+            self._empty_outputs = [Empty()] * len(outputs)
+        return self._row_layouts
+
     def read_row(self):
         data = self.input_que.get_dict()
         if data is None:
@@ -35,6 +67,86 @@ class SingleInputMixin:
             return None
         return data
 
+    def read_values(self):
+        """
+        Read a row of the input queue as a list in the order of its schema.
+        """
+        row = self.input_que.get()
+        if row is None:
+            self._set_finished()
+        return row
+
+    def row_to_next(self, row, outputs=None, ques=None) -> bool:
+        """
+        Put the side-by columns of `row` and the `outputs` of the node to the output queues in one put per queue,
+        `row` or `outputs` is None if only the other one is put. `ques` are the indexes of the output queues to put to,
+        defaults to all.
+        """
+        layouts = self.row_layouts
+        values = self._row_values(row, outputs)
+        for i in (ques if ques is not None else range(len(layouts))):
+            if not self._output_ques[i].put([values[j] for j in layouts[i]]):
+                self._set_stopped()
+                return False
+        return True
+
+    def next_row(self, row, outputs=None):
+        """
+        The row `row_to_next` puts to the first output queue, for the inline calls.
+        """
+        layout = self.row_layouts[0]
+        values = self._row_values(row, outputs)
+        return [values[j] for j in layout]
+
+    def _row_values(self, row, outputs):
+        values = list(row) if row is not None else list(self._empty_row)
+        values.extend(outputs if outputs is not None else self._empty_outputs)
+        values.append(Empty())
+        return values
+
+    def process_step_async(self):
+        """
+        Keep up to `max_concurrency` rows in the calls of the async operator, and output the rows in order once their
+        calls finish, `emit(row, outputs)` outputs a row given as a list in the order of the input schema.
+        """
+        pending = self._pending
+        # Output the finished rows before waiting for the next input.
+        while pending and (pending[0][2] is None or pending[0][2].done()):
+            if not self._emit_pending(pending.popleft()):
+                return
+        if len(pending) < self._async_runner.max_concurrency:
+            if pending:
+                head = pending[0][2]
+                self.input_que.wait_readable(head.done)
+                if head.done():
+                    return
+            data = self.input_que.get()
+            if data is not None:
+                self._time_profiler.record(self.uid, Event.queue_in)
+                process_data = [data[i] for i in self.input_index]
+                if any((item is Empty() for item in process_data)):
+                    pending.append((data, None, None))
+                else:
+                    self._time_profiler.record(self.uid, Event.process_in)
+                    future = self._async_runner.submit(self._op, process_data)
+                    future.add_done_callback(lambda _: self.input_que.wake())
+                    pending.append((data, process_data, future))
+                return
+            if not pending:
+                # The last read of the input queue, as in the sync nodes.
+                self._time_profiler.record(self.uid, Event.queue_in)
+                self._set_finished()
+                return
+        self._emit_pending(pending.popleft())
+
+    def _emit_pending(self, item) -> bool:
+        data, process_data, future = item
+        if future is None:
+            return self.row_to_next(data)
+        succ, outputs, msg = self._call(process_data, lambda *_: future.result())
+        assert succ, msg
+        return self.emit(data, outputs)
+
     def side_by_to_next(self, data):
         side_by = dict((k, data[k]) for k in self.side_by_cols)
         return self.data_to_next(side_by)
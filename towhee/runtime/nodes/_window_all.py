@@ -69,7 +69,9 @@ class WindowAll(Node, SingleInputMixin):
         assert succ, msg
 
         size = len(self._node_repr.outputs)
-        if size > 1:
+        if outputs is Empty():
+            output_map = {}
+        elif size > 1:
             output_map = dict((self._node_repr.outputs[i], outputs[i])
                               for i in range(size))
         elif size == 1:
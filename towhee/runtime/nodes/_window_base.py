@@ -100,6 +100,8 @@ class WindowBase(Node, SingleInputMixin):
         succ, outputs, msg = self._call(process_data)
         self._time_profiler.record(self.uid, Event.process_out)
         assert succ, msg
+        if outputs is Empty():
+            return
 
         size = len(self._node_repr.outputs)
         if size > 1:
@@ -13,15 +13,22 @@
 # limitations under the License.
 
 
-from typing import List
+from typing import Callable, List, Optional
+from collections import deque
 from enum import Enum, auto
 from abc import ABC
 import traceback
 
-from towhee.runtime.data_queue import DataQueue
+from towhee.runtime.data_queue import DataQueue, Empty
 from towhee.runtime.runtime_conf import set_runtime_config
 from towhee.runtime.constants import OPType
 from towhee.runtime.time_profiler import Event, TimeProfiler
+from towhee.runtime import tracing
+from towhee.runtime.error_policy import ErrorPolicy
+from towhee.runtime.thread_budget import intra_op_threads, assign_intra_op_threads
+from towhee.runtime.async_runner import is_async_op
+from towhee.runtime.operator_manager.operator_loader import OperatorLoader
+from towhee.runtime.operator_manager.process_operator import ProcessOperator
 from towhee.utils.log import engine_log
 
 
@@ -55,6 +62,11 @@ class Node(ABC):
         },
         config: {}
     """
+    # Whether the error policy applies, i.e. a call of the operator processes a row or a window.
+    row_level = True
+    # The maximum outstanding calls of an async operator of a node, if not set in the node config.
+    default_async_concurrency = 64
+
     def __init__(self, node_repr: 'NodeRepr',
                  op_pool: 'OperatorPool',
                  in_ques: List[DataQueue],
@@ -74,17 +86,35 @@ class Node(ABC):
         self._status = NodeStatus.NOT_RUNNING
         self._need_stop = False
         self._err_msg = None
+        self._error_policy = None
+        self._call_index = 0
+        self._intra_op_threads = node_repr.config.intra_op_threads
+        self._async_runner = None
+        # The rows waiting for the outputs of the async operator: (row, op inputs, future).
+        self._pending = deque()
 
     def initialize(self) -> bool:
+        if not self._initialize_op():
+            return False
+        if is_async_op(self._op):
+            config = self._node_repr.config
+            self._async_runner = self._op_pool.acquire_async_runner(
+                self.uid, config.max_concurrency or self.default_async_concurrency, config.rate_limit, config.rate_burst)
+        return True
+
+    def _initialize_op(self) -> bool:
         #TODO
         # Create multiple-operators to support parallelism.
         # Read the parallelism info by config.
         op_type = self._node_repr.op_info.type
+        if self._node_repr.config.num_processes is not None and op_type in [OPType.HUB, OPType.BUILTIN, OPType.LAMBDA, OPType.CALLABLE]:
+            return self._initialize_process_op()
         if op_type in [OPType.HUB, OPType.BUILTIN]:
             try:
                 hub_id = self._node_repr.op_info.operator
-                with set_runtime_config(self._node_repr.config):
+                with set_runtime_config(self._node_repr.config), assign_intra_op_threads(self._intra_op_threads):
                     self._time_profiler.record(self.uid, Event.init_in)
+                    config = self._node_repr.config
                     self._op = self._op_pool.acquire_op(
                         self.uid,
                         hub_id,
@@ -92,6 +122,10 @@ class Node(ABC):
                         self._node_repr.op_info.init_kws,
                         self._node_repr.op_info.tag,
                         self._node_repr.op_info.latest,
+                        max_instances=config.max_instances,
+                        min_instances=config.min_instances,
+                        idle_timeout=config.idle_timeout,
+                        timeout=config.acquire_timeout,
                     )
                     self._time_profiler.record(self.uid, Event.init_out)
                     return True
@@ -114,6 +148,29 @@ class Node(ABC):
             self._set_failed(err)
             return False
 
+    def _create_op(self):
+        op_info = self._node_repr.op_info
+        if op_info.type in [OPType.LAMBDA, OPType.CALLABLE]:
+            return op_info.operator
+        with set_runtime_config(self._node_repr.config):
+            return OperatorLoader().load_operator(op_info.operator, op_info.init_args, op_info.init_kws, op_info.tag, op_info.latest)
+
+    def _initialize_process_op(self) -> bool:
+        """
+        Run the operator in the processes set by `num_processes` of the node config, shared by the calls of the pipeline.
+        """
+        try:
+            self._time_profiler.record(self.uid, Event.init_in)
+            self._op = self._op_pool.acquire_process_op(self.uid, self._create_op, self._node_repr.config.num_processes,
+                                                        self._node_repr.config.shared_memory)
+            self._time_profiler.record(self.uid, Event.init_out)
+            return True
+        except Exception as e:  # pylint: disable=broad-except
+            err = 'Create {} operator {} in {} processes failed, err: {}, {}'.format(
+                self.name, self._node_repr.op_info.operator, self._node_repr.config.num_processes, str(e), traceback.format_exc())
+            self._set_failed(err)
+        return False
+
     @property
     def name(self):
         # TODO
@@ -132,6 +189,22 @@ class Node(ABC):
     def err_msg(self):
         return self._err_msg
 
+    @property
+    def error_policy(self) -> ErrorPolicy:
+        return self._error_policy
+
+    @error_policy.setter
+    def error_policy(self, policy: ErrorPolicy):
+        self._error_policy = policy if self.row_level else None
+
+    @property
+    def intra_op_threads(self) -> int:
+        return self._intra_op_threads
+
+    @intra_op_threads.setter
+    def intra_op_threads(self, num_threads: int):
+        self._intra_op_threads = num_threads
+
     def _set_finished(self) -> None:
         self._set_status(NodeStatus.FINISHED)
         for out in self._output_ques:
@@ -139,6 +212,10 @@ class Node(ABC):
 
     def _set_end_status(self, status: NodeStatus):
         self._set_status(status)
+        while self._pending:
+            future = self._pending.popleft()[2]
+            if future is not None:
+                future.cancel()
         engine_log.debug('%s ends with status: %s', self.name, status)
         for que in self._in_ques:
             que.seal()
@@ -153,18 +230,81 @@ class Node(ABC):
         self._err_msg = error_info
         self._set_end_status(NodeStatus.FAILED)
 
-    def _call(self, inputs):
+    def _call(self, inputs, fn: Callable = None):
+        """
+        Call the operator, or `fn` instead if set, if it raises and the error policy is 'skip' or 'default', the row
+        is recorded to the dead-letter sink and `Empty()` or the default is returned as the outputs.
+        """
+        if fn is None:
+            fn = self._op if self._async_runner is None else self._call_async
+        span = tracing.start_child_span('call_op')
+        index = self._call_index
+        self._call_index += 1
         try:
-            return True, self._op(*inputs), None
+            return True, fn(*inputs), None
         except Exception as e:  # pylint: disable=broad-except
-            err = '{}, {}'.format(str(e), traceback.format_exc())
-            return False, None, err
+            tb = traceback.format_exc()
+            if span is not None:
+                span.set_status(tracing.StatusCode.ERROR, str(e))
+            policy = self._error_policy
+            if policy is None or policy.policy == ErrorPolicy.FAIL:
+                return False, None, '{}, {}'.format(str(e), tb)
+            policy.record(self.name, index, inputs, e, tb)
+            return True, self._failed_outputs(policy), None
+        finally:
+            if span is not None:
+                span.end()
+
+    def _failed_outputs(self, policy: ErrorPolicy):
+        """
+        The outputs of a row failed under the 'skip' or 'default' error policy.
+        """
+        return Empty() if policy.policy == ErrorPolicy.SKIP else policy.default
+
+    def _call_async(self, *inputs):
+        return self._async_runner.submit(self._op, inputs).result()
+
+    def reset(self):
+        """
+        Reset the states of the last call, for the nodes reused by the calls.
+        """
+        self._status = NodeStatus.NOT_RUNNING
+        self._need_stop = False
+        self._err_msg = None
+        self._error_policy = None
+        self._call_index = 0
+        self._intra_op_threads = self._node_repr.config.intra_op_threads
 
     def process_step(self) -> bool:
         raise NotImplementedError
 
+    def process_row(self, row: List) -> Optional[List]:
+        """
+        Process a row and return the row of the next node, None if the row is dropped, for the inline calls.
+        """
+        raise NotImplementedError
+
+    def stop(self):
+        """
+        Ask the node to exit after the current step.
+        """
+        self._need_stop = True
+
     def process(self):
         engine_log.debug('Begin to run %s', str(self))
+        span = tracing.start_child_span(self.name, {'towhee.node.uid': self.uid, 'towhee.node.type': self._node_repr.iter_info.type})
+        if span is None:
+            with intra_op_threads(self._intra_op_threads):
+                self._process()
+            return
+
+        with tracing.use_span(span), intra_op_threads(self._intra_op_threads):
+            self._process()
+        if self.status == NodeStatus.FAILED:
+            span.set_status(tracing.StatusCode.ERROR, self.err_msg)
+        span.end()
+
+    def _process(self):
         self._set_status(NodeStatus.RUNNING)
         while not self._need_stop and not NodeStatus.is_end(self.status):
             try:
@@ -188,7 +328,7 @@ class Node(ABC):
         return 'Node-{}'.format(self.name)
 
     def release_op(self):
-        if self._op and self._node_repr.op_info.type == OPType.HUB:
+        if self._op and self._node_repr.op_info.type == OPType.HUB and not isinstance(self._op, ProcessOperator):
             self._op_pool.release_op(self._op)
             self._op = None
 
@@ -14,12 +14,9 @@
 
 import importlib
 import sys
-import subprocess
 from pathlib import Path
 from typing import Any, List, Dict, Union
-import re
 import traceback
-import pkg_resources
 import hashlib
 
 from towhee.operator import Operator
@@ -28,6 +25,7 @@ from towhee.hub import get_operator
 from towhee.runtime.constants import OPName
 from towhee.utils.log import engine_log
 from .operator_registry import OperatorRegistry
+from .requirements import ensure_requirements
 
 
 # pylint: disable=unused-argument
@@ -102,20 +100,8 @@ class OperatorLoader:
             tag = hashlib.sha256(fname.encode('utf-8')).hexdigest()
         modname = 'towhee.operator.' + op_name + '.' + tag
 
-        all_pkg = [item.project_name for item in list(pkg_resources.working_set)]
-        if 'requirements.txt' in (i.name for i in path.iterdir()):
-            with open(path / 'requirements.txt', 'r', encoding='utf-8') as f:
-                reqs = f.read().split('\n')
-            for req in reqs:
-                need_install = []
-                if not req:
-                    continue
-                pkg_name = re.split(r'(~|>|<|=|!|\]|\[| )', req)[0]
-                pkg_name = pkg_name.replace('_', '-')
-                if pkg_name not in all_pkg:
-                    need_install.append(req)
-            if need_install:
-                subprocess.check_call([sys.executable, '-m', 'pip', 'install', *need_install])
+        if (path / 'requirements.txt').is_file():
+            ensure_requirements(path / 'requirements.txt')
 
         op = self._load_op(modname, path, fname)
         if not op:
@@ -12,29 +12,59 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Dict, List
+from typing import Callable, Dict, List
 import threading
+import time
 
 from towhee.operator import Operator, SharedType
 from .operator_loader import OperatorLoader
+from .process_operator import ProcessOperator
+from ..async_runner import AsyncRunner
 
 
 class _OperatorStorage:
     """
     Impl operator get and put by different shared_type.
+
+    The `NotShareable` and `NotReusable` operators are bounded by `max_instances`, the instances created and not
+    dropped, and the free instances idle for `idle_timeout` seconds are evicted down to `min_instances`.
     """
-    def __init__(self):
+    def __init__(self, max_instances: int = None, min_instances: int = None, idle_timeout: float = None):
+        if max_instances is not None and min_instances is not None and min_instances > max_instances:
+            raise ValueError('The min_instances {} is larger than the max_instances {}.'.format(min_instances, max_instances))
         self._shared_type = None
         self._ops = []
+        # The release time of the free operators, the oldest first.
+        self._idle_since = []
+        self.max_instances = max_instances
+        self.min_instances = min_instances or 0
+        self.idle_timeout = idle_timeout
+        self.instances = 0
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.evictions = 0
 
     def op_available(self) -> bool:
         return self._shared_type is not None and len(self._ops) > 0
 
+    def can_create(self) -> bool:
+        return self.max_instances is None or self.instances < self.max_instances
+
+    def to_create(self) -> int:
+        """
+        The instances to create on a miss, up to `min_instances` at the first one.
+        """
+        n = max(1, self.min_instances - self.instances) if self._shared_type is None else 1
+        return n if self.max_instances is None else min(n, self.max_instances - self.instances)
+
     def get(self):
         assert self._shared_type is not None and len(self._ops) != 0
         op = self._ops[-1]
         if self._shared_type != SharedType.Shareable:
             self._ops.pop()
+            self._idle_since.pop()
         return op
 
     def put(self, op: Operator, force_put: bool = False):
@@ -43,6 +73,30 @@ class _OperatorStorage:
 
         if force_put or self._shared_type == SharedType.NotShareable:
             self._ops.append(op)
+            self._idle_since.append(time.monotonic())
+        elif self._shared_type == SharedType.NotReusable:
+            self.instances -= 1
+
+    def evict_idle(self):
+        if self.idle_timeout is None or self._shared_type == SharedType.Shareable:
+            return
+        now = time.monotonic()
+        while self._ops and self.instances > self.min_instances and now - self._idle_since[0] > self.idle_timeout:
+            self._ops.pop(0)
+            self._idle_since.pop(0)
+            self.instances -= 1
+            self.evictions += 1
+
+    def stats(self) -> Dict:
+        return {
+            'instances': self.instances,
+            'idle': len(self._ops) if self._shared_type != SharedType.Shareable else 0,
+            'hits': self.hits,
+            'misses': self.misses,
+            'waits': self.waits,
+            'timeouts': self.timeouts,
+            'evictions': self.evictions,
+        }
 
     def flush(self):
         for op in self._ops:
@@ -61,7 +115,10 @@ class OperatorPool:
     def __init__(self):
         self._op_loader = OperatorLoader()
         self._all_ops = {}
+        self._process_ops = {}
+        self._async_runners = {}
         self._lock = threading.Lock()
+        self._op_released = threading.Condition(self._lock)
 
     def __len__(self):
         num = 0
@@ -71,12 +128,29 @@ class OperatorPool:
 
     def clear(self):
         self._all_ops = {}
+        self.release_process_ops()
 
-    def acquire_op(self, key, hub_op_id: str, op_args: List, op_kws: Dict[str, any], tag: str, latest: bool) -> Operator:
+    def release_process_ops(self):
+        """
+        Stop the processes of the operators running in processes, they are started again at the next acquisition.
+        """
+        with self._lock:
+            process_ops, self._process_ops = self._process_ops, {}
+        for op in process_ops.values():
+            op.close()
+
+    def acquire_op(self, key, hub_op_id: str, op_args: List, op_kws: Dict[str, any], tag: str, latest: bool,
+                   max_instances: int = None, min_instances: int = None, idle_timeout: float = None,
+                   timeout: float = None) -> Operator:
         """
         Instruct the `OperatorPool` to reserve and return the
         specified operator for use in the executor.
 
+        If all the `max_instances` instances of a `NotShareable` operator are in use, wait until one is released,
+        for at most `timeout` seconds. The first acquisition creates `min_instances` instances, and the free
+        instances idle for `idle_timeout` seconds are evicted down to `min_instances`. The limits are set by the
+        first acquisition of the key.
+
         Args:
             key: (`str`)
             hub_op_id: (`str`)
@@ -88,26 +162,106 @@ class OperatorPool:
                 The tag of operator
             latest (`bool`):
                 Whether to download the latest files.
+            max_instances (`int`):
+                The maximum instances of the operator, defaults to no limit.
+            min_instances (`int`):
+                The instances created at first and kept from eviction.
+            idle_timeout (`float`):
+                The seconds a free instance is kept, defaults to forever.
+            timeout (`float`):
+                The maximum seconds to wait for a free instance, defaults to wait forever.
 
         Returns:
             (`towhee.operator.Operator`)
                 The operator instance reserved for the caller.
         """
-
-        # Load the operator if the computed key does not exist in the operator
-        # dictionary.
-        with self._lock:
+        with self._op_released:
             storage = self._all_ops.get(key, None)
             if storage is None:
-                storage = _OperatorStorage()
+                storage = _OperatorStorage(max_instances, min_instances, idle_timeout)
                 self._all_ops[key] = storage
+            storage.evict_idle()
+
+            deadline = time.monotonic() + timeout if timeout is not None else None
+            waited = False
+            while not storage.op_available() and not storage.can_create():
+                if not waited:
+                    storage.waits += 1
+                    waited = True
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    storage.timeouts += 1
+                    raise TimeoutError('No free instance of the operator {} in {} seconds, all the {} instances are in use.'.format(
+                        hub_op_id, timeout, storage.max_instances))
+                self._op_released.wait(remaining)
 
-            if not storage.op_available():
+            if storage.op_available():
+                storage.hits += 1
+                return storage.get()
+            storage.misses += 1
+            num = storage.to_create()
+            # Reserve the instances, the operators are loaded without the lock.
+            storage.instances += num
+
+        ops = []
+        try:
+            for _ in range(num):
                 op = self._op_loader.load_operator(hub_op_id, op_args, op_kws, tag, latest)
-                storage.put(op, True)
                 op.key = key
+                ops.append(op)
+                if op.shared_type == SharedType.Shareable:
+                    break
+        except Exception:
+            if not ops:
+                with self._op_released:
+                    storage.instances -= num
+                    self._op_released.notify_all()
+                raise
+            # Pre-warming failed, go on with the instances created.
+        with self._op_released:
+            storage.instances -= num - len(ops)
+            for op in ops:
+                storage.put(op, True)
+            self._op_released.notify_all()
             return storage.get()
 
+    def acquire_process_op(self, key, op_factory: Callable, num_processes: int, shared_memory: bool = False) -> ProcessOperator:
+        """
+        Return the operator running in `num_processes` processes for the node `key`, the processes are
+        started at the first acquisition and shared by all the calls of the pipeline.
+
+        Args:
+            key: (`str`)
+            op_factory: (`Callable`)
+                Create the operator in every process.
+            num_processes: (`int`)
+                The number of processes.
+            shared_memory: (`bool`)
+                Send the large arrays through shared memory.
+        """
+        with self._lock:
+            if key not in self._process_ops:
+                self._process_ops[key] = ProcessOperator(op_factory, num_processes, shared_memory)
+            return self._process_ops[key]
+
+    def acquire_async_runner(self, key, max_concurrency: int, rate_limit: float = None, burst: int = None) -> AsyncRunner:
+        """
+        Return the runner of the async operator of the node `key`, its limits are shared by all the calls of the pipeline.
+
+        Args:
+            key: (`str`)
+            max_concurrency: (`int`)
+                The maximum outstanding calls of the node.
+            rate_limit: (`float`)
+                The maximum calls per second of the node.
+            burst: (`int`)
+                The maximum calls started at once under the rate limit.
+        """
+        with self._lock:
+            if key not in self._async_runners:
+                self._async_runners[key] = AsyncRunner(max_concurrency, rate_limit, burst)
+            return self._async_runners[key]
+
     def release_op(self, op: Operator):
         """
         Releases the specified operator and all associated resources back to the
@@ -117,9 +271,26 @@ class OperatorPool:
             op: (`towhee.Operator`)
                 `Operator` instance to add back into the operator pool.
         """
-        with self._lock:
+        with self._op_released:
             storage = self._all_ops[op.key]
             storage.put(op)
+            self._op_released.notify_all()
+
+    def evict_idle(self):
+        """
+        Drop the free operators idle longer than the `idle_timeout` of their keys.
+        """
+        with self._lock:
+            for storage in self._all_ops.values():
+                storage.evict_idle()
+
+    def stats(self) -> Dict[str, Dict]:
+        """
+        The instances, the free instances, the acquisitions served by a free instance, by a new one, after waiting
+        and failed after waiting, and the evicted instances, by key.
+        """
+        with self._lock:
+            return dict((key, storage.stats()) for key, storage in self._all_ops.items())
 
     def flush(self):
         for _, storage in self._all_ops.items():
@@ -0,0 +1,208 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import pickle
+import threading
+import multiprocessing
+from typing import Callable, Generator
+from types import GeneratorType
+from multiprocessing import reduction
+from multiprocessing.connection import Connection, rebuild_connection
+from concurrent.futures import ProcessPoolExecutor
+
+from towhee.runtime.shm_transport import SharedArena, dumps, loads, run_payload
+
+
+# The operator and the shared arena of the worker process.
+_WORKER_OP = None
+_WORKER_ARENA = None
+# Held while the operator runs, by a call or by a generator it returned computing its next item, so that the
+# calls sent to the worker while it streams a generator run between the items rather than waiting for the stream.
+_WORKER_LOCK = None
+
+
+def _init_worker(op_factory: Callable, arena: SharedArena):
+    global _WORKER_OP, _WORKER_ARENA, _WORKER_LOCK  # pylint: disable=global-statement
+    _WORKER_OP = op_factory()
+    _WORKER_ARENA = arena
+    _WORKER_LOCK = threading.Lock()
+
+
+def _ping():
+    return os.getpid()
+
+
+# The messages of a stream: the end of the generator, its error, and the caller asking for one more item or to stop.
+_DONE = b'D'
+_ERROR = b'E'
+_CREDIT = b''
+_STOP = b'S'
+_END = object()
+
+# How many items of a generator the worker sends ahead of the caller.
+_STREAM_WINDOW = 8
+
+
+def _send_items(outputs: Generator, conn: 'Connection'):
+    """
+    Send the items of a generator on `conn`, at most `_STREAM_WINDOW` items ahead of the caller, which sends back a
+    credit for every item it receives, or asks to stop.
+    """
+    try:
+        window = _STREAM_WINDOW
+        while True:
+            with _WORKER_LOCK:
+                item = next(outputs, _END)
+            if item is _END:
+                break
+            while window == 0 or conn.poll():
+                if conn.recv_bytes() == _STOP:
+                    _close(outputs)
+                    conn.send_bytes(_DONE)
+                    return
+                window += 1
+            conn.send_bytes(dumps(item, _WORKER_ARENA))
+            window -= 1
+        conn.send_bytes(_DONE)
+    except (BrokenPipeError, ConnectionResetError, EOFError):
+        # The caller is gone.
+        _close(outputs)
+    except Exception as e:  # pylint: disable=broad-except
+        try:
+            try:
+                error = pickle.dumps(e)
+            except Exception:  # pylint: disable=broad-except
+                error = pickle.dumps(RuntimeError(repr(e)))
+            conn.send_bytes(_ERROR + error)
+        except OSError:
+            pass
+    finally:
+        conn.close()
+
+
+def _close(outputs: Generator):
+    with _WORKER_LOCK:
+        outputs.close()
+
+
+def _call_op(payload: bytes):
+    """
+    Call the operator and return the pickled outputs, or the handle of a pipe streaming the generator it returned.
+    """
+    with _WORKER_LOCK:
+        outputs = _WORKER_OP(*loads(payload))
+    if not isinstance(outputs, GeneratorType):
+        return dumps(outputs, _WORKER_ARENA)
+    conn, caller_conn = multiprocessing.Pipe()
+    handle = reduction.DupFd(caller_conn.fileno())
+    caller_conn.close()
+    threading.Thread(target=_send_items, args=(outputs, conn), daemon=True).start()
+    return handle
+
+
+def _stream(conn: 'Connection', shared: bool) -> Generator:
+    ended = False
+    try:
+        while True:
+            msg = conn.recv_bytes()
+            if msg == _DONE:
+                ended = True
+                return
+            if msg[:1] == _ERROR:
+                ended = True
+                raise pickle.loads(msg[1:])
+            try:
+                conn.send_bytes(_CREDIT)
+            except OSError:
+                # The worker has sent all the items and closed its end.
+                pass
+            yield loads(msg)
+    except EOFError:
+        ended = True
+        raise RuntimeError('The operator process exited before finishing the generator.') from None
+    finally:
+        if not ended:
+            _drain(conn, shared)
+        conn.close()
+
+
+def _drain(conn: 'Connection', shared: bool):
+    """
+    Stop the generator closed early and load the items already sent, so their shared blocks are released.
+    """
+    try:
+        conn.send_bytes(_STOP)
+        while True:
+            msg = conn.recv_bytes()
+            if msg == _DONE or msg[:1] == _ERROR:
+                return
+            if shared:
+                loads(msg)
+    except (OSError, EOFError):
+        pass
+
+
+class ProcessOperator:
+    """
+    Run an operator in `num_processes` forked processes, every process creates the operator once by
+    `op_factory`. The inputs and the outputs of a call are pickled with protocol 5, the generators
+    returned by the operator are streamed item by item through a pipe opened for them, and the worker runs at most a
+    few items ahead of the caller, so a long generator does not hold all its items in memory. The worker runs the
+    other calls between the items of a generator, so a slow consumer does not block them. Closing the
+    generator early stops it in the worker and releases the items already sent.
+    With `shared_memory`, the large arrays are sent as handles to a `SharedArena` instead of being copied
+    through the pipes.
+
+    The node calls the operator row by row, the rows of the concurrent calls of a pipeline run in
+    the processes in parallel.
+
+    Args:
+        op_factory (`Callable`): Create the operator, called in every process.
+        num_processes (`int`): The number of processes.
+        shared_memory (`bool`): Send the large arrays through shared memory.
+
+    Examples:
+        >>> from towhee.runtime.operator_manager.process_operator import ProcessOperator
+        >>> op = ProcessOperator(lambda: lambda x, y: x + y, 2)
+        >>> op(1, 2)
+        3
+        >>> op.close()
+    """
+    def __init__(self, op_factory: Callable, num_processes: int, shared_memory: bool = False):
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise RuntimeError('Running operators in processes requires the fork start method, which is not available on this platform.')
+        self._num_processes = num_processes
+        self._arena = SharedArena() if shared_memory else None
+        self._executor = ProcessPoolExecutor(max_workers=num_processes,
+                                             mp_context=multiprocessing.get_context('fork'),
+                                             initializer=_init_worker,
+                                             initargs=(op_factory, self._arena))
+        # Fork the workers now, the creation of the operator fails here rather than in the first call.
+        self._executor.submit(_ping).result()
+
+    @property
+    def num_processes(self) -> int:
+        return self._num_processes
+
+    def __call__(self, *inputs):
+        outputs = run_payload(self._executor, _call_op, dumps(inputs, self._arena))
+        if isinstance(outputs, bytes):
+            return loads(outputs)
+        return _stream(rebuild_connection(outputs, True, True), self._arena is not None)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        if self._arena is not None:
+            self._arena.close()
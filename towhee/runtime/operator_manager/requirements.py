@@ -0,0 +1,213 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import re
+import sys
+import json
+import site
+import hashlib
+import threading
+import subprocess
+from pathlib import Path
+from typing import List, Optional, Union
+
+from towhee.utils.log import engine_log
+
+try:
+    from importlib import metadata as _metadata
+except ImportError:  # pragma: no cover
+    _metadata = None
+
+try:
+    from packaging.requirements import Requirement, InvalidRequirement
+    from packaging.utils import canonicalize_name
+except ImportError:  # pragma: no cover
+    Requirement = None
+
+
+def _installed_version(name: str) -> Optional[str]:
+    if _metadata is not None:
+        try:
+            return _metadata.version(name)
+        except _metadata.PackageNotFoundError:
+            return None
+    import pkg_resources  # pylint: disable=import-outside-toplevel
+    try:
+        return pkg_resources.get_distribution(name).version
+    except pkg_resources.DistributionNotFound:
+        return None
+
+
+def _is_satisfied(line: str, check_versions: bool) -> bool:
+    if Requirement is None:
+        return _installed_version(re.split(r'(~|>|<|=|!|\]|\[|;| )', line)[0]) is not None
+    try:
+        req = Requirement(line)
+    except InvalidRequirement:
+        # Leave the lines we can not read, e.g. the urls, to pip.
+        return False
+    if req.marker is not None and not req.marker.evaluate():
+        return True
+    version = _installed_version(canonicalize_name(req.name))
+    if version is None:
+        return False
+    return not check_versions or not req.specifier or req.specifier.contains(version, prereleases=True)
+
+
+def missing_requirements(reqs: List[str], check_versions: bool = False) -> List[str]:
+    """
+    The lines of a requirements file of which the distributions are not installed, the names are compared
+    case-insensitively and the lines with environment markers not matching are skipped. A distribution installed
+    at another version than the line pins is only missing with `check_versions`, so that loading an operator
+    does not upgrade or downgrade the packages of the environment.
+
+    Examples:
+        >>> from towhee.runtime.operator_manager.requirements import missing_requirements
+        >>> missing_requirements(['NumPy', 'numpy<1.0; python_version > "3"', '# comment', 'not-exist-package==1.0'])
+        ['not-exist-package==1.0']
+        >>> missing_requirements(['numpy<1.0'], check_versions=True)
+        ['numpy<1.0']
+    """
+    missing = []
+    for line in reqs:
+        line = line.split(' #')[0].strip()
+        if not line or line.startswith('#'):
+            continue
+        if not _is_satisfied(line, check_versions):
+            missing.append(line)
+    return missing
+
+
+def environment_key() -> str:
+    """
+    The interpreter and the modification times of its site-packages directories, which change when a
+    distribution is installed or removed.
+    """
+    dirs = list(getattr(site, 'getsitepackages', lambda: [])())
+    if site.ENABLE_USER_SITE:
+        dirs.append(site.getusersitepackages())
+    dirs += [p for p in sys.path if p.endswith(('site-packages', 'dist-packages'))]
+    stamps = []
+    for d in sorted(set(dirs)):
+        try:
+            stamps.append('{}:{}'.format(d, os.stat(d).st_mtime_ns))
+        except OSError:
+            continue
+    key = '\n'.join([sys.executable, sys.version] + stamps)
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+class RequirementsCache:
+    """
+    The requirements files already satisfied in this environment, by the sha256 of their content, kept in the
+    process and in `$TOWHEE_HOME/operators/requirements_cache.json`. The entries are dropped when the interpreter
+    or its site-packages change. Remove the file to check the requirements again.
+
+    Args:
+        file_path (`Union[str, Path]`):
+            The cache file, defaults to the one under `$TOWHEE_HOME`.
+        check_versions (`bool`):
+            Install the requirements of which the installed version does not match, see `missing_requirements`.
+    """
+    def __init__(self, file_path: Union[str, Path] = None, check_versions: bool = False):
+        self._file_path = Path(file_path) if file_path is not None else None
+        self.check_versions = check_versions
+        self._lock = threading.Lock()
+        self._env = None
+        self._loaded_path = None
+        self._satisfied = set()
+
+    @property
+    def file_path(self) -> Path:
+        if self._file_path is not None:
+            return self._file_path
+        from towhee.hub.cache_manager import get_local_dir  # pylint: disable=import-outside-toplevel
+        return Path(get_local_dir()) / 'operators' / 'requirements_cache.json'
+
+    def _load(self, env: str):
+        file_path = self.file_path
+        if self._env == env and self._loaded_path == file_path:
+            return
+        self._env, self._loaded_path, self._satisfied = env, file_path, set()
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('env') == env:
+                self._satisfied = set(data.get('satisfied', []))
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    def _save(self):
+        file_path = self._loaded_path
+        try:
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = file_path.with_suffix('.{}.tmp'.format(os.getpid()))
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'env': self._env, 'satisfied': sorted(self._satisfied)}, f)
+            os.replace(tmp_path, file_path)
+        except OSError as e:
+            engine_log.warning('Can not cache the satisfied requirements in %s: %s', file_path, str(e))
+
+    def ensure(self, req_file: Union[str, Path]) -> List[str]:
+        """
+        Install the requirements of `req_file` not satisfied yet, and return them. Nothing is checked if the
+        file is in the cache.
+        """
+        with open(req_file, 'rb') as f:
+            content = f.read()
+        digest = hashlib.sha256(content).hexdigest() + (':versions' if self.check_versions else '')
+        with self._lock:
+            self._load(environment_key())
+            if digest in self._satisfied:
+                return []
+            lines = content.decode('utf-8').splitlines()
+            if any(line.strip().startswith('-') for line in lines):
+                # The pip options, e.g. `-r` and `--extra-index-url`, are left to pip.
+                need_install = ['-r', str(req_file)]
+            else:
+                need_install = missing_requirements(lines, self.check_versions)
+            if need_install:
+                subprocess.check_call([sys.executable, '-m', 'pip', 'install', *need_install])
+            # The installation changed site-packages.
+            self._env = environment_key()
+            self._satisfied.add(digest)
+            self._save()
+            return need_install
+
+    def reset(self):
+        """
+        Forget the requirements loaded in the process, they are loaded from the cache file again on the next check.
+        """
+        with self._lock:
+            self._env, self._loaded_path, self._satisfied = None, None, set()
+
+    def clear(self):
+        self.reset()
+        with self._lock:
+            try:
+                os.remove(self.file_path)
+            except OSError:
+                pass
+
+
+requirements_cache = RequirementsCache()
+
+
+def ensure_requirements(req_file: Union[str, Path]) -> List[str]:
+    """
+    Install the requirements of an operator not satisfied yet with `requirements_cache`, and return them.
+    Set `requirements_cache.check_versions` to also install the requirements installed at other versions.
+    """
+    return requirements_cache.ensure(req_file)
@@ -13,7 +13,6 @@
 # limitations under the License.
 
 import uuid
-from copy import deepcopy
 
 from towhee.runtime.check_utils import TupleForm
 from towhee.runtime.operator_manager import OperatorAction
@@ -25,6 +24,7 @@ from towhee.runtime.constants import (
     WindowConst,
     ReduceConst,
     FilterConst,
+    RouteConst,
     TimeWindowConst,
     FlatMapConst,
     ConcatConst,
@@ -42,10 +42,12 @@ class Pipeline:
     Args:
         dag (`dict`): The dag for the pipeline.
         clo_node (`str`): The close node in the pipeline dag, defaults to '_input'.
+        branch (`tuple`): The keys of the route branch the next node is added to, if the close node is a route node.
     """
-    def __init__(self, dag, clo_node=InputConst.name):
+    def __init__(self, dag, clo_node=InputConst.name, branch=None):
         self._dag = dag
         self._clo_node = clo_node
+        self._branch = branch
 
     @property
     def dag(self) -> dict:
@@ -93,9 +95,7 @@ class Pipeline:
         output_schema = self._check_schema(output_schema)
 
         uid = OutputConst.name
-        dag_dict = deepcopy(self._dag)
-        dag_dict[uid] = self._nop_node_dict(output_schema, output_schema)
-        dag_dict[self._clo_node]['next_nodes'].append(uid)
+        dag_dict = self._add_node(uid, self._nop_node_dict(output_schema, output_schema)).dag
 
         run_pipe = RuntimePipeline(dag_dict)
         run_pipe.preload()
@@ -125,8 +125,7 @@ class Pipeline:
 
         uid = uuid.uuid4().hex
         fn_action = self._to_action(fn)
-        dag_dict = deepcopy(self._dag)
-        dag_dict[uid] = {
+        node = {
             'inputs': input_schema,
             'outputs': output_schema,
             'op_info': fn_action.serialize(),
@@ -137,8 +136,7 @@ class Pipeline:
             'config': config,
             'next_nodes': [],
         }
-        dag_dict[self._clo_node]['next_nodes'].append(uid)
-        return Pipeline(dag_dict, uid)
+        return self._add_node(uid, node)
 
     def concat(self, *pipes: 'Pipeline') -> 'Pipeline':
         """
@@ -161,9 +159,8 @@ class Pipeline:
         """
         self._check_concat_pipe(pipes)
         uid = uuid.uuid4().hex
-        dag_dict = self._concat_dag(deepcopy(self._dag), pipes)
         fn_action = self._to_action(ConcatConst.name)
-        dag_dict[uid] = {
+        node = {
             'inputs': (),
             'outputs': (),
             'op_info': fn_action.serialize(),
@@ -174,11 +171,7 @@ class Pipeline:
             'config': None,
             'next_nodes': [],
         }
-        dag_dict[self._clo_node]['next_nodes'].append(uid)
-        for pipe in pipes:
-            dag_dict[pipe._clo_node]['next_nodes'].append(uid)
-
-        return Pipeline(dag_dict, uid)
+        return Pipeline(self._concat_dag(self._dag, pipes), self._clo_node, self._branch)._add_node(uid, node, pipes)
 
     def flat_map(self, input_schema, output_schema, fn, config=None) -> 'Pipeline':
         """
@@ -213,8 +206,7 @@ class Pipeline:
 
         uid = uuid.uuid4().hex
         fn_action = self._to_action(fn)
-        dag_dict = deepcopy(self._dag)
-        dag_dict[uid] = {
+        node = {
             'inputs': input_schema,
             'outputs': output_schema,
             'op_info': fn_action.serialize(),
@@ -225,8 +217,7 @@ class Pipeline:
             'config': config,
             'next_nodes': [],
         }
-        dag_dict[self._clo_node]['next_nodes'].append(uid)
-        return Pipeline(dag_dict, uid)
+        return self._add_node(uid, node)
 
     def filter(self, input_schema, output_schema, filter_columns, fn, config=None) -> 'Pipeline':
         """
@@ -260,8 +251,7 @@ class Pipeline:
 
         uid = uuid.uuid4().hex
         fn_action = self._to_action(fn)
-        dag_dict = deepcopy(self._dag)
-        dag_dict[uid] = {
+        node = {
             'inputs': input_schema,
             'outputs': output_schema,
             'op_info': fn_action.serialize(),
@@ -272,8 +262,67 @@ class Pipeline:
             'config': config,
             'next_nodes': [],
         }
-        dag_dict[self._clo_node]['next_nodes'].append(uid)
-        return Pipeline(dag_dict, uid)
+        return self._add_node(uid, node)
+
+    def route(self, input_schema, fn, config=None) -> 'Pipeline':
+        """
+        Send every row to one branch, chosen by the key `fn` returns on the input_schema.
+
+        The selector is called once per row, and the row is only sent to the nodes added with `branch` of the key,
+        the rows of the other keys go to the nodes added to the route without `branch`, or are dropped if there are
+        no such nodes. The branches not taken get no row, so after a `concat` the columns they add are `Empty()`.
+
+        Args:
+            input_schema (tuple): The input column/s of fn.
+            fn (Operation | lambda | callable): The selector returning the key of the branch.
+            config (dict, optional): Config for the route. Defaults to None.
+
+        Returns:
+            Pipeline: Pipeline with route action added, add the branches with `branch`.
+
+        Examples:
+            >>> from towhee import pipe
+            >>> r = pipe.input('type', 'x').route('type', lambda t: t)
+            >>> p0 = r.branch('image').map('x', 'y', lambda x: 'image ' + x)
+            >>> p1 = r.branch('text', 'html').map('x', 'z', lambda x: 'text ' + x)
+            >>> p = p0.concat(p1).output('y', 'z')
+            >>> p('image', 'a').get()
+            ['image a', Empty()]
+            >>> p('html', 'b').get()
+            [Empty(), 'text b']
+        """
+        input_schema = self._check_schema(input_schema)
+
+        uid = uuid.uuid4().hex
+        fn_action = self._to_action(fn)
+        node = {
+            'inputs': input_schema,
+            'outputs': (),
+            'op_info': fn_action.serialize(),
+            'iter_info': {
+                'type': RouteConst.name,
+                'param': {RouteConst.param.branches: {}}
+            },
+            'config': config,
+            'next_nodes': [],
+        }
+        return self._add_node(uid, node)
+
+    def branch(self, *keys) -> 'Pipeline':
+        """
+        Select a branch of the route node, the next node only gets the rows for which the selector returns one of `keys`.
+
+        Args:
+            keys: The keys of the branch.
+
+        Returns:
+            Pipeline: Pipeline to add the first node of the branch to.
+        """
+        if self._dag[self._clo_node]['iter_info']['type'] != RouteConst.name:
+            raise ValueError('Only a route node has branches, please call `branch` after `route`.')
+        if not keys:
+            raise ValueError('The branch needs at least one key.')
+        return Pipeline(self._dag, self._clo_node, keys)
 
     def window(self, input_schema, output_schema, size, step, fn, config=None) -> 'Pipeline':
         """
@@ -307,8 +356,7 @@ class Pipeline:
 
         uid = uuid.uuid4().hex
         fn_action = self._to_action(fn)
-        dag_dict = deepcopy(self._dag)
-        dag_dict[uid] = {
+        node = {
             'inputs': input_schema,
             'outputs': output_schema,
             'op_info': fn_action.serialize(),
@@ -320,8 +368,7 @@ class Pipeline:
             'config': config,
             'next_nodes': [],
         }
-        dag_dict[self._clo_node]['next_nodes'].append(uid)
-        return Pipeline(dag_dict, uid)
+        return self._add_node(uid, node)
 
     def window_all(self, input_schema, output_schema, fn, config=None) -> 'Pipeline':
         """
@@ -350,8 +397,7 @@ class Pipeline:
 
         uid = uuid.uuid4().hex
         fn_action = self._to_action(fn)
-        dag_dict = deepcopy(self._dag)
-        dag_dict[uid] = {
+        node = {
             'inputs': input_schema,
             'outputs': output_schema,
             'op_info': fn_action.serialize(),
@@ -362,8 +408,7 @@ class Pipeline:
             'config': config,
             'next_nodes': [],
         }
-        dag_dict[self._clo_node]['next_nodes'].append(uid)
-        return Pipeline(dag_dict, uid)
+        return self._add_node(uid, node)
 
     def reduce(self, input_schema, output_schema, fn, config=None) -> 'Pipeline':
         """
@@ -395,8 +440,7 @@ class Pipeline:
 
         uid = uuid.uuid4().hex
         fn_action = self._to_action(fn)
-        dag_dict = deepcopy(self._dag)
-        dag_dict[uid] = {
+        node = {
             'inputs': input_schema,
             'outputs': output_schema,
             'op_info': fn_action.serialize(),
@@ -407,8 +451,7 @@ class Pipeline:
             'config': config,
             'next_nodes': [],
         }
-        dag_dict[self._clo_node]['next_nodes'].append(uid)
-        return Pipeline(dag_dict, uid)
+        return self._add_node(uid, node)
 
     def time_window(self, input_schema, output_schema, timestamp_col, size, step, fn, config=None) -> 'Pipeline':
         """
@@ -447,8 +490,7 @@ class Pipeline:
 
         uid = uuid.uuid4().hex
         fn_action = self._to_action(fn)
-        dag_dict = deepcopy(self._dag)
-        dag_dict[uid] = {
+        node = {
             'inputs': input_schema,
             'outputs': output_schema,
             'op_info': fn_action.serialize(),
@@ -461,7 +503,25 @@ class Pipeline:
             'config': config,
             'next_nodes': [],
         }
-        dag_dict[self._clo_node]['next_nodes'].append(uid)
+        return self._add_node(uid, node)
+
+    def _add_node(self, uid, node, extra_parents=None) -> 'Pipeline':
+        """
+        Return a new pipeline with the node appended after the close nodes of this pipeline and `extra_parents`.
+
+        The node dicts are shared between the pipelines instead of being deep copied, only the dicts of
+        the parent nodes are copied to extend their `next_nodes`, so the dicts must not be modified in place.
+        """
+        dag_dict = dict(self._dag)
+        for pipe in [self] + list(extra_parents or []):
+            parent_node = dict(dag_dict[pipe._clo_node])
+            parent_node['next_nodes'] = parent_node['next_nodes'] + [uid]
+            if pipe._branch is not None:
+                param = parent_node['iter_info']['param']
+                branches = dict(param[RouteConst.param.branches], **{uid: tuple(pipe._branch)})
+                parent_node['iter_info'] = dict(parent_node['iter_info'], param=dict(param, **{RouteConst.param.branches: branches}))
+            dag_dict[pipe._clo_node] = parent_node
+        dag_dict[uid] = node
         return Pipeline(dag_dict, uid)
 
     @staticmethod
@@ -504,13 +564,20 @@ class Pipeline:
 
     @staticmethod
     def _concat_dag(dag1, pipes):
+        dag = dict(dag1)
         for pipe in pipes:
-            dag2 = deepcopy(pipe.dag)
-            same_nodes = dag1.keys() & dag2.keys()
-            for name in same_nodes:
-                dag2[name]['next_nodes'] = list(set(dag2[name]['next_nodes'] + dag1[name]['next_nodes']))
-            dag1.update(dag2)
-        return dag1
+            for name, node in pipe.dag.items():
+                if name not in dag:
+                    dag[name] = node
+                elif dag[name] is not node:
+                    next_nodes = dag[name]['next_nodes'] + [n for n in node['next_nodes'] if n not in dag[name]['next_nodes']]
+                    merged = dict(node, next_nodes=next_nodes)
+                    if node['iter_info']['type'] == RouteConst.name:
+                        param = node['iter_info']['param']
+                        branches = dict(dag[name]['iter_info']['param'][RouteConst.param.branches], **param[RouteConst.param.branches])
+                        merged['iter_info'] = dict(node['iter_info'], param=dict(param, **{RouteConst.param.branches: branches}))
+                    dag[name] = merged
+        return dag
 
     @staticmethod
     def _check_schema(schema):
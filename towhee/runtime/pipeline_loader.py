@@ -17,6 +17,7 @@ import pathlib
 import hashlib
 import threading
 import importlib
+import contextvars
 
 
 from towhee.pipelines import get_builtin_pipe_file
@@ -25,6 +26,9 @@ from towhee.hub import get_pipeline
 
 PIPELINE_NAMESPACE = 'towhee.pipeline'
 
+# The name of the pipeline being loaded, its `AutoPipes` and `AutoConfig` are registered under it.
+_LOADING_VAR: contextvars.ContextVar = contextvars.ContextVar('loading_pipeline_var', default=None)
+
 
 class PipelineLoader:
     """
@@ -52,8 +56,26 @@ class PipelineLoader:
         PipelineLoader._load_pipeline_from_file(name, file_path)
         return True
 
+    @staticmethod
+    def loading_name():
+        """
+        The name of the pipeline being loaded, None if no pipeline is loaded.
+        """
+        return _LOADING_VAR.get()
+
     @staticmethod
     def load_pipeline(name: str, tag: str = 'main', latest: bool = False):
+        """
+        Load the pipeline file once, registering both the pipeline and the config defined in it under `name`.
+        """
+        token = _LOADING_VAR.set(name)
+        try:
+            PipelineLoader._load_pipeline(name, tag, latest)
+        finally:
+            _LOADING_VAR.reset(token)
+
+    @staticmethod
+    def _load_pipeline(name: str, tag: str, latest: bool):
         with PipelineLoader._lock:
             file_path = pathlib.Path(name)
             if file_path.is_file():
@@ -13,29 +13,87 @@
 # limitations under the License.
 
 import re
-from typing import Dict, Any, Union, Tuple, List
-from concurrent.futures import ThreadPoolExecutor
+import time
+import queue
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Dict, Any, Union, Tuple, List, Iterable, Callable, Optional
 
 from towhee.tools import visualizers
 from towhee.utils.log import engine_log
 from .operator_manager import OperatorPool
 from .data_queue import DataQueue
 from .dag_repr import DAGRepr
+from .execution_plan import ExecutionPlan, compile_dag
 from .nodes import create_node, NodeStatus
 from .node_repr import NodeRepr
 from .time_profiler import TimeProfiler, Event
+from . import tracing
+from .cancellation import PipelineTimeoutError, PipelineCancelledError, current_token
+from .scheduler import Priority, PriorityThreadPoolExecutor, LatencyStats
+from .admission import AdmissionController, PipelineOverloadedError
+from .error_policy import ErrorPolicy, DeadLetterSink
+from .checkpoint import Checkpoint
+from .constants import ConcatConst, InputConst, OutputConst
+from .thread_budget import split_thread_budget
+from .memory_budget import MemoryBudget
+from .inline_runner import InlineRunner, linear_chain
+
+
+_NO_ITEM = object()
+
+
+def _remaining(deadline: float):
+    return max(deadline - time.monotonic(), 0) if deadline is not None else None
+
+
+def start_pipeline_span(num_nodes: int) -> Optional['tracing.Span']:
+    """
+    The span of a pipeline call, None if tracing is disabled or the call is not sampled.
+    """
+    if tracing.get_tracer() is None:
+        return None
+    return tracing.start_span('towhee.pipeline', {'towhee.pipeline.nodes': num_nodes})
 
 
 class _GraphResult:
+    """
+    The future of a pipeline call.
+    """
     def __init__(self, graph: '_Graph'):
         self._graph = graph
 
-    def result(self):
-        ret = self._graph.result()
+    def result(self, timeout: float = None):
+        """
+        Wait for the output `DataQueue` of the call.
+
+        Args:
+            timeout (`float`): The seconds to wait, the call is cancelled and `PipelineTimeoutError`
+                is raised if it does not finish in time, defaults to wait forever.
+        """
+        ret = self._graph.result(timeout)
         self._graph.release_op()
-        del self._graph
         return ret
 
+    def cancel(self) -> bool:
+        """
+        Cancel the call, returns False if the call has already finished.
+        """
+        return self._graph.cancel()
+
+    def cancelled(self) -> bool:
+        return self._graph.cancelled
+
+    def add_done_callback(self, fn: Callable[['_GraphResult'], None]):
+        """
+        Call `fn` with the future once the call finishes or is cancelled, at once if it has already.
+        """
+        self._graph.add_done_callback(fn)
+
+    def done(self) -> bool:
+        return self._graph.done
+
 
 class _Graph:
     """
@@ -45,24 +103,53 @@ class _Graph:
         nodes(`Dict[str, NodeRepr]`): The pipeline nodes from DAGRepr.nodes.
         edges(`Dict[str, Any]`): The pipeline edges from DAGRepr.edges.
         operator_pool(`OperatorPool`): The operator pool.
-        thread_pool(`OperatorPool`): The ThreadPoolExecutor.
+        thread_pool(`PriorityThreadPoolExecutor`): The thread pool running the nodes.
+        latency_stats(`LatencyStats`): Records the latency of the finished call.
+        admission(`AdmissionController`): The slot of the call is released to it once the call finishes.
+        error_policies(`Dict[str, ErrorPolicy]`): The error policies of the nodes, the other nodes fail the call on errors.
+        intra_op_threads(`Dict[str, int]`): The intra-op threads of the nodes, overriding their configs.
+        memory_budget(`MemoryBudget`): The bytes of the queues are charged to it, except the output queue.
+        trace_limits(`Dict[str, Any]`): The `keep_rows`, `keep_bytes` and `copy_data` of the traced queues, except the
+            output queue.
     """
     def __init__(self,
                  nodes: Dict[str, NodeRepr],
                  edges: Dict[str, Any],
                  operator_pool: 'OperatorPool',
-                 thread_pool: 'ThreadPoolExecutor',
+                 thread_pool: 'PriorityThreadPoolExecutor',
                  time_profiler: 'TimeProfiler' = None,
-                 trace_edges: list = None):
+                 trace_edges: list = None,
+                 latency_stats: 'LatencyStats' = None,
+                 admission: 'AdmissionController' = None,
+                 error_policies: Dict[str, 'ErrorPolicy'] = None,
+                 intra_op_threads: Dict[str, int] = None,
+                 memory_budget: 'MemoryBudget' = None,
+                 trace_limits: Dict[str, Any] = None):
         self._nodes = nodes
         self._edges = edges
         self._operator_pool = operator_pool
         self._thread_pool = thread_pool
         self._time_profiler = time_profiler
         self._trace_edges = trace_edges
+        self._latency_stats = latency_stats
+        self._admission = admission
+        self._error_policies = error_policies
+        self._intra_op_threads = intra_op_threads
+        self._memory_budget = memory_budget
+        self._trace_limits = trace_limits or {}
+        self._priority = Priority.NORMAL
+        self._start = None
         self._node_runners = None
         self._data_queues = None
+        self._trace_span = None
         self.features = None
+        self._lock = threading.RLock()
+        self._finished = threading.Event()
+        self._running = 0
+        self._cancelled = False
+        self._token = None
+        self._token_handle = None
+        self._done_callbacks = []
         self._time_profiler.record(Event.pipe_name, Event.pipe_in)
         self._initialize()
         self._input_queue = self._data_queues[0]
@@ -72,48 +159,188 @@ class _Graph:
         self._data_queues = dict(
             (
                 name,
-                DataQueue(edge['data'], keep_data=(self._trace_edges and self._trace_edges.get(name, False)))
+                DataQueue(edge['data'], keep_data=(self._trace_edges and self._trace_edges.get(name, False)),
+                          memory=self._memory_account(name),
+                          **(self._trace_limits if name not in self._nodes[OutputConst.name].out_edges else {}))
             ) for name, edge in self._edges.items()
         )
+        for node_repr in self._nodes.values():
+            if node_repr.config.queue_size is not None:
+                for edge in node_repr.out_edges:
+                    self._data_queues[edge].max_size = node_repr.config.queue_size
         for name in self._nodes:
             in_queues = [self._data_queues[edge] for edge in self._nodes[name].in_edges]
             out_queues = [self._data_queues[edge] for edge in self._nodes[name].out_edges]
             node = create_node(self._nodes[name], self._operator_pool, in_queues, out_queues, self._time_profiler)
+            if self._intra_op_threads and name in self._intra_op_threads:
+                node.intra_op_threads = self._intra_op_threads[name]
             if not node.initialize():
                 raise RuntimeError(node.err_msg)
+            if self._error_policies and name in self._error_policies:
+                node.error_policy = self._error_policies[name]
             self._node_runners.append(node)
 
-    def result(self) -> any:
-        for f in self.features:
-            f.result()
+    def _memory_account(self, edge: str) -> Optional['MemoryAccount']:
+        """
+        The account of the node putting to the edge, the output queue is handed to the caller and not charged.
+        """
+        if self._memory_budget is None or edge in self._nodes[OutputConst.name].out_edges:
+            return None
+        for node in self._nodes.values():
+            if edge in node.out_edges:
+                return self._memory_budget.account(node.name)
+        return self._memory_budget.account(InputConst.name)
+
+    def _release_memory(self):
+        if self._memory_budget is None:
+            return
+        self._time_profiler.memory = dict(
+            (uid, sum(self._data_queues[edge].peak_nbytes for edge in node.out_edges)) for uid, node in self._nodes.items()
+        )
+        for que in self._data_queues.values():
+            que.release_memory()
+
+    def result(self, timeout: float = None) -> any:
+        if not self._finished.wait(timeout) and self.cancel():
+            raise PipelineTimeoutError('The pipeline call did not finish in {} seconds.'.format(timeout))
+        if self._cancelled:
+            raise PipelineCancelledError('The pipeline call has been cancelled.')
+        # All the nodes have exited, drop the futures to break the reference cycle through their callbacks.
+        self.features = []
         errs = ''
         for node in self._node_runners:
             if node.status != NodeStatus.FINISHED:
                 if node.status == NodeStatus.FAILED:
                     errs += node.err_msg + '\n'
         if errs:
+            self._end_trace(errs)
             raise RuntimeError(errs)
+        self._end_trace()
         end_edge_num = self._nodes['_output'].out_edges[0]
         res = self._data_queues[end_edge_num]
         self.time_profiler.record(Event.pipe_name, Event.pipe_out)
         return res
 
-    def async_call(self, inputs: Union[Tuple, List]):
+    def async_call(self, inputs: Union[Tuple, List], priority: int = Priority.NORMAL, deadline: float = None,
+                   trace_span: 'tracing.Span' = None):
+        """
+        Submit the nodes, the nodes of the calls with higher `priority` and then earlier `deadline`
+        (a `time.monotonic()` timestamp) are started first when the thread pool is busy. `trace_span` is the span
+        of the call if it has been started already.
+        """
+        self._priority = priority
+        self._start = time.perf_counter()
+        self.features = []
+        self._token = current_token()
+        if self._token is not None and self._token.cancelled:
+            self._trace_span = trace_span
+            return self._cancel_unstarted()
         self.time_profiler.inputs = inputs
+        self._trace_span = trace_span or start_pipeline_span(len(self._nodes))
         self._input_queue.put(inputs)
         self._input_queue.seal()
-        self.features = []
+        self._running = len(self._node_runners)
         for node in self._node_runners:
-            self.features.append(self._thread_pool.submit(node.process))
+            f = self._thread_pool.submit_with_priority(tracing.bind(self._trace_span, node.process), priority, deadline)
+            self.features.append(f)
+            f.add_done_callback(lambda _, node=node: self._on_node_done(node))
+        if self._token is not None:
+            self._token_handle = self._token.add_callback(self.cancel)
         return _GraphResult(self)
 
+    def _cancel_unstarted(self):
+        self._cancelled = True
+        self.release_op()
+        if self._admission is not None:
+            self._admission.release()
+        self._end_trace('The pipeline call has been cancelled.')
+        self._finished.set()
+        return _GraphResult(self)
+
+    def add_done_callback(self, fn: Callable[[_GraphResult], None]):
+        with self._lock:
+            if not self._finished.is_set():
+                self._done_callbacks.append(fn)
+                return
+        fn(_GraphResult(self))
+
+    def _run_done_callbacks(self):
+        with self._lock:
+            callbacks, self._done_callbacks = self._done_callbacks, []
+        for fn in callbacks:
+            try:
+                fn(_GraphResult(self))
+            except Exception as e:  # pylint: disable=broad-except
+                engine_log.error('The done callback of the pipeline call failed: %s', str(e))
+
+    def _on_node_done(self, node):
+        with self._lock:
+            self._running -= 1
+            if self._cancelled:
+                node.release_op()
+                return
+            if self._running != 0:
+                return
+            latency = time.perf_counter() - self._start
+            self._release_memory()
+            if self._latency_stats is not None:
+                self._latency_stats.record(self._priority, latency)
+            if self._admission is not None:
+                self._admission.release(latency)
+            self._finished.set()
+            if self._token is not None:
+                self._token.remove_callback(self._token_handle)
+        self._run_done_callbacks()
+
+    def cancel(self) -> bool:
+        """
+        Stop the nodes and seal all the queues, the operators are released once their nodes exit.
+        """
+        with self._lock:
+            if self._cancelled or self._finished.is_set():
+                return False
+            self._cancelled = True
+            for f, node in zip(self.features, self._node_runners):
+                node.stop()
+                if f.done():
+                    node.release_op()
+                else:
+                    f.cancel()
+        for que in self._data_queues.values():
+            que.clear_and_seal()
+        if self._admission is not None:
+            self._admission.release()
+        self._end_trace('The pipeline call has been cancelled.')
+        self._finished.set()
+        self._run_done_callbacks()
+        return True
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    @property
+    def done(self) -> bool:
+        return self._finished.is_set()
+
+    def _end_trace(self, err: str = None):
+        if self._trace_span is None:
+            return
+        if err:
+            self._trace_span.set_status(tracing.StatusCode.ERROR, err)
+        else:
+            self._trace_span.set_status(tracing.StatusCode.OK)
+        self._trace_span.end()
+        self._trace_span = None
+
     def release_op(self):
         for node in self._node_runners:
             node.release_op()
 
-    def __call__(self, inputs: Union[Tuple, List]):
-        f = self.async_call(inputs)
-        return f.result()
+    def __call__(self, inputs: Union[Tuple, List], priority: int = Priority.NORMAL, deadline: float = None,
+                 trace_span: 'tracing.Span' = None):
+        f = self.async_call(inputs, priority, deadline, trace_span)
+        return f.result(_remaining(deadline))
 
     @property
     def time_profiler(self):
@@ -135,31 +362,434 @@ class RuntimePipeline:
 
     Args:
         dag_dict(`Dict`): The DAG Dictionary from the user pipeline.
-        max_workers(`int`): The maximum number of threads.
+        max_workers(`int`): The maximum number of threads, the nodes of the calls with higher priority
+            and then earlier deadline are started first once all the threads are busy.
     """
 
     def __init__(self, dag: Union[Dict, DAGRepr], max_workers: int = None):
         if isinstance(dag, Dict):
-            self._dag_repr = DAGRepr.from_dict(dag)
+            self._plan = compile_dag(dag)
         else:
-            self._dag_repr = dag
+            self._plan = ExecutionPlan(dag)
+        self._dag_repr = self._plan.dag_repr
         self._operator_pool = OperatorPool()
-        self._thread_pool = ThreadPoolExecutor(max_workers=max_workers)
+        self._thread_pool = PriorityThreadPoolExecutor(max_workers=max_workers)
+        self._latency_stats = LatencyStats()
+        self._admission = None
+        self._error_policy = ErrorPolicy()
+        self._node_error_policies = self._resolve_error_policies()
+        self._thread_budget = None
+        self._node_threads = None
+        self._inline_runner = InlineRunner(self._plan, self._operator_pool) if linear_chain(self._plan) else None
+        self._inline = True
+        self._memory_budget = None
+
+    def _resolve_error_policies(self) -> Dict[str, ErrorPolicy]:
+        policies = {}
+        for uid, node in self._plan.nodes.items():
+            policy = self._error_policy.with_node_config(node.config)
+            if policy.policy != ErrorPolicy.FAIL:
+                policies[uid] = policy
+        return policies
+
+    def on_error(self, policy: str, default: Any = None, sink: DeadLetterSink = None) -> 'RuntimePipeline':
+        """
+        Set what the nodes do when their operators raise on a row, the nodes with `error_policy` in their config
+        keep their own policy.
+
+        Args:
+            policy (`str`): 'fail' fails the call, 'skip' drops the row and 'default' outputs `default` instead,
+                the failed rows of 'skip' and 'default' are recorded to the dead-letter sink.
+            default (`Any`): The output of the failed rows for 'default', a tuple for the nodes with multiple outputs.
+            sink (`DeadLetterSink`): Where the failed rows are recorded, a `ListSink` or a `JSONLSink`,
+                defaults to an in-memory `ListSink`.
+
+        Examples:
+            >>> from towhee import pipe
+            >>> p = pipe.input('x').flat_map('x', 'x', lambda x: x).map('x', 'y', lambda x: 1 / x).output('y').on_error('skip')
+            >>> p([1, 0, 2]).to_list()
+            [[1.0], [0.5]]
+            >>> [(r['node'], r['row'], r['inputs']) for r in p.dead_letters.records]
+            [('lambda-1', 1, [0])]
+        """
+        self._error_policy = ErrorPolicy(policy, default, sink)
+        self._node_error_policies = self._resolve_error_policies()
+        return self
+
+    @property
+    def dead_letters(self) -> DeadLetterSink:
+        """
+        The dead-letter sink of the pipeline.
+        """
+        return self._error_policy.sink
+
+    def limit(self,
+              max_concurrency: int,
+              max_queue: int = 0,
+              queue_timeout: float = None,
+              target_latency: float = None,
+              min_concurrency: int = 1) -> 'RuntimePipeline':
+        """
+        Limit the concurrent calls of the pipeline, the calls over the limit wait in a queue of `max_queue` calls,
+        and `PipelineOverloadedError` is raised once the queue is full or a call waited `queue_timeout` seconds.
+        With `target_latency` the limit adapts between `min_concurrency` and `max_concurrency` to keep the latency
+        of the calls under the target.
+
+        Examples:
+            >>> from towhee import pipe
+            >>> p = pipe.input('a').map('a', 'b', lambda x: x + 1).output('b').limit(4, max_queue=16)
+            >>> p(1).get()
+            [2]
+            >>> p.admission_stats()
+            {'limit': 4, 'running': 0, 'queued': 0, 'rejected': 0}
+        """
+        self._admission = AdmissionController(max_concurrency, max_queue, queue_timeout, target_latency, min_concurrency)
+        if self._thread_budget is not None:
+            self._node_threads = self._resolve_thread_budget()
+        return self
+
+    def thread_budget(self, total_threads: int = None) -> 'RuntimePipeline':
+        """
+        Share `total_threads` CPU threads, defaults to the number of CPUs, among the intra-op thread pools
+        (torch, OpenMP and BLAS) of the nodes, so that the nodes running at the same time do not oversubscribe
+        the CPUs. The nodes with `intra_op_threads` in their config keep it, the other nodes get an even share
+        of the rest, divided by `max_concurrency` if the calls are limited by `limit`. The OpenMP threads are
+        limited per node, the torch and BLAS thread pools are shared by the process and limited to the largest
+        share of the running nodes.
+
+        Examples:
+            >>> from towhee import pipe
+            >>> p = (pipe.input('a')
+            ...          .map('a', 'b', lambda x: x + 1)
+            ...          .map('b', 'c', lambda x: x * 2, config={'intra_op_threads': 2})
+            ...          .output('c')
+            ...          .thread_budget(8))
+            >>> sorted(p.intra_op_threads().values())
+            [2, 6]
+        """
+        self._thread_budget = total_threads or 0
+        self._node_threads = self._resolve_thread_budget()
+        return self
+
+    def inline(self, enabled: bool = True) -> 'RuntimePipeline':
+        """
+        Run the calls of a pipeline of map and filter nodes on scalar columns on the calling thread, without the
+        queues and the threads between the nodes, for the low latency of single-row calls. It is enabled by default,
+        the calls with `timeout`, under `limit` or `memory_limit`, or recorded by the tracer still run the graph.
+        The calls in a `cancel_scope` check the token before every node.
+
+        Examples:
+            >>> from towhee import pipe
+            >>> p = pipe.input('a').map('a', 'b', lambda x: x + 1).output('b')
+            >>> p.runs_inline, p.inline(False).runs_inline
+            (True, False)
+        """
+        self._inline = enabled
+        return self
+
+    @property
+    def runs_inline(self) -> bool:
+        """
+        Whether the calls without `timeout`, `limit` and recorded traces run on the calling thread.
+        """
+        return self._inline and self._inline_runner is not None
+
+    def _resolve_thread_budget(self) -> Dict[str, int]:
+        nodes = [uid for uid, node in self._plan.nodes.items()
+                 if uid not in (InputConst.name, OutputConst.name) and node.iter_info.type != ConcatConst.name]
+        fixed = dict((uid, self._plan.nodes[uid].config.intra_op_threads) for uid in nodes
+                     if self._plan.nodes[uid].config.intra_op_threads is not None)
+        calls = self._admission.limit if self._admission is not None else 1
+        return split_thread_budget(nodes, fixed, self._thread_budget or None, calls)
+
+    def intra_op_threads(self) -> Dict[str, int]:
+        """
+        The intra-op threads of the nodes by name, the nodes not limited are omitted.
+        """
+        threads = self._node_threads or {}
+        return dict((node.name, threads.get(uid, node.config.intra_op_threads)) for uid, node in self._plan.nodes.items()
+                    if threads.get(uid, node.config.intra_op_threads) is not None)
+
+    def admission_stats(self) -> Dict:
+        """
+        The current limit, running and waiting calls and the rejected calls, None if the calls are not limited.
+        """
+        return self._admission.stats() if self._admission is not None else None
+
+    def memory_limit(self, max_bytes: int, policy: str = 'block', timeout: float = None) -> 'RuntimePipeline':
+        """
+        Cap the approximate bytes of the rows in the queues of the running calls, the output queues excluded. A node
+        putting a row over the budget waits for the next nodes to read rows from the queue, the new calls over the
+        budget wait for the budget if `policy` is 'block', or are rejected with `PipelineMemoryError`, a
+        `PipelineOverloadedError`, if `policy` is 'reject' or they waited longer than `timeout` seconds.
+
+        The bytes are the `nbytes` of the arrays and the length of `bytes` and `str`, see `memory_budget.sizeof`.
+        The buffers of the window nodes and the operators are not counted, and an empty queue always takes a row so
+        that every call makes progress, the peak may be over the budget by a row of every running call.
+
+        Examples:
+            >>> import numpy as np
+            >>> from towhee import pipe
+            >>> p = (pipe.input('n')
+            ...          .flat_map('n', 'x', lambda n: [np.zeros(1024, dtype=np.uint8)] * n)
+            ...          .map('x', 'y', lambda x: x.sum())
+            ...          .output('y')
+            ...          .memory_limit(4096))
+            >>> len(p(100).to_list()), p.memory_stats()['used_bytes'], p.memory_stats()['peak_bytes'] <= 4096
+            (100, 0, True)
+        """
+        self._memory_budget = MemoryBudget(max_bytes, policy, timeout)
+        return self
+
+    def memory_stats(self) -> Dict:
+        """
+        The budget, the used and the peak bytes of the queues of the running calls, the bytes by the node putting
+        them, and the calls waiting for the budget and rejected, None if the memory is not limited.
+        """
+        return self._memory_budget.stats() if self._memory_budget is not None else None
+
+    def operator_stats(self) -> Dict[str, Dict]:
+        """
+        The pooled instances of the hub operators by node name, bounded by `max_instances` of the node config: the
+        instances, the free instances, the acquisitions served by a free instance, by a new one, after waiting and
+        failed after waiting, and the evicted instances.
+        """
+        stats = self._operator_pool.stats()
+        return dict((node.name, stats[uid]) for uid, node in self._plan.nodes.items() if uid in stats)
+
+    def _graph(self, time_profiler: 'TimeProfiler', trace_edges: list = None, priority: int = Priority.NORMAL,
+               deadline: float = None, trace_limits: Dict[str, Any] = None) -> _Graph:
+        """
+        Create the graph of a call, once the memory budget and the admission controller, if any, let the call run.
+        """
+        memory_budget = self._memory_budget
+        if memory_budget is not None:
+            memory_budget.admit(_remaining(deadline))
+        elif time_profiler.enabled:
+            # Count the bytes of the queues for the profiler.
+            memory_budget = MemoryBudget()
+        admission = self._admission
+        if admission is not None:
+            admission.acquire(priority, _remaining(deadline))
+        try:
+            return _Graph(self._plan.nodes, self._plan.edges, self._operator_pool, self._thread_pool, time_profiler,
+                          trace_edges, self._latency_stats, admission, self._node_error_policies, self._node_threads,
+                          memory_budget, trace_limits)
+        except Exception:
+            if admission is not None:
+                admission.release()
+            raise
 
     def preload(self):
         """
         Preload the operators.
         """
-        return _Graph(self._dag_repr.nodes, self._dag_repr.edges, self._operator_pool, self._thread_pool, TimeProfiler(False))
+        return _Graph(self._plan.nodes, self._plan.edges, self._operator_pool, self._thread_pool, TimeProfiler(False))
 
-    def __call__(self, *inputs):
+    def __call__(self, *inputs, timeout: float = None, priority: Union[str, int] = None):
         """
         Output with ordering matching the input `DataQueue`.
+
+        If `timeout` is set and the call does not finish in `timeout` seconds, the call is cancelled
+        and `PipelineTimeoutError` is raised. `priority` is one of 'high', 'normal' and 'low', defaults to 'normal'.
+        """
+        return self._call(*inputs, profiler=False, tracer=False, timeout=timeout, priority=priority)[0]
+
+    def batch(self, batch_inputs, timeout: float = None, priority: Union[str, int] = None):
+        """
+        Run the pipeline on every inputs, `timeout` is the deadline of the whole batch.
+        """
+        return self._batch(batch_inputs, profiler=False, tracer=False, timeout=timeout, priority=priority)[0]
+
+    def async_call(self, *inputs, priority: Union[str, int] = None, deadline: float = None) -> _GraphResult:
+        """
+        Start a call and return its future, `future.result(timeout)` waits for the output and `future.cancel()`
+        stops the call. `deadline` is the `time.monotonic()` timestamp used to order the calls of the same priority.
+
+        Examples:
+            >>> from towhee import pipe
+            >>> p = pipe.input('a').map('a', 'b', lambda x: x + 1).output('b')
+            >>> f = p.async_call(1)
+            >>> f.result().get()
+            [2]
+        """
+        priority = Priority.value(priority)
+        return self._graph(TimeProfiler(False), priority=priority, deadline=deadline).async_call(inputs, priority, deadline)
+
+    def imap(self, inputs: Iterable, max_inflight: int = 16, ordered: bool = True, priority: Union[str, int] = None):
         """
-        return self._call(*inputs, profiler=False, tracer=False)[0]
+        Run the pipeline on every inputs like `batch`, reading `inputs` lazily with at most `max_inflight` calls
+        running, and yield the outputs as they complete, in the order of the inputs if `ordered`, else in the order
+        they complete. The running calls are cancelled if a call fails or the generator is closed.
 
-    def batch(self, batch_inputs):
-        return self._batch(batch_inputs, profiler=False, tracer=False)[0]
+        Args:
+            inputs (`Iterable`): The inputs of the calls, a tuple for the pipelines with multiple inputs.
+            max_inflight (`int`): The maximum running calls.
+            ordered (`bool`): Whether to yield the outputs in the order of the inputs.
+            priority (`Union[str, int]`): The priority of the calls.
+
+        Examples:
+            >>> from towhee import pipe
+            >>> p = pipe.input('a').map('a', 'b', lambda x: x + 1).output('b')
+            >>> [q.get()[0] for q in p.imap(range(5), max_inflight=2)]
+            [1, 2, 3, 4, 5]
+        """
+        priority = Priority.value(priority)
+        single_input = len(self._plan.nodes['_input'].inputs) == 1
+        inputs = iter(inputs)
+        inflight = deque()
+        done = queue.SimpleQueue()
+        item = _NO_ITEM
+        try:
+            while True:
+                while len(inflight) < max_inflight:
+                    if item is _NO_ITEM:
+                        item = next(inputs, _NO_ITEM)
+                        if item is _NO_ITEM:
+                            break
+                    try:
+                        f = self.async_call(*((item,) if single_input else item), priority=priority)
+                    except PipelineOverloadedError:
+                        # Wait for a running call of the generator rather than being rejected by it.
+                        if not inflight:
+                            raise
+                        break
+                    item = _NO_ITEM
+                    inflight.append(f)
+                    if not ordered:
+                        f.add_done_callback(lambda _, f=f: done.put(f))
+                if not inflight:
+                    return
+                if ordered:
+                    f = inflight.popleft()
+                else:
+                    f = done.get()
+                    inflight.remove(f)
+                yield f.result()
+        finally:
+            for f in inflight:
+                f.cancel()
+
+    def bulk_run(self,
+                 inputs: Iterable,
+                 checkpoint: Union[str, Path, Checkpoint],
+                 row_id: Callable[[Any], str] = None,
+                 commit_every: int = 1000,
+                 max_in_flight: int = 16,
+                 on_result: Callable[[str, DataQueue], None] = None) -> Dict:
+        """
+        Run the pipeline on every inputs like `batch`, committing the progress to `checkpoint` every `commit_every`
+        rows and when the run ends or fails. Rerun with the same checkpoint and the same inputs in the same order to
+        resume: the rows before the committed offset are skipped without being read by `row_id`, and the rows completed
+        after the offset are skipped by their id.
+
+        Args:
+            inputs (`Iterable`): The inputs of the calls, a tuple for the pipelines with multiple inputs.
+            checkpoint (`Union[str, Path, Checkpoint]`): The checkpoint or the path of its sqlite file.
+            row_id (`Callable[[Any], str]`): The id of the row from its inputs, defaults to the index of the row.
+            commit_every (`int`): How many completed rows between the commits.
+            max_in_flight (`int`): The maximum concurrent calls.
+            on_result (`Callable[[str, DataQueue], None]`): Called with the id and the output of every completed row,
+                a row is completed once it returns.
+
+        Returns:
+            A dict with the rows run, the rows skipped and the committed offset.
+
+        Examples:
+            >>> import tempfile
+            >>> from pathlib import Path
+            >>> from towhee import pipe
+            >>> p = pipe.input('a').map('a', 'b', lambda x: x + 1).output('b')
+            >>> with tempfile.TemporaryDirectory() as root:
+            ...     print(p.bulk_run(range(5), Path(root) / 'job.ckpt'))
+            ...     print(p.bulk_run(range(8), Path(root) / 'job.ckpt'))
+            {'run': 5, 'skipped': 0, 'offset': 5}
+            {'run': 3, 'skipped': 5, 'offset': 8}
+        """
+        ckpt = checkpoint if isinstance(checkpoint, Checkpoint) else Checkpoint(checkpoint)
+        single_input = len(self._plan.nodes['_input'].inputs) == 1
+        start = ckpt.offset
+        done_ids = ckpt.done_ids()
+        pending = deque()
+        completed = []
+        stats = {'run': 0, 'skipped': start, 'offset': start}
+
+        def _collect():
+            idx, rid, f = pending.popleft()
+            if f is not None:
+                res = f.result()
+                if on_result is not None:
+                    on_result(rid, res)
+                stats['run'] += 1
+                completed.append((rid, idx))
+            stats['offset'] = idx + 1
+            if len(completed) >= commit_every:
+                ckpt.commit(stats['offset'], completed)
+                completed.clear()
+
+        try:
+            for idx, item in enumerate(inputs):
+                if idx < start:
+                    continue
+                rid = row_id(item) if row_id is not None else str(idx)
+                if rid in done_ids:
+                    stats['skipped'] += 1
+                    pending.append((idx, rid, None))
+                else:
+                    while True:
+                        try:
+                            f = self.async_call(*((item,) if single_input else item))
+                            break
+                        except PipelineOverloadedError:
+                            # Wait for its own calls rather than being rejected by them.
+                            if not pending:
+                                raise
+                            _collect()
+                    pending.append((idx, rid, f))
+                while len(pending) > max_in_flight or (pending and pending[0][2] is None):
+                    _collect()
+            while pending:
+                _collect()
+        except BaseException:
+            # Keep the calls which complete after the failure, the failed row and the rest run again on resume.
+            for idx, rid, f in pending:
+                if f is None:
+                    completed.append((rid, idx))
+                    continue
+                try:
+                    res = f.result()
+                    if on_result is not None:
+                        on_result(rid, res)
+                    completed.append((rid, idx))
+                except Exception:  # pylint: disable=broad-except
+                    pass
+            raise
+        finally:
+            ckpt.commit(stats['offset'], completed)
+            if not isinstance(checkpoint, Checkpoint):
+                ckpt.close()
+        return stats
+
+    def multiprocess(self, num_workers: int = None, chunk_size: int = 16, shared_memory: bool = False) -> 'MultiProcessPipeline':
+        """
+        Run the pipeline in `num_workers` forked processes with the same `__call__` and `batch` API,
+        see `MultiProcessPipeline`.
+        """
+        from .multiprocess_pipeline import MultiProcessPipeline  # pylint: disable=import-outside-toplevel
+        return MultiProcessPipeline(self, num_workers, chunk_size, shared_memory=shared_memory)
+
+    def latency_stats(self) -> Dict[str, Dict]:
+        """
+        The latency percentiles of the recent calls of every priority class.
+
+        Examples:
+            >>> from towhee import pipe
+            >>> p = pipe.input('a').map('a', 'b', lambda x: x + 1).output('b')
+            >>> _ = p(1, priority='high')
+            >>> p.latency_stats()['high']['count']
+            1
+        """
+        return self._latency_stats.summary()
 
     def flush(self):
         """
@@ -167,44 +797,95 @@ class RuntimePipeline:
         """
         self._operator_pool.flush()
 
-    def _call(self, *inputs, profiler: bool, tracer: bool, trace_edges: list = None):
+    def release_process_ops(self):
         """
-        Run pipeline with debug option.
+        Stop the processes of the nodes with `num_processes` in their config.
         """
-        time_profiler = TimeProfiler(True) if profiler else TimeProfiler(False)
-        graph = _Graph(self._dag_repr.nodes, self._dag_repr.edges, self._operator_pool, self._thread_pool, time_profiler, trace_edges)
+        self._operator_pool.release_process_ops()
 
-        return graph(inputs), [graph.time_profiler] if profiler else None, [graph.data_queues] if tracer else None
+    def _call(self, *inputs, profiler: bool, tracer: bool, trace_edges: list = None, timeout: float = None,
+              priority: Union[str, int] = None, trace_limits: Dict[str, Any] = None):
+        """
+        Run pipeline with debug option.
+        """
+        priority = Priority.value(priority)
+        trace_span = None
+        if not profiler and not tracer and timeout is None and self._can_inline():
+            # The calls recorded by the tracer run the graph, which has the spans of the nodes.
+            trace_span = start_pipeline_span(len(self._plan.nodes))
+            if trace_span is None:
+                start = time.perf_counter()
+                try:
+                    return self._inline_runner(  # pylint: disable=not-callable
+                        inputs, self._node_error_policies, self._node_threads), None, None
+                finally:
+                    self._latency_stats.record(priority, time.perf_counter() - start)
 
-    def _batch(self, batch_inputs, profiler: bool, tracer: bool, trace_edges: list = None):
+        time_profiler = TimeProfiler(True) if profiler else TimeProfiler(False)
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        try:
+            graph = self._graph(time_profiler, trace_edges, priority, deadline, trace_limits)
+        except Exception as e:
+            if trace_span is not None:
+                trace_span.set_status(tracing.StatusCode.ERROR, str(e))
+                trace_span.end()
+            raise
+
+        res = graph(inputs, priority, deadline, trace_span)
+        return res, [graph.time_profiler] if profiler else None, [graph.data_queues] if tracer else None
+
+    def _can_inline(self) -> bool:
+        return self.runs_inline and self._admission is None and self._memory_budget is None
+
+    def _batch(self, batch_inputs, profiler: bool, tracer: bool, trace_edges: list = None, timeout: float = None,
+               priority: Union[str, int] = None, trace_limits: Dict[str, Any] = None, trace_every: int = 1):
         """
-        Run batch call with debug option.
+        Run batch call with debug option, tracing one in every `trace_every` calls.
         """
-        graph_res = []
+        priority = Priority.value(priority)
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        graph_res = deque()
         time_profilers = []
         data_queues = []
-        for inputs in batch_inputs:
-            time_profiler = TimeProfiler(False) if time_profilers is None else TimeProfiler(True)
-            gh = _Graph(self._dag_repr.nodes, self._dag_repr.edges, self._operator_pool, self._thread_pool, time_profiler, trace_edges)
-
-            if profiler:
-                time_profilers.append(gh.time_profiler)
-            if tracer:
-                data_queues.append(gh.data_queues)
-            if gh.input_col_size == 1:
-                inputs = (inputs, )
-            graph_res.append(gh.async_call(inputs))
-
         rets = []
-        for gf in graph_res:
-            ret = gf.result()
-            rets.append(ret)
+        try:
+            for i, inputs in enumerate(batch_inputs):
+                time_profiler = TimeProfiler(True) if profiler else TimeProfiler(False)
+                traced = tracer and i % trace_every == 0
+                while True:
+                    try:
+                        gh = self._graph(time_profiler, trace_edges if traced else None, priority, deadline, trace_limits)
+                        break
+                    except PipelineOverloadedError:
+                        # The batch waits for its own calls rather than being rejected by them.
+                        if not graph_res:
+                            raise
+                        rets.append(graph_res.popleft().result(_remaining(deadline)))
+
+                if profiler:
+                    time_profilers.append(gh.time_profiler)
+                if traced:
+                    data_queues.append(gh.data_queues)
+                if gh.input_col_size == 1:
+                    inputs = (inputs, )
+                graph_res.append(gh.async_call(inputs, priority, deadline))
+
+            for gf in graph_res:
+                rets.append(gf.result(_remaining(deadline)))
+        except Exception:
+            for gf in graph_res:
+                gf.cancel()
+            raise
         return rets, time_profilers if time_profilers else None, data_queues if data_queues else None
 
     @property
     def dag_repr(self):
         return self._dag_repr
 
+    @property
+    def plan(self) -> ExecutionPlan:
+        return self._plan
+
     def _get_trace_nodes(self, include, exclude):
         def _find_match(patterns, x):
             return any(re.search(pattern, x) for pattern in patterns)
@@ -236,14 +917,21 @@ class RuntimePipeline:
         profiler: bool = False,
         tracer: bool = False,
         include: Union[List[str], str] = None,
-        exclude: Union[List[str], str] = None
+        exclude: Union[List[str], str] = None,
+        trace_rows: int = None,
+        trace_bytes: int = None,
+        trace_every: int = 1,
+        trace_copy: bool = True
     ):
         """
         Run pipeline in debug mode.
 
         One can record the running time of each operator by setting `profiler` to `True`, or record the data of itermediate nodes
         by setting `tracer` to True. Note that one should at least specify one of `profiler` and `tracer` options to True.
-        When debug with `tracer` option, one can specify which nodes to include or exclude.
+        When debug with `tracer` option, one can specify which nodes to include or exclude, and cap the traced data of
+        large inputs with `trace_rows`, `trace_bytes` and `trace_every`, the results are always kept whole. The traced
+        rows are read as snapshots: the immutable values and the read-only arrays are referenced, the writable arrays
+        are copied.
 
         Args:
             batch (`bool):
@@ -256,7 +944,26 @@ class RuntimePipeline:
                 The nodes not to trace.
             exclude (`Union[List[str], str]`):
                 The nodes to trace.
+            trace_rows (`int`):
+                The rows kept of every traced queue, defaults to all.
+            trace_bytes (`int`):
+                The approximate bytes kept of every traced queue, defaults to all.
+            trace_every (`int`):
+                Trace one in every `trace_every` calls in batch mode.
+            trace_copy (`bool`):
+                Whether to copy the writable values read from the traced queues, set it to False if the operators do
+                not change their inputs in place.
+
+        Examples:
+            >>> import numpy as np
+            >>> from towhee import pipe
+            >>> p = pipe.input('n').flat_map('n', 'x', lambda n: [np.ones(4)] * n).map('x', 'y', lambda x: x.sum()).output('y')
+            >>> v = p.debug(list(range(10)), batch=True, tracer=True, trace_rows=2, trace_every=5)
+            >>> len(v.node_collection), len(v.node_collection[1]['lambda-1']['out'][0])
+            (2, 2)
         """
+        if trace_every < 1:
+            raise ValueError('The trace_every should be positive, got {}.'.format(trace_every))
         if not profiler and not tracer:
             e_msg = 'You should set at least one of `profiler` or `tracer` to `True` when debug.'
             engine_log.error(e_msg)
@@ -268,10 +975,13 @@ class RuntimePipeline:
         time_profilers = [] if profiler else None
         data_queues = [] if tracer else None
 
+        trace_limits = {'keep_rows': trace_rows, 'keep_bytes': trace_bytes, 'copy_data': trace_copy}
         if not batch:
-            res, time_profilers, data_queues = self._call(*inputs, profiler=profiler, tracer=tracer, trace_edges=trace_edges)
+            res, time_profilers, data_queues = self._call(*inputs, profiler=profiler, tracer=tracer, trace_edges=trace_edges,
+                                                          trace_limits=trace_limits)
         else:
-            res, time_profilers, data_queues = self._batch(inputs[0], profiler=profiler, tracer=tracer, trace_edges=trace_edges)
+            res, time_profilers, data_queues = self._batch(inputs[0], profiler=profiler, tracer=tracer, trace_edges=trace_edges,
+                                                           trace_limits=trace_limits, trace_every=trace_every)
 
         v = visualizers.Visualizer(
             result=res, time_profiler=time_profilers, data_queues=data_queues ,nodes=self._dag_repr.to_dict().get('nodes'), trace_nodes=trace_nodes
@@ -0,0 +1,165 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import heapq
+import itertools
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Union
+
+import numpy as np
+
+
+class Priority:
+    """
+    The priority classes of pipeline calls, the tasks of a higher class are always started first.
+    """
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+    _NAMES = {'high': HIGH, 'normal': NORMAL, 'low': LOW}
+
+    @staticmethod
+    def value(priority: Union[str, int, None]) -> int:
+        """
+        Examples:
+            >>> from towhee.runtime.scheduler import Priority
+            >>> Priority.value('high'), Priority.value(None), Priority.value(2)
+            (0, 1, 2)
+        """
+        if priority is None:
+            return Priority.NORMAL
+        if isinstance(priority, str):
+            if priority.lower() not in Priority._NAMES:
+                raise ValueError('Unknown priority {}, should be one of {}.'.format(priority, list(Priority._NAMES)))
+            return Priority._NAMES[priority.lower()]
+        if priority not in Priority._NAMES.values():
+            raise ValueError('Unknown priority {}, should be one of {}.'.format(priority, list(Priority._NAMES)))
+        return priority
+
+    @staticmethod
+    def name(priority: int) -> str:
+        return dict((v, k) for k, v in Priority._NAMES.items())[priority]
+
+
+class _PrioritizedCall:
+    """
+    The callable submitted to the executor, carrying the order of the task.
+    """
+    def __init__(self, fn: Callable, sort_key):
+        self.fn = fn
+        self.sort_key = sort_key
+
+    def __call__(self):
+        return self.fn()
+
+
+class _PriorityWorkQueue(queue.Queue):
+    """
+    The work queue of `PriorityThreadPoolExecutor`: the work items are ordered by priority class, then by
+    deadline, then by submission.
+
+    It relies on how `concurrent.futures.thread` uses its work queue, checked against CPython 3.7 to 3.13: the
+    executor puts a `_WorkItem` with the submitted callable as `fn` for every task, `shutdown` and the exiting
+    workers put `None` to stop the workers, and the workers and `shutdown(cancel_futures=True)` take the items with
+    `get` and `get_nowait`. The entries are `(sort_key, seq, item)` since the work items are not orderable, and the
+    `None` goes after the queued tasks, so `shutdown` runs them first as the FIFO queue does.
+    """
+    _LAST = (float('inf'), float('inf'))
+
+    def _init(self, maxsize):
+        self.queue = []
+        self._seq = itertools.count()
+
+    def _qsize(self):
+        return len(self.queue)
+
+    def _put(self, item):
+        if item is None:
+            key = self._LAST
+        else:
+            key = getattr(item.fn, 'sort_key', (Priority.NORMAL, float('inf')))
+        heapq.heappush(self.queue, (key, next(self._seq), item))
+
+    def _get(self):
+        return heapq.heappop(self.queue)[2]
+
+
+class PriorityThreadPoolExecutor(ThreadPoolExecutor):
+    """
+    A `ThreadPoolExecutor` starting the queued tasks by priority class, and earliest deadline first in a class.
+    """
+    def __init__(self, max_workers: int = None, thread_name_prefix: str = ''):
+        super().__init__(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self._work_queue = _PriorityWorkQueue()
+
+    def submit_with_priority(self, fn: Callable, priority: int = Priority.NORMAL, deadline: float = None) -> Future:
+        """
+        Submit the task, `deadline` is a `time.monotonic()` timestamp, the tasks without deadline go after
+        the tasks with deadline of the same class.
+        """
+        return self.submit(_PrioritizedCall(fn, (priority, deadline if deadline is not None else float('inf'))))
+
+    @property
+    def queued(self) -> int:
+        return self._work_queue.qsize()
+
+
+class LatencyStats:
+    """
+    The latency of the recent calls of every priority class.
+
+    Args:
+        window (`int`): How many recent calls are kept for every class.
+    """
+    def __init__(self, window: int = 1000):
+        self._window = window
+        self._lock = threading.Lock()
+        self._latencies = {}
+        self._counts = {}
+
+    def record(self, priority: int, seconds: float):
+        with self._lock:
+            if priority not in self._latencies:
+                self._latencies[priority] = deque(maxlen=self._window)
+                self._counts[priority] = 0
+            self._latencies[priority].append(seconds)
+            self._counts[priority] += 1
+
+    def summary(self) -> Dict[str, Dict]:
+        """
+        Returns `{class: {'count': ..., 'p50_ms': ..., 'p90_ms': ..., 'p99_ms': ...}}`, the percentiles are
+        computed over the recent calls.
+        """
+        with self._lock:
+            latencies = dict((k, list(v)) for k, v in self._latencies.items())
+            counts = dict(self._counts)
+        ret = {}
+        for priority in sorted(latencies):
+            values = np.array(latencies[priority]) * 1000
+            ret[Priority.name(priority)] = {
+                'count': counts[priority],
+                'p50_ms': round(float(np.percentile(values, 50)), 4),
+                'p90_ms': round(float(np.percentile(values, 90)), 4),
+                'p99_ms': round(float(np.percentile(values, 99)), 4),
+            }
+        return ret
+
+    def reset(self):
+        with self._lock:
+            self._latencies = {}
+            self._counts = {}
@@ -21,6 +21,7 @@ from towhee.runtime.constants import (
     WindowConst,
     ReduceConst,
     FilterConst,
+    RouteConst,
     TimeWindowConst,
     FlatMapConst,
     ConcatConst,
@@ -58,7 +59,7 @@ class SchemaRepr(BaseModel):
             col_type = inputs_type[0]
         elif iter_type in [WindowAllConst.name, ReduceConst.name]:
             col_type = ColumnType.SCALAR
-        elif iter_type in [MapConst.name, FilterConst.name]:
+        elif iter_type in [MapConst.name, FilterConst.name, RouteConst.name]:
             if inputs_type is not None and ColumnType.QUEUE in inputs_type:
                 col_type = ColumnType.QUEUE
             else:
@@ -0,0 +1,361 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import os
+import uuid
+import pickle
+import weakref
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Tuple
+from concurrent.futures import CancelledError, Executor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from towhee.utils.log import engine_log
+
+
+# The arenas of this process by name, inherited by the forked processes.
+_ARENAS: Dict[str, 'SharedArena'] = {}
+
+_DIR_ENTRY = np.dtype([('block_size', np.int64), ('num_blocks', np.int64), ('name', 'S40')])
+
+
+def _align(size: int, alignment: int = 64) -> int:
+    return (size + alignment - 1) // alignment * alignment
+
+
+def _view(shm: shared_memory.SharedMemory, dtype, count: int, offset: int) -> np.ndarray:
+    # The view holds the buffer of the mapping, so the mapping is not unmapped while the arrays on it are alive.
+    return np.frombuffer(shm.buf, dtype, count, offset)
+
+
+class SharedArena:
+    """
+    A slab allocator on `multiprocessing.shared_memory` shared by a process and the processes forked from it.
+
+    The memory is allocated in blocks of power-of-two sizes, a slab is a shared memory segment of `slab_size`
+    bytes split into the blocks of one size. Every block has a reference count in its slab, it is reused once
+    the count drops to zero. The slabs created by any process are registered in a shared directory, so that
+    a block can be addressed by `(slab, block)` in all the processes.
+
+    The arena should be created before forking the processes using it, and closed by the creating process.
+
+    Args:
+        slab_size (`int`): The bytes of a slab, the blocks larger than it get a slab of their own.
+        min_block (`int`): The smallest block.
+        max_slabs (`int`): The maximum number of slabs.
+
+    Examples:
+        >>> from towhee.runtime.shm_transport import SharedArena
+        >>> arena = SharedArena(slab_size=1 << 20)
+        >>> slab, block = arena.allocate(100 << 10)
+        >>> arena.block_size(slab), arena.stats()['used_blocks']
+        (131072, 1)
+        >>> arena.decref(slab, block)
+        >>> arena.stats()['used_blocks']
+        0
+        >>> arena.close()
+    """
+    def __init__(self, slab_size: int = 64 << 20, min_block: int = 64 << 10, max_slabs: int = 256):
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise RuntimeError('SharedArena requires the fork start method, which is not available on this platform.')
+        self._name = 'towhee_' + uuid.uuid4().hex[:16]
+        self._slab_size = slab_size
+        self._min_block = min_block
+        self._max_slabs = max_slabs
+        self._owner = os.getpid()
+        self._lock = multiprocessing.get_context('fork').Lock()
+        self._local_lock = threading.Lock()
+        self._dir_shm = shared_memory.SharedMemory(name=self._name, create=True, size=8 + _DIR_ENTRY.itemsize * max_slabs)
+        self._num_slabs = _view(self._dir_shm, np.int64, 1, 0)
+        self._num_slabs[0] = 0
+        self._dir = _view(self._dir_shm, _DIR_ENTRY, max_slabs, 8)
+        self._slabs = {}
+        self._closed = False
+        _ARENAS[self._name] = self
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    def _size_class(self, nbytes: int) -> int:
+        size = self._min_block
+        while size < nbytes:
+            size <<= 1
+        return size
+
+    def _slab(self, slab: int) -> Tuple[shared_memory.SharedMemory, np.ndarray, int]:
+        """
+        The segment, the reference counts and the data offset of a slab, attached at the first use in this process.
+        """
+        with self._local_lock:
+            if slab not in self._slabs:
+                entry = self._dir[slab]
+                shm = shared_memory.SharedMemory(name=entry['name'].decode())
+                num_blocks = int(entry['num_blocks'])
+                self._slabs[slab] = (shm, _view(shm, np.int64, num_blocks, 0), _align(8 * num_blocks))
+            return self._slabs[slab]
+
+    def block_size(self, slab: int) -> int:
+        return int(self._dir[slab]['block_size'])
+
+    def allocate(self, nbytes: int) -> Tuple[int, int]:
+        """
+        Allocate a block of at least `nbytes` bytes with a reference count of one.
+        """
+        size = self._size_class(nbytes)
+        with self._lock:
+            for slab in range(int(self._num_slabs[0])):
+                if self._dir[slab]['block_size'] != size:
+                    continue
+                refs = self._slab(slab)[1]
+                free = np.flatnonzero(refs == 0)
+                if len(free) > 0:
+                    refs[free[0]] = 1
+                    return slab, int(free[0])
+            slab = int(self._num_slabs[0])
+            if slab >= self._max_slabs:
+                raise MemoryError('The shared arena {} is full with {} slabs.'.format(self._name, slab))
+            num_blocks = max(1, self._slab_size // size)
+            shm = shared_memory.SharedMemory(name='{}_{}'.format(self._name, slab), create=True,
+                                             size=_align(8 * num_blocks) + size * num_blocks)
+            self._dir[slab] = (size, num_blocks, shm.name.encode())
+            self._num_slabs[0] = slab + 1
+            with self._local_lock:
+                self._slabs[slab] = (shm, _view(shm, np.int64, num_blocks, 0), _align(8 * num_blocks))
+            self._slabs[slab][1][0] = 1
+            return slab, 0
+
+    def incref(self, slab: int, block: int):
+        with self._lock:
+            self._slab(slab)[1][block] += 1
+
+    def decref(self, slab: int, block: int):
+        if self._closed:
+            return
+        with self._lock:
+            refs = self._slab(slab)[1]
+            if refs[block] > 0:
+                refs[block] -= 1
+
+    def buffer(self, slab: int, block: int) -> np.ndarray:
+        """
+        The block as an uint8 array, the memory is not copied.
+        """
+        shm, _, offset = self._slab(slab)
+        size = self.block_size(slab)
+        return _view(shm, np.uint8, size, offset + block * size)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            num_slabs = int(self._num_slabs[0])
+            used = sum(int(np.count_nonzero(self._slab(i)[1])) for i in range(num_slabs))
+            total = sum(int(self._dir[i]['num_blocks']) for i in range(num_slabs))
+            nbytes = sum(int(self._dir[i]['num_blocks'] * self._dir[i]['block_size']) for i in range(num_slabs))
+        return {'slabs': num_slabs, 'blocks': total, 'used_blocks': used, 'bytes': nbytes}
+
+    def close(self):
+        """
+        Release the shared memory, the creating process also removes the segments.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        _ARENAS.pop(self._name, None)
+        owner = os.getpid() == self._owner
+        if owner:
+            for slab in range(int(self._num_slabs[0])):
+                self._slab(slab)
+        segments = [v[0] for v in self._slabs.values()] + [self._dir_shm]
+        self._slabs = {}
+        self._num_slabs = self._dir = None
+        for shm in segments:
+            if owner:
+                shm.unlink()
+            try:
+                shm.close()
+            except BufferError:
+                # The arrays still viewing the segment keep its mapping until they are collected.
+                shm._mmap = None  # pylint: disable=protected-access
+
+
+# The roots of the arrays on shared blocks in this process: id(root) -> (root weakref, arena name, slab, block).
+_SHARED_ROOTS: Dict[int, Tuple] = {}
+
+
+def _release(key: int, arena_name: str, slab: int, block: int):
+    _SHARED_ROOTS.pop(key, None)
+    arena = _ARENAS.get(arena_name)
+    if arena is not None:
+        arena.decref(slab, block)
+
+
+def _attach(arena: SharedArena, slab: int, block: int) -> np.ndarray:
+    """
+    Wrap a block of which this process owns one reference, the reference is dropped once all the arrays on it are collected.
+    """
+    root = arena.buffer(slab, block)
+    _SHARED_ROOTS[id(root)] = (weakref.ref(root), arena.name, slab, block)
+    weakref.finalize(root, _release, id(root), arena.name, slab, block)
+    return root
+
+
+def _find_root(arr: np.ndarray):
+    base = arr
+    while isinstance(base.base, np.ndarray):
+        base = base.base
+    entry = _SHARED_ROOTS.get(id(base))
+    if entry is not None and entry[0]() is base:
+        return base, entry
+    return None, None
+
+
+def _rebuild(arena_name: str, slab: int, block: int, offset: int, shape: tuple, strides: tuple, dtype: np.dtype,
+             cls: type, state: Dict) -> np.ndarray:
+    root = _attach(_ARENAS[arena_name], slab, block)
+    arr = np.ndarray(shape, dtype, root, offset, strides)
+    if cls is not np.ndarray:
+        arr = arr.view(cls)
+        arr.__dict__.update(state)
+    return arr
+
+
+class _SharedPickler(pickle.Pickler):
+    """
+    Pickle the large arrays as handles to shared blocks.
+    """
+    def __init__(self, file, arena: SharedArena, min_bytes: int):
+        super().__init__(file, protocol=5)
+        self._arena = arena
+        self._min_bytes = min_bytes
+
+    def reducer_override(self, obj):
+        if not isinstance(obj, np.ndarray) or obj.nbytes < self._min_bytes or obj.dtype.hasobject:
+            return NotImplemented
+        cls = type(obj)
+        # The attributes of the subclasses, e.g. the mode of `Image`, are restored on the view.
+        state = dict(getattr(obj, '__dict__', {}))
+        root, entry = _find_root(obj)
+        if root is not None and entry[1] == self._arena.name:
+            # Already on a shared block, send another reference to it.
+            _, _, slab, block = entry
+            self._arena.incref(slab, block)
+            offset = obj.__array_interface__['data'][0] - root.__array_interface__['data'][0]
+            return _rebuild, (self._arena.name, slab, block, offset, obj.shape, obj.strides, obj.dtype, cls, state)
+        slab, block = self._arena.allocate(obj.nbytes)
+        buf = self._arena.buffer(slab, block)
+        target = np.ndarray(obj.shape, obj.dtype, buf, 0)
+        target[...] = obj
+        return _rebuild, (self._arena.name, slab, block, 0, obj.shape, target.strides, obj.dtype, cls, state)
+
+
+def dumps(obj: Any, arena: SharedArena = None, min_bytes: int = 64 << 10) -> bytes:
+    """
+    Pickle `obj` with protocol 5, the `np.ndarray`s of at least `min_bytes` bytes, including `Image`, `VideoFrame`
+    and `AudioFrame`, are copied to `arena` and pickled as handles. The arrays already on a shared block are not
+    copied again. Every handle holds a reference to its block, so the result should be loaded exactly once, or
+    released by `discard` if it will not be loaded, e.g. the inputs of a call whose worker died.
+
+    Args:
+        obj (`Any`): The object.
+        arena (`SharedArena`): The shared memory, defaults to plain pickle.
+        min_bytes (`int`): The smaller arrays are pickled inline.
+
+    Examples:
+        >>> import numpy as np
+        >>> from towhee.types import Image
+        >>> from towhee.runtime.shm_transport import SharedArena, dumps, loads
+        >>> arena = SharedArena(slab_size=1 << 20)
+        >>> img = Image(np.ones((256, 256, 3), dtype=np.uint8), 'RGB')
+        >>> data = dumps({'img': img}, arena)
+        >>> len(data) < 1024
+        True
+        >>> out = loads(data)['img']
+        >>> type(out).__name__, out.mode, int(out.sum())
+        ('Image', 'RGB', 196608)
+        >>> del out
+        >>> arena.stats()['used_blocks']
+        0
+        >>> arena.close()
+    """
+    if arena is None:
+        return pickle.dumps(obj, protocol=5)
+    f = io.BytesIO()
+    _SharedPickler(f, arena, min_bytes).dump(obj)
+    return f.getvalue()
+
+
+def loads(data: bytes) -> Any:
+    """
+    Load the result of `dumps`, the arrays on shared blocks are not copied, and the blocks are released once the
+    arrays are collected.
+    """
+    return pickle.loads(data)
+
+
+def _drop(arena_name: str, slab: int, block: int, *_):
+    arena = _ARENAS.get(arena_name)
+    if arena is not None:
+        arena.decref(slab, block)
+
+
+class _DiscardUnpickler(pickle.Unpickler):
+    """
+    Release the shared blocks of the handles instead of attaching them.
+    """
+    def find_class(self, module, name):
+        if module == __name__ and name == '_rebuild':
+            return _drop
+        return super().find_class(module, name)
+
+
+def discard(data: bytes):
+    """
+    Release the shared blocks held by the result of `dumps` that will not be loaded.
+
+    Examples:
+        >>> import numpy as np
+        >>> from towhee.runtime.shm_transport import SharedArena, dumps, discard
+        >>> arena = SharedArena(slab_size=1 << 20)
+        >>> discard(dumps([np.ones(1 << 17)], arena))
+        >>> arena.stats()['used_blocks']
+        0
+        >>> arena.close()
+    """
+    try:
+        _DiscardUnpickler(io.BytesIO(data)).load()
+    except Exception as e:  # pylint: disable=broad-except
+        engine_log.warning('Release the shared blocks of an unloaded payload failed: %s', str(e))
+
+
+def run_payload(executor: Executor, fn: Callable[[bytes], Any], payload: bytes) -> Any:
+    """
+    Call `fn(payload)` in the process pool `executor`, the blocks of `payload` are released by `discard` if the
+    call is not run, is cancelled or its worker dies.
+    """
+    try:
+        future = executor.submit(fn, payload)
+    except RuntimeError:
+        # The pool is shut down or broken.
+        discard(payload)
+        raise
+    try:
+        return future.result()
+    except (BrokenProcessPool, CancelledError):
+        discard(payload)
+        raise
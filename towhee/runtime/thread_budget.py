@@ -0,0 +1,181 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import sys
+import threading
+import contextlib
+import contextvars
+from collections import Counter
+from typing import Dict, List, Optional
+
+from towhee.utils.log import engine_log
+
+
+_INTRA_OP_THREADS: contextvars.ContextVar = contextvars.ContextVar('intra_op_threads', default=None)
+
+# The threadpoolctl controller, created at the first use, False if threadpoolctl is not installed.
+_CONTROLLER = None
+
+
+def _threadpool_controller():
+    global _CONTROLLER  # pylint: disable=global-statement
+    if _CONTROLLER is None:
+        try:
+            from threadpoolctl import ThreadpoolController  # pylint: disable=import-outside-toplevel
+            _CONTROLLER = ThreadpoolController()
+        except ImportError:
+            _CONTROLLER = False
+    return _CONTROLLER or None
+
+
+def get_intra_op_threads() -> Optional[int]:
+    """
+    The intra-op threads assigned to the running node, None if not limited.
+
+    The operators creating their own thread pools, e.g. the onnxruntime sessions with `intra_op_num_threads`,
+    should read it at init or call.
+    """
+    return _INTRA_OP_THREADS.get()
+
+
+@contextlib.contextmanager
+def assign_intra_op_threads(num_threads: Optional[int]):
+    """
+    Make `get_intra_op_threads()` return `num_threads` in the context, without limiting the libraries.
+    """
+    token = _INTRA_OP_THREADS.set(num_threads)
+    try:
+        yield
+    finally:
+        _INTRA_OP_THREADS.reset(token)
+
+
+class _ProcessLimits:
+    """
+    The process-wide thread limits of torch and the BLAS libraries, set to the largest budget of the running nodes,
+    and restored once none of them runs.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._budgets = Counter()
+        self._applied = None
+        self._torch_threads = None
+        self._blas_limiter = None
+
+    def acquire(self, num_threads: int):
+        with self._lock:
+            self._budgets[num_threads] += 1
+            self._apply()
+
+    def release(self, num_threads: int):
+        with self._lock:
+            self._budgets[num_threads] -= 1
+            if self._budgets[num_threads] <= 0:
+                del self._budgets[num_threads]
+            self._apply()
+
+    @property
+    def limit(self) -> Optional[int]:
+        return self._applied
+
+    def _apply(self):
+        target = max(self._budgets) if self._budgets else None
+        if target == self._applied:
+            return
+        torch = sys.modules.get('torch')
+        controller = _threadpool_controller()
+        if target is None:
+            if torch is not None and self._torch_threads is not None:
+                torch.set_num_threads(self._torch_threads)
+            if self._blas_limiter is not None:
+                self._blas_limiter.restore_original_limits()
+            self._torch_threads = self._blas_limiter = None
+        else:
+            if torch is not None:
+                if self._torch_threads is None:
+                    self._torch_threads = torch.get_num_threads()
+                torch.set_num_threads(target)
+            if controller is not None:
+                try:
+                    limiter = controller.limit(limits=target, user_api='blas')
+                    # Keep the first limiter, it restores the limits from before any node.
+                    self._blas_limiter = self._blas_limiter or limiter
+                except Exception as e:  # pylint: disable=broad-except
+                    engine_log.warning('Limit the BLAS threads to %s failed: %s', target, str(e))
+        self._applied = target
+
+
+_PROCESS_LIMITS = _ProcessLimits()
+
+
+def process_thread_limit() -> Optional[int]:
+    """
+    The process-wide limit of the torch and BLAS threads set by the running nodes, None if not limited.
+    """
+    return _PROCESS_LIMITS.limit
+
+
+@contextlib.contextmanager
+def intra_op_threads(num_threads: Optional[int]):
+    """
+    Limit the intra-op threads of the calling thread in the context. The OpenMP limit of `threadpoolctl`, if it is
+    installed, is set for the calling thread. The torch and BLAS thread pools can only be limited for the whole
+    process, their limit is the largest budget of the nodes running in the context, so that the concurrent
+    nodes do not overwrite the limits of each other. Nothing is limited if `num_threads` is None.
+
+    Examples:
+        >>> from towhee.runtime.thread_budget import intra_op_threads, get_intra_op_threads
+        >>> with intra_op_threads(2):
+        ...     print(get_intra_op_threads())
+        2
+        >>> print(get_intra_op_threads())
+        None
+    """
+    if num_threads is None:
+        yield
+        return
+
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(assign_intra_op_threads(num_threads))
+        _PROCESS_LIMITS.acquire(num_threads)
+        stack.callback(_PROCESS_LIMITS.release, num_threads)
+        controller = _threadpool_controller()
+        if controller is not None:
+            try:
+                stack.enter_context(controller.limit(limits=num_threads, user_api='openmp'))
+            except Exception as e:  # pylint: disable=broad-except
+                engine_log.warning('Limit the intra-op threads to %s failed: %s', num_threads, str(e))
+        yield
+
+
+def split_thread_budget(nodes: List[str], fixed: Dict[str, int], total: int = None, concurrent_calls: int = 1) -> Dict[str, int]:
+    """
+    Assign the intra-op threads of the nodes within `total` threads, defaults to the number of CPUs.
+
+    The nodes in `fixed` keep their threads, the other nodes share the rest of the budget evenly, divided by
+    the number of the concurrent calls of the pipeline, at least one thread each.
+
+    Examples:
+        >>> from towhee.runtime.thread_budget import split_thread_budget
+        >>> split_thread_budget(['a', 'b', 'c'], {'a': 4}, total=16, concurrent_calls=2)
+        {'a': 4, 'b': 3, 'c': 3}
+    """
+    total = total or os.cpu_count()
+    assigned = dict((uid, fixed[uid]) for uid in nodes if uid in fixed)
+    others = [uid for uid in nodes if uid not in fixed]
+    if others:
+        share = max(1, (total - sum(assigned.values())) // (len(others) * max(1, concurrent_calls)))
+        assigned.update((uid, share) for uid in others)
+    return assigned
@@ -34,6 +34,8 @@ class TimeProfiler:
         self._enable = enable
         self._time_record = time_record if time_record else []
         self.inputs = None
+        # The peak bytes of the output queues of every node.
+        self.memory = None
 
     def record(self, uid, event):
         if not self._enable:
@@ -41,6 +43,10 @@ class TimeProfiler:
         timestamp = int(round(time.time() * 1000000))
         self._time_record.append(f'{uid}::{event}::{timestamp}')
 
+    @property
+    def enabled(self) -> bool:
+        return self._enable
+
     @property
     def time_record(self):
         return self._time_record
@@ -0,0 +1,399 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import re
+import json
+import time
+import random
+import threading
+import contextlib
+import contextvars
+import functools
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from towhee.utils.log import engine_log
+
+
+TRACEPARENT_HEADER = 'traceparent'
+
+_TRACEPARENT_RE = re.compile(r'^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$')
+
+
+class StatusCode:
+    UNSET = 'UNSET'
+    OK = 'OK'
+    ERROR = 'ERROR'
+
+
+class SpanContext:
+    """
+    The identity of a span, as propagated with the W3C `traceparent` header.
+
+    Args:
+        trace_id (`str`): 32 hex characters shared by all spans of a trace.
+        span_id (`str`): 16 hex characters identifying the span.
+        sampled (`bool`): Whether the trace is recorded.
+        remote (`bool`): Whether the context was extracted from another process.
+    """
+    def __init__(self, trace_id: str, span_id: str, sampled: bool = True, remote: bool = False):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.sampled = sampled
+        self.remote = remote
+
+    def to_traceparent(self) -> str:
+        """
+        Examples:
+            >>> from towhee.runtime.tracing import SpanContext
+            >>> SpanContext('0af7651916cd43dd8448eb211c80319c', 'b7ad6b7169203331').to_traceparent()
+            '00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01'
+        """
+        return '00-{}-{}-{}'.format(self.trace_id, self.span_id, '01' if self.sampled else '00')
+
+    @staticmethod
+    def from_traceparent(value: str) -> Optional['SpanContext']:
+        """
+        Parse a `traceparent` header value, invalid values are ignored.
+
+        Examples:
+            >>> from towhee.runtime.tracing import SpanContext
+            >>> ctx = SpanContext.from_traceparent('00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01')
+            >>> ctx.trace_id, ctx.span_id, ctx.sampled
+            ('0af7651916cd43dd8448eb211c80319c', 'b7ad6b7169203331', True)
+        """
+        if not value:
+            return None
+        match = _TRACEPARENT_RE.match(value.strip().lower())
+        if match is None:
+            return None
+        version, trace_id, span_id, flags = match.groups()
+        if version == 'ff' or trace_id == '0' * 32 or span_id == '0' * 16:
+            return None
+        return SpanContext(trace_id, span_id, bool(int(flags, 16) & 0x01), remote=True)
+
+
+class Span:
+    """
+    A timed operation in a trace, the fields follow the OpenTelemetry data model.
+    """
+    def __init__(self,
+                 tracer: 'Tracer',
+                 name: str,
+                 context: SpanContext,
+                 parent_id: str = None,
+                 attributes: Dict[str, Any] = None):
+        self._tracer = tracer
+        self.name = name
+        self.context = context
+        self.parent_id = parent_id
+        self.attributes = dict(attributes) if attributes else {}
+        self.status = StatusCode.UNSET
+        self.status_message = None
+        self.start_time = time.time_ns()
+        self.end_time = None
+
+    @property
+    def trace_id(self):
+        return self.context.trace_id
+
+    @property
+    def span_id(self):
+        return self.context.span_id
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_status(self, status: str, message: str = None):
+        self.status = status
+        self.status_message = message
+
+    def end(self):
+        if self.end_time is not None:
+            return
+        self.end_time = time.time_ns()
+        self._tracer.on_end(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'parentSpanId': self.parent_id or '',
+            'name': self.name,
+            'startTimeUnixNano': self.start_time,
+            'endTimeUnixNano': self.end_time,
+            'attributes': self.attributes,
+            'status': {'code': self.status, 'message': self.status_message or ''},
+            'resource': {'service.name': self._tracer.service_name},
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            self.set_status(StatusCode.ERROR, str(exc_val))
+        self.end()
+
+    def __repr__(self):
+        return 'Span({}, trace_id={}, span_id={})'.format(self.name, self.trace_id, self.span_id)
+
+
+class SpanExporter:
+    """
+    Base class of span exporters, `export` is called with every finished span.
+    """
+    def export(self, spans: List[Span]):
+        raise NotImplementedError
+
+    def shutdown(self):
+        pass
+
+
+class InMemorySpanExporter(SpanExporter):
+    """
+    Keep the finished spans in memory, for tests.
+    """
+    def __init__(self):
+        self._spans = []
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]):
+        with self._lock:
+            self._spans.extend(spans)
+
+    @property
+    def spans(self) -> List[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self):
+        with self._lock:
+            self._spans = []
+
+
+class FileSpanExporter(SpanExporter):
+    """
+    Append the finished spans to a local file, one json object per line.
+
+    Args:
+        file_path (`Union[str, Path]`): The file to write the spans to.
+    """
+    def __init__(self, file_path: Union[str, Path]):
+        self._file_path = Path(file_path)
+        self._lock = threading.Lock()
+        self._file = None
+
+    def export(self, spans: List[Span]):
+        lines = ''.join(json.dumps(span.to_dict(), default=str) + '\n' for span in spans)
+        with self._lock:
+            if self._file is None:
+                self._file = open(self._file_path, 'a', encoding='utf-8')  # pylint: disable=consider-using-with
+            self._file.write(lines)
+            self._file.flush()
+
+    def shutdown(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class Tracer:
+    """
+    Create spans and hand the finished ones to the exporter.
+
+    The sampling decision is made once per trace: a span whose parent is known follows the
+    parent's decision, a new trace is recorded with the probability `sample_rate`.
+
+    Args:
+        exporter (`SpanExporter`): Where to send the finished spans.
+        sample_rate (`float`): The ratio of traces to record, between 0 and 1.
+        service_name (`str`): The service name reported with every span.
+    """
+    def __init__(self, exporter: SpanExporter, sample_rate: float = 1.0, service_name: str = 'towhee'):
+        if not 0 <= sample_rate <= 1:
+            raise ValueError('The sample_rate should be in [0, 1], got {}.'.format(sample_rate))
+        self._exporter = exporter
+        self._sample_rate = sample_rate
+        self._service_name = service_name
+
+    @property
+    def exporter(self) -> SpanExporter:
+        return self._exporter
+
+    @property
+    def sample_rate(self) -> float:
+        return self._sample_rate
+
+    @property
+    def service_name(self) -> str:
+        return self._service_name
+
+    def start_span(self,
+                   name: str,
+                   parent: Union[Span, SpanContext] = None,
+                   attributes: Dict[str, Any] = None) -> Optional[Span]:
+        """
+        Start a span, returns None if the trace is not sampled.
+        """
+        if isinstance(parent, Span):
+            parent = parent.context
+
+        if parent is None:
+            if self._sample_rate < 1 and random.random() >= self._sample_rate:
+                return None
+            context = SpanContext(os.urandom(16).hex(), os.urandom(8).hex())
+            return Span(self, name, context, None, attributes)
+
+        if not parent.sampled:
+            return None
+        context = SpanContext(parent.trace_id, os.urandom(8).hex())
+        return Span(self, name, context, parent.span_id, attributes)
+
+    def on_end(self, span: Span):
+        try:
+            self._exporter.export([span])
+        except Exception as e:  # pylint: disable=broad-except
+            engine_log.warning('Export span %s failed: %s', span.name, str(e))
+
+    def shutdown(self):
+        self._exporter.shutdown()
+
+
+_TRACER: Optional[Tracer] = None
+_CURRENT_SPAN_VAR: contextvars.ContextVar = contextvars.ContextVar('towhee_current_span', default=None)
+
+
+def set_tracer(tracer: Optional[Tracer]):
+    """
+    Enable tracing with the tracer, set None to disable it.
+
+    Examples:
+        >>> from towhee.runtime import tracing
+        >>> exporter = tracing.InMemorySpanExporter()
+        >>> tracing.set_tracer(tracing.Tracer(exporter, sample_rate=1.0))
+        >>> with tracing.start_span('request') as span:
+        ...     pass
+        >>> [s.name for s in exporter.spans]
+        ['request']
+        >>> tracing.set_tracer(None)
+    """
+    global _TRACER
+    if _TRACER is not None and _TRACER is not tracer:
+        _TRACER.shutdown()
+    _TRACER = tracer
+
+
+def get_tracer() -> Optional[Tracer]:
+    return _TRACER
+
+
+def current_span() -> Union[Span, SpanContext, None]:
+    """
+    The active span of the current context, or the remote context extracted from a request.
+    """
+    return _CURRENT_SPAN_VAR.get()
+
+
+def start_span(name: str, attributes: Dict[str, Any] = None, parent: Union[Span, SpanContext] = None) -> Optional[Span]:
+    """
+    Start a span as a child of `parent`, which defaults to the current span. Returns None if
+    tracing is disabled or the trace is not sampled.
+    """
+    if _TRACER is None:
+        return None
+    if parent is None:
+        parent = _CURRENT_SPAN_VAR.get()
+    return _TRACER.start_span(name, parent, attributes)
+
+
+def start_child_span(name: str, attributes: Dict[str, Any] = None) -> Optional[Span]:
+    """
+    Same as `start_span`, but never starts a new trace: returns None if there is no current span.
+    """
+    parent = _CURRENT_SPAN_VAR.get()
+    if parent is None or _TRACER is None:
+        return None
+    return _TRACER.start_span(name, parent, attributes)
+
+
+@contextlib.contextmanager
+def use_span(span: Union[Span, SpanContext, None]):
+    """
+    Make the span the parent of the spans started in this context.
+    """
+    token = _CURRENT_SPAN_VAR.set(span)
+    try:
+        yield span
+    finally:
+        _CURRENT_SPAN_VAR.reset(token)
+
+
+@contextlib.contextmanager
+def server_span(name: str, headers, attributes: Dict[str, Any] = None):
+    """
+    Start the span of a served request, continuing the trace of the caller if the request
+    carries a `traceparent`.
+    """
+    parent = extract(headers)
+    span = start_span(name, attributes, parent)
+    with use_span(span if span is not None else parent):
+        if span is None:
+            yield None
+        else:
+            with span:
+                yield span
+
+
+def bind(span: Union[Span, SpanContext, None], func):
+    """
+    Return a callable running `func` with `span` as the current span, used to hand the trace
+    context to the threads of the thread pool.
+    """
+    if span is None:
+        return func
+    ctx = contextvars.copy_context()
+    ctx.run(_CURRENT_SPAN_VAR.set, span)
+    return functools.partial(ctx.run, func)
+
+
+def extract(headers) -> Optional[SpanContext]:
+    """
+    Extract the remote span context from HTTP headers or gRPC metadata.
+
+    Args:
+        headers: A mapping or an iterable of key-value pairs.
+    """
+    if headers is None:
+        return None
+    items = headers.items() if hasattr(headers, 'items') else headers
+    for key, value in items:
+        if key.lower() == TRACEPARENT_HEADER:
+            return SpanContext.from_traceparent(value)
+    return None
+
+
+def inject(headers: Dict[str, str] = None, span: Union[Span, SpanContext] = None) -> Dict[str, str]:
+    """
+    Write the `traceparent` of the span, which defaults to the current span, to the headers.
+    """
+    headers = {} if headers is None else headers
+    span = span if span is not None else _CURRENT_SPAN_VAR.get()
+    if isinstance(span, Span):
+        span = span.context
+    if span is not None:
+        headers[TRACEPARENT_HEADER] = span.to_traceparent()
+    return headers
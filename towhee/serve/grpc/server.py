@@ -23,6 +23,9 @@ from . import service_pb2
 from . import service_pb2_grpc
 from towhee.serve.io import JSON, TEXT, BYTES, NDARRAY
 from towhee.serve.api_service import RouterConfig
+from towhee.runtime import tracing
+from towhee.runtime.cancellation import CancelToken, cancel_scope
+from towhee.runtime.admission import PipelineOverloadedError
 from towhee.utils.log import engine_log
 
 
@@ -78,8 +81,17 @@ class _PipelineImpl(service_pb2_grpc.PipelineServicesServicer):
             err_msg = 'Unkown service path: %s, all paths is %s' % (path, list(self._router_map.keys()))
             engine_log.error(err_msg)
             response = service_pb2.Response(code=-1, msg=err_msg)
+        # The callback runs when the rpc terminates, the pipeline calls still running are cancelled
+        # if the client disconnects or cancels the rpc.
+        token = CancelToken()
+        context.add_callback(token.cancel)
         try:
-            response = self._run_func(request)
+            with cancel_scope(token), \
+                    tracing.server_span(path, context.invocation_metadata(), {'rpc.system': 'grpc', 'rpc.method': path}):
+                response = self._run_func(request)
+        except PipelineOverloadedError as e:
+            engine_log.warning('Reject gRPC method %s: %s', path, str(e))
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
         except Exception as e:  # pylint: disable=broad-except
             engine_log.error(traceback.format_exc())
             response = service_pb2.Response(code=-1, msg=str(e))
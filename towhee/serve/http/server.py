@@ -13,6 +13,7 @@
 # limitations under the License.
 
 from typing import Callable
+import asyncio
 import inspect
 from functools import partial
 import traceback
@@ -21,9 +22,16 @@ from towhee.utils.thirdparty.fastapi_utils import fastapi
 from towhee.utils.thirdparty.uvicorn_util import uvicorn
 
 from towhee.serve.io import JSON
+from towhee.runtime import tracing
+from towhee.runtime.cancellation import CancelToken, cancel_scope
+from towhee.runtime.admission import PipelineOverloadedError
 from towhee.utils.log import engine_log
 
 
+# The interval in seconds to check if the client of a running request has disconnected.
+DISCONNECT_POLL_INTERVAL = 0.1
+
+
 class HTTPServer:
     """
     An HTTP server implemented based on FastAPI
@@ -36,35 +44,61 @@ class HTTPServer:
         def index():
             return api_service.desc
 
-        def func_wrapper(func: Callable,
-                         input_model: 'IOBase',
-                         output_model: 'IOBase',
-                         request: fastapi.Request):
+        def call_func(func: Callable,
+                      input_model: 'IOBase',
+                      output_model: 'IOBase',
+                      request: fastapi.Request,
+                      token: CancelToken):
             if input_model is None:
                 input_model = JSON()
 
             if output_model is None:
                 output_model = JSON()
 
+            path = request.url.path
             try:
-                signature = inspect.signature(func)
-                if len(signature.parameters.keys()) == 0:
-                    return output_model.to_http(func())
-
-                values = input_model.from_http(request)
-                if len(signature.parameters.keys()) > 1:
-                    if isinstance(values, dict):
-                        ret = output_model.to_http(func(**values))
+                with cancel_scope(token), \
+                        tracing.server_span('POST ' + path, request.headers, {'http.method': 'POST', 'http.route': path}):
+                    signature = inspect.signature(func)
+                    if len(signature.parameters.keys()) == 0:
+                        return output_model.to_http(func())
+
+                    values = input_model.from_http(request)
+                    if len(signature.parameters.keys()) > 1:
+                        if isinstance(values, dict):
+                            ret = output_model.to_http(func(**values))
+                        else:
+                            ret = output_model.to_http(func(*values))
                     else:
-                        ret = output_model.to_http(func(*values))
-                else:
-                    ret = output_model.to_http(func(values))
-                return ret
+                        ret = output_model.to_http(func(values))
+                    return ret
+            except PipelineOverloadedError as e:
+                engine_log.warning('Reject request %s: %s', path, str(e))
+                raise fastapi.HTTPException(status_code=429, detail=str(e)) from e
             except Exception as e:
                 err = traceback.format_exc()
                 engine_log.error(err)
                 raise RuntimeError(err) from e
 
+        async def func_wrapper(func: Callable,
+                               input_model: 'IOBase',
+                               output_model: 'IOBase',
+                               request: fastapi.Request):
+            # Read the body in the event loop, `from_http` gets the cached body in the worker thread.
+            await request.body()
+            token = CancelToken()
+            task = asyncio.ensure_future(
+                fastapi.concurrency.run_in_threadpool(call_func, func, input_model, output_model, request, token)
+            )
+            while not token.cancelled:
+                done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_INTERVAL)
+                if done:
+                    break
+                if await request.is_disconnected():
+                    engine_log.info('The client of %s disconnected, cancel the request.', request.url.path)
+                    token.cancel()
+            return await task
+
         for router in api_service.routers:
             wrapper = partial(func_wrapper, router.func, router.input_model, router.output_model)
             wrapper.__name__ = router.func.__name__
@@ -0,0 +1,246 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple, Union
+
+from tabulate import tabulate
+
+from towhee.runtime.runtime_pipeline import RuntimePipeline
+from towhee.runtime.constants import InputConst, OutputConst, ConcatConst, OPType
+from towhee.runtime.async_runner import is_async_op
+from towhee.utils.log import engine_log
+
+
+def default_config() -> Dict[str, Any]:
+    """
+    The config of `apply_config` that changes nothing: the thread pool size, the running calls of `imap`
+    and the node configs by node name.
+    """
+    return {'max_workers': None, 'max_inflight': 16, 'nodes': {}}
+
+
+def apply_config(pipeline: RuntimePipeline, config: Dict[str, Any]) -> RuntimePipeline:
+    """
+    Build the pipeline again with the node configs of `config` updated, and the thread pool of `max_workers`.
+    The settings of `on_error`, `limit` and `thread_budget` are not copied.
+
+    Examples:
+        >>> from towhee import pipe
+        >>> from towhee.tools.autotune import apply_config
+        >>> p = pipe.input('a').map('a', 'b', lambda x: x + 1, config={'name': 'add'}).output('b')
+        >>> p = apply_config(p, {'nodes': {'add': {'queue_size': 8}}})
+        >>> p(1).get(), [n.config.queue_size for n in p.plan.nodes.values() if n.name == 'add']
+        ([2], [8])
+    """
+    node_configs = config.get('nodes') or {}
+    dag = {}
+    for uid, node in pipeline.dag_repr.dag_dict.items():
+        updates = node_configs.get(node['config']['name'])
+        dag[uid] = dict(node, config=dict(node['config'], **updates)) if updates else node
+    return RuntimePipeline(dag, max_workers=config.get('max_workers'))
+
+
+class TrialResult:
+    """
+    The measurement of the sample workload under a config.
+
+    Args:
+        config (`Dict[str, Any]`): The config.
+        rows (`int`): The inputs run.
+        seconds (`float`): The wall time.
+        latency (`Dict[str, float]`): The `p50_ms` and `p99_ms` of the calls.
+    """
+    def __init__(self, config: Dict[str, Any], rows: int, seconds: float, latency: Dict[str, float]):
+        self.config = config
+        self.rows = rows
+        self.seconds = seconds
+        self.latency = latency
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else float('inf')
+
+    def to_dict(self) -> Dict:
+        return {
+            'config': self.config,
+            'rows_per_sec': round(self.rows_per_sec, 2),
+            'p50_ms': self.latency.get('p50_ms'),
+            'p99_ms': self.latency.get('p99_ms'),
+        }
+
+
+class TuneResult:
+    """
+    The best config found by `autotune`, the baseline and the trials.
+    """
+    def __init__(self, baseline: TrialResult, best: TrialResult, trials: List[TrialResult], bottlenecks: List[Tuple[str, float]]):
+        self.baseline = baseline
+        self.best = best
+        self.trials = trials
+        self.bottlenecks = bottlenecks
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        return self.best.config
+
+    @property
+    def speedup(self) -> float:
+        """
+        The throughput of the best config over the baseline.
+        """
+        return self.best.rows_per_sec / self.baseline.rows_per_sec
+
+    def apply(self, pipeline: RuntimePipeline) -> RuntimePipeline:
+        return apply_config(pipeline, self.config)
+
+    def to_dict(self) -> Dict:
+        return {
+            'config': self.config,
+            'speedup': round(self.speedup, 4),
+            'baseline': self.baseline.to_dict(),
+            'best': self.best.to_dict(),
+            'bottlenecks': [[name, round(seconds, 6)] for name, seconds in self.bottlenecks],
+            'trials': [t.to_dict() for t in self.trials],
+        }
+
+    def save(self, file_path: Union[str, Path]):
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def show(self):
+        print('Bottlenecks: ', ', '.join('{}({}s)'.format(name, round(seconds, 4)) for name, seconds in self.bottlenecks))
+        print('Speedup: ', round(self.speedup, 3))
+        headers = ['config', 'rows/s', 'p50(ms)', 'p99(ms)']
+        rows = [[json.dumps(t.config), round(t.rows_per_sec, 2), t.latency.get('p50_ms'), t.latency.get('p99_ms')]
+                for t in [self.baseline] + self.trials]
+        print(tabulate(rows, headers=headers))
+
+
+def find_bottlenecks(pipeline: RuntimePipeline, inputs: Sequence) -> List[Tuple[str, float]]:
+    """
+    Profile the pipeline on `inputs` and return the names of the nodes with the seconds spent in their operators,
+    the slowest first.
+    """
+    report = pipeline.debug(inputs, batch=True, profiler=True).profiler.node_report
+    nodes = pipeline.plan.nodes
+    ret = [(nodes[uid].name, report[uid]['call_op']) for uid in report
+           if uid not in (InputConst.name, OutputConst.name) and nodes[uid].iter_info.type != ConcatConst.name]
+    return sorted(ret, key=lambda x: x[1], reverse=True)
+
+
+def run_trial(pipeline: RuntimePipeline, inputs: Sequence, config: Dict[str, Any]) -> TrialResult:
+    """
+    Run `inputs` through the pipeline built with `config` with `imap`, the operators are created before.
+    """
+    p = apply_config(pipeline, config)
+    try:
+        p.preload()
+        start = time.perf_counter()
+        for _ in p.imap(inputs, max_inflight=config.get('max_inflight') or 16):
+            pass
+        seconds = time.perf_counter() - start
+        latency = next(iter(p.latency_stats().values()))
+    finally:
+        p.release_process_ops()
+    return TrialResult(config, len(inputs), seconds, latency)
+
+
+def _candidates(config: Dict[str, Any], node_repr, parallelism: Sequence[int], queue_sizes: Sequence[int]) -> List[Dict]:
+    """
+    The configs changing one knob of the node from `config`: the processes of a sync operator or the
+    outstanding calls of an async operator, and the size of its output queues.
+    """
+    ret = []
+
+    def _with(key, value):
+        new = copy.deepcopy(config)
+        new['nodes'].setdefault(node_repr.name, {})[key] = value
+        ret.append(new)
+
+    op = node_repr.op_info.operator
+    if node_repr.op_info.type in [OPType.LAMBDA, OPType.CALLABLE] and is_async_op(op):
+        for n in parallelism:
+            _with('max_concurrency', n)
+    elif node_repr.op_info.type in [OPType.HUB, OPType.BUILTIN, OPType.LAMBDA, OPType.CALLABLE]:
+        for n in parallelism:
+            _with('num_processes', n)
+    for size in queue_sizes:
+        _with('queue_size', size)
+    return ret
+
+
+def autotune(pipeline: RuntimePipeline,
+             inputs: Sequence,
+             parallelism: Sequence[int] = (2, 4),
+             queue_sizes: Sequence[int] = (16, 128),
+             max_inflight: Sequence[int] = (1, 4, 16, 64),
+             max_workers: Sequence[int] = (),
+             max_bottlenecks: int = 2,
+             min_gain: float = 0.05) -> TuneResult:
+    """
+    Tune the pipeline on a sample workload. The nodes are profiled to find the bottlenecks, the slowest first,
+    then the knobs of every bottleneck, the running calls of `imap` and the size of the thread pool are searched
+    one at a time, keeping a change only if the throughput of `inputs` run with `imap` improves by `min_gain`.
+
+    The parallelism of a node is the processes of `num_processes` for a sync operator, and `max_concurrency`
+    for an async operator. The result can be applied with `result.apply(pipeline)`, or saved as json and
+    applied with `apply_config`.
+
+    Args:
+        pipeline (`RuntimePipeline`): The pipeline.
+        inputs (`Sequence`): The sample inputs, a tuple for every input of the pipelines with multiple inputs.
+        parallelism (`Sequence[int]`): The parallelism to try for every bottleneck.
+        queue_sizes (`Sequence[int]`): The sizes of the output queues to try for every bottleneck.
+        max_inflight (`Sequence[int]`): The running calls of `imap` to try.
+        max_workers (`Sequence[int]`): The thread pool sizes to try, defaults to keep the default.
+        max_bottlenecks (`int`): How many of the slowest nodes are tuned.
+        min_gain (`float`): The minimum relative improvement of the throughput to keep a change.
+
+    Examples:
+        >>> import time
+        >>> from towhee import pipe
+        >>> from towhee.tools.autotune import autotune
+        >>> p = pipe.input('a').map('a', 'b', lambda x: time.sleep(0.001) or x, config={'name': 'slow'}).output('b')
+        >>> result = autotune(p, list(range(32)), parallelism=(), queue_sizes=(), max_inflight=(1, 16))
+        >>> result.bottlenecks[0][0], result.speedup >= 1
+        ('slow', True)
+    """
+    inputs = list(inputs)
+    config = default_config()
+    bottlenecks = find_bottlenecks(pipeline, inputs)
+    baseline = best = run_trial(pipeline, inputs, config)
+    trials = []
+
+    def _search(candidates):
+        nonlocal best
+        for candidate in candidates:
+            try:
+                trial = run_trial(pipeline, inputs, candidate)
+            except Exception as e:  # pylint: disable=broad-except
+                engine_log.warning('Autotune trial %s failed: %s', json.dumps(candidate), str(e))
+                continue
+            trials.append(trial)
+            if trial.rows_per_sec > best.rows_per_sec * (1 + min_gain):
+                best = trial
+
+    nodes = dict((node.name, node) for node in pipeline.plan.nodes.values())
+    for name, _ in bottlenecks[:max_bottlenecks]:
+        _search(_candidates(best.config, nodes[name], parallelism, queue_sizes))
+    _search([dict(best.config, max_inflight=n) for n in max_inflight if n != best.config['max_inflight']])
+    _search([dict(best.config, max_workers=n) for n in max_workers])
+    return TuneResult(baseline, best, trials, bottlenecks)
@@ -0,0 +1,45 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from .synthetic_ops import synthetic_op, CpuSpinOp, SleepOp, NumpyAllocOp
+from .runtime_bench import (
+    BenchConfig,
+    BenchResult,
+    bench_group,
+    bench_groups,
+    measure,
+    measure_concurrent,
+    run_runtime_bench,
+    save_results,
+    load_results,
+    compare_results,
+)
+
+
+__all__ = [
+    'synthetic_op',
+    'CpuSpinOp',
+    'SleepOp',
+    'NumpyAllocOp',
+    'BenchConfig',
+    'BenchResult',
+    'bench_group',
+    'bench_groups',
+    'measure',
+    'measure_concurrent',
+    'run_runtime_bench',
+    'save_results',
+    'load_results',
+    'compare_results',
+]
@@ -0,0 +1,511 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import sys
+import json
+import time
+import platform
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Union
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from towhee.runtime.pipeline import Pipeline as pipe
+from towhee.runtime.runtime_pipeline import RuntimePipeline
+from towhee.runtime.data_queue import DataQueue, ColumnType
+from towhee.runtime.execution_plan import clear_plan_cache
+from towhee.runtime.operator_manager import requirements
+from towhee.runtime.hub_ops import ops
+from towhee.hub import cache_manager
+from towhee.hub.downloader import repo_tag_path
+from towhee.types import VideoFrame
+from towhee.utils.log import engine_log
+from .synthetic_ops import synthetic_op
+
+
+class BenchConfig:
+    """
+    The parameters of the runtime benchmark.
+
+    Args:
+        rows (`int`): The rows processed by one pipeline call.
+        calls (`int`): How many times every case is repeated.
+        cost (`str`): The synthetic operator, one of 'cpu', 'sleep', 'alloc' and 'matmul'.
+        cost_amount (`int`): Microseconds for 'cpu' and 'sleep', bytes for 'alloc', the matrix size for 'matmul'.
+        concurrency (`List[int]`): The numbers of concurrent callers.
+        queue_widths (`List[int]`): The `max_size` of the data queues.
+        frame_shape (`tuple`): The shape of the frames sent between processes.
+    """
+    def __init__(self,
+                 rows: int = 1000,
+                 calls: int = 10,
+                 cost: str = 'cpu',
+                 cost_amount: int = 10,
+                 concurrency: List[int] = (1, 4, 16),
+                 queue_widths: List[int] = (1, 16, 256, 1000),
+                 frame_shape: tuple = (720, 1280, 3)):
+        self.rows = rows
+        self.calls = calls
+        self.cost = cost
+        self.cost_amount = cost_amount
+        self.concurrency = list(concurrency)
+        self.queue_widths = list(queue_widths)
+        self.frame_shape = tuple(frame_shape)
+
+    def op(self):
+        return synthetic_op(self.cost, self.cost_amount)
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+
+class BenchResult:
+    """
+    The measurement of one benchmark case.
+
+    Args:
+        name (`str`): The case name.
+        rows (`int`): The total rows processed.
+        seconds (`float`): The wall time.
+        latencies (`List[float]`): The latency in seconds of every call.
+    """
+    def __init__(self, name: str, rows: int, seconds: float, latencies: List[float]):
+        self.name = name
+        self.rows = rows
+        self.seconds = seconds
+        self.latencies = latencies
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else float('inf')
+
+    def percentile(self, p: float) -> float:
+        return float(np.percentile(self.latencies, p)) * 1000
+
+    def to_dict(self) -> Dict:
+        return {
+            'rows': self.rows,
+            'seconds': round(self.seconds, 6),
+            'rows_per_sec': round(self.rows_per_sec, 2),
+            'latency_ms': {
+                'p50': round(self.percentile(50), 4),
+                'p90': round(self.percentile(90), 4),
+                'p99': round(self.percentile(99), 4),
+                'max': round(max(self.latencies) * 1000, 4),
+            }
+        }
+
+
+def measure(name: str, func: Callable, rows: int, calls: int) -> BenchResult:
+    """
+    Call `func` `calls` times, each call processes `rows` rows.
+    """
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(calls):
+        t = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - t)
+    return BenchResult(name, rows * calls, time.perf_counter() - start, latencies)
+
+
+def measure_concurrent(name: str, func: Callable, calls: int, concurrency: int) -> BenchResult:
+    """
+    Call `func` `calls` times from `concurrency` threads, each call processes one row.
+    """
+    def _timed():
+        t = time.perf_counter()
+        func()
+        return time.perf_counter() - t
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(lambda _: _timed(), range(calls)))
+    return BenchResult(name, calls, time.perf_counter() - start, latencies)
+
+
+_BENCH_GROUPS: Dict[str, Callable[[BenchConfig], List[BenchResult]]] = {}
+
+
+def bench_group(name: str):
+    """
+    Register a group of benchmark cases, the function takes a `BenchConfig` and returns a list of `BenchResult`.
+    """
+    def _register(func):
+        _BENCH_GROUPS[name] = func
+        return func
+    return _register
+
+
+def bench_groups() -> List[str]:
+    return list(_BENCH_GROUPS)
+
+
+def _node_pipelines(op):
+    src = pipe.input('d').flat_map('d', 'x', lambda d: d)
+    yield 'map', src.map('x', 'y', op).output('y')
+    yield 'flat_map', src.flat_map('x', 'y', lambda x: (op(x),)).output('y')
+    yield 'filter', src.filter('x', 'y', 'x', lambda x: op(x) is not None).output('y')
+    yield 'window', src.window('x', 'y', 10, 10, op).output('y')
+    yield 'time_window', (pipe.input('d')
+                          .flat_map('d', ('x', 't'), lambda d: ((i, i * 100) for i in d))
+                          .time_window('x', 'y', 't', 1, 1, op)
+                          .output('y'))
+    yield 'window_all', src.window_all('x', 'y', op).output('y')
+    yield 'reduce', src.reduce('x', 'y', lambda xs: len(op(list(xs)))).output('y')
+    yield 'concat', src.map('x', 'y', op).concat(src.map('x', 'z', op)).output('y', 'z')
+
+
+@bench_group('node')
+def node_bench(config: BenchConfig) -> List[BenchResult]:
+    """
+    The throughput of every node type, one call streams `config.rows` rows through the node.
+    """
+    data = list(range(config.rows))
+    results = []
+    for name, p in _node_pipelines(config.op()):
+        results.append(measure('node/' + name, lambda p=p: p(data), config.rows, config.calls))
+    return results
+
+
+@bench_group('queue')
+def queue_bench(config: BenchConfig) -> List[BenchResult]:
+    """
+    Producer/consumer throughput of `DataQueue` with different `max_size`.
+    """
+    def _transfer(width):
+        que = DataQueue([('x', ColumnType.QUEUE)], max_size=width)
+
+        def _produce():
+            for i in range(config.rows):
+                que.put((i,))
+            que.seal()
+
+        producer = threading.Thread(target=_produce)
+        producer.start()
+        while que.get() is not None:
+            pass
+        producer.join()
+
+    return [measure('queue/width_{}'.format(width), lambda width=width: _transfer(width), config.rows, config.calls)
+            for width in config.queue_widths]
+
+
+@bench_group('batch')
+def batch_bench(config: BenchConfig) -> List[BenchResult]:
+    """
+    `batch` and `imap` against repeated `__call__` with the same inputs.
+    """
+    p = pipe.input('x').map('x', 'y', config.op()).output('y')
+    data = list(range(config.rows))
+
+    def _call():
+        for x in data:
+            p(x)
+
+    return [
+        measure('batch/call', _call, config.rows, config.calls),
+        measure('batch/batch', lambda: p.batch(data), config.rows, config.calls),
+        measure('batch/imap', lambda: sum(1 for _ in p.imap(data)), config.rows, config.calls),
+        measure('batch/imap_unordered', lambda: sum(1 for _ in p.imap(data, ordered=False)), config.rows, config.calls),
+    ]
+
+
+@bench_group('concurrency')
+def concurrency_bench(config: BenchConfig) -> List[BenchResult]:
+    """
+    One-row calls from concurrent callers sharing a pipeline.
+    """
+    p = pipe.input('x').map('x', 'y', config.op()).output('y')
+    return [measure_concurrent('concurrency/{}'.format(c), lambda: p(1), config.rows, c)
+            for c in config.concurrency]
+
+
+@bench_group('build')
+def build_bench(config: BenchConfig) -> List[BenchResult]:
+    """
+    Building a chain of 100 map nodes and compiling it, with the plan compiled from scratch or taken
+    from the plan cache, the rows are the nodes.
+    """
+    nodes = 100
+    op = config.op()
+
+    def _build(cold):
+        p = pipe.input('x')
+        for _ in range(nodes):
+            p = p.map('x', 'x', op)
+        if cold:
+            clear_plan_cache()
+        p.output('x')
+
+    return [
+        measure('build/cold', lambda: _build(True), nodes, config.calls),
+        measure('build/cached', lambda: _build(False), nodes, config.calls),
+    ]
+
+
+@bench_group('priority')
+def priority_bench(config: BenchConfig) -> List[BenchResult]:
+    """
+    One-row calls of a pipeline with two calls worth of threads, made alone and under a bulk load of
+    `max(config.concurrency)` callers, with 'high' and with the same 'normal' priority as the load.
+    """
+    p = pipe.input('x').map('x', 'y', config.op()).map('y', 'z', config.op())
+    runtime = RuntimePipeline(p.output('z').dag_repr.dag_dict, max_workers=8)
+    stop = threading.Event()
+
+    def _load():
+        while not stop.is_set():
+            runtime(1, priority='normal')
+
+    results = [measure('priority/idle', lambda: runtime(1, priority='high'), 1, config.rows)]
+    loaders = [threading.Thread(target=_load) for _ in range(max(config.concurrency))]
+    for t in loaders:
+        t.start()
+    try:
+        for priority in ['high', 'normal']:
+            results.append(measure('priority/' + priority, lambda priority=priority: runtime(1, priority=priority), 1, config.rows))
+    finally:
+        stop.set()
+        for t in loaders:
+            t.join()
+    return results
+
+
+@bench_group('multiprocess')
+def multiprocess_bench(config: BenchConfig) -> List[BenchResult]:
+    """
+    `batch` of a pipeline with a GIL-bound operator in threads, and sharded to forked processes, the numbers
+    of processes are `config.concurrency` up to the number of CPUs.
+    """
+    p = pipe.input('x').map('x', 'y', config.op()).output('y')
+    data = list(range(config.rows))
+    results = [measure('multiprocess/threads', lambda: p.batch(data), config.rows, config.calls)]
+    for workers in sorted(set(min(c, os.cpu_count()) for c in config.concurrency)):
+        with p.multiprocess(num_workers=workers) as mp:
+            results.append(measure('multiprocess/workers_{}'.format(workers), lambda mp=mp: mp.batch(data),
+                                   config.rows, config.calls))
+    return results
+
+
+@bench_group('transport')
+def transport_bench(config: BenchConfig) -> List[BenchResult]:
+    """
+    Send `VideoFrame`s of `config.frame_shape` to an operator in another process and back, pickled through
+    the pipes and through shared memory, at most 100 frames a call.
+    """
+    rows = min(config.rows, 100)
+    frame = VideoFrame(np.random.randint(0, 256, config.frame_shape, dtype=np.uint8), 'RGB', 0)
+    data = [frame] * rows
+    results = []
+    for name, shared_memory in [('pickle', False), ('shared_memory', True)]:
+        p = pipe.input('x').map('x', 'y', lambda x: x, config={'num_processes': 1, 'shared_memory': shared_memory}).output('y')
+        p.preload()
+        results.append(measure('transport/' + name, lambda p=p: p.batch(data), rows, config.calls))
+        p.release_process_ops()
+    return results
+
+
+@bench_group('threads')
+def threads_bench(config: BenchConfig) -> List[BenchResult]:
+    """
+    Calls of a BLAS-bound operator from the most concurrent callers of `config.concurrency`, with the
+    intra-op thread pools of the libraries at their full width, and within the thread budget of the pipeline.
+    The budget limits BLAS through threadpoolctl, the two cases are the same without it.
+    """
+    concurrency = max(config.concurrency)
+    op = synthetic_op('matmul', 256)
+    results = []
+    for name, budget in [('unlimited', False), ('budget', True)]:
+        p = pipe.input('x').map('x', 'y', op).output('y')
+        if budget:
+            p.limit(concurrency, max_queue=config.rows).thread_budget()
+        results.append(measure_concurrent('threads/' + name, lambda p=p: p(1), config.rows, concurrency))
+    return results
+
+
+@bench_group('route')
+def route_bench(config: BenchConfig) -> List[BenchResult]:
+    """
+    Dispatch the rows by media type to one of four branches, with a filter on the type in every branch and with
+    one route node. The type costs one synthetic operator call, the filters compute it once per branch.
+    """
+    media = ['image', 'video', 'audio', 'text']
+    op = config.op()
+
+    def _media_type(x):
+        op(x)
+        return media[x % len(media)]
+
+    src = pipe.input('d').flat_map('d', 'x', lambda d: d)
+    router = src.route('x', _media_type)
+    cases = [
+        ('filter', [src.filter('x', 'x_' + m, 'x', lambda x, m=m: _media_type(x) == m).map('x_' + m, m, op) for m in media]),
+        ('route', [router.branch(m).map('x', m, op) for m in media]),
+    ]
+    data = list(range(config.rows))
+    results = []
+    for name, branches in cases:
+        p = branches[0].concat(*branches[1:]).output(*media)
+        results.append(measure('route/' + name, lambda p=p: p(data), config.rows, config.calls))
+    return results
+
+
+@bench_group('chain')
+def chain_bench(config: BenchConfig) -> List[BenchResult]:
+    """
+    The per-row overhead of the runtime, `config.rows` rows streamed through a chain of 10 trivial map nodes.
+    """
+    p = pipe.input('d').flat_map('d', 'x', lambda d: d)
+    for _ in range(10):
+        p = p.map('x', 'x', lambda x: x)
+    p = p.output('x')
+    data = list(range(config.rows))
+    return [measure('chain/map_10', lambda: p(data), config.rows, config.calls)]
+
+
+@bench_group('inline')
+def inline_bench(config: BenchConfig) -> List[BenchResult]:
+    """
+    The latency of the single-row calls of a query-embedding style pipeline, tokenize, encode and normalize,
+    running the graph and running inline on the calling thread.
+    """
+    op = config.op()
+    p = (pipe.input('text')
+             .map('text', 'tokens', lambda t: t.split())
+             .map('tokens', 'vec', lambda tokens: np.full(8, op(len(tokens)), dtype=np.float32))
+             .map('vec', 'vec', lambda v: v / (np.linalg.norm(v) or 1))
+             .output('vec'))
+    results = []
+    for name, inline in [('graph', False), ('inline', True)]:
+        p.inline(inline)
+        results.append(measure('inline/' + name, lambda: p('a query to embed'), 1, config.calls))
+    p.inline()
+    return results
+
+
+_REQ_OP = '''from towhee.operator import PyOperator
+
+
+class Identity(PyOperator):
+    def __call__(self, x):
+        return x
+
+
+def req_op_{}():
+    return Identity()
+'''
+
+
+@bench_group('requirements')
+def requirements_bench(config: BenchConfig) -> List[BenchResult]:
+    """
+    Building a pipeline of 10 hub operators with a requirements file of installed packages, from a temporary hub
+    cache, with the requirements checked against the installed distributions or taken from the requirements
+    cache, the rows are the operators.
+    """
+    num_ops = 10
+    with tempfile.TemporaryDirectory() as root, cache_manager.local_dir(root):
+        try:
+            for i in range(num_ops):
+                op_dir = repo_tag_path(Path(root) / 'operators' / 'towhee-bench' / 'req-op-{}'.format(i), 'main')
+                op_dir.mkdir(parents=True)
+                (op_dir / '__init__.py').write_text(_REQ_OP.format(i), encoding='utf-8')
+                (op_dir / 'requirements.txt').write_text('# req_op_{}\nnumpy\ntabulate\n'.format(i), encoding='utf-8')
+
+            def _build(cold):
+                if cold:
+                    requirements.requirements_cache.clear()
+                p = pipe.input('x')
+                for i in range(num_ops):
+                    p = p.map('x', 'x', getattr(ops.towhee_bench, 'req_op_{}'.format(i))())
+                p.output('x')
+
+            return [
+                measure('requirements/cold', lambda: _build(True), num_ops, config.calls),
+                measure('requirements/warm', lambda: _build(False), num_ops, config.calls),
+            ]
+        finally:
+            # Do not keep the cache file of the temporary hub.
+            requirements.requirements_cache.reset()
+
+
+def run_runtime_bench(groups: List[str] = None, config: BenchConfig = None) -> Dict:
+    """
+    Run the benchmark groups and return the results in a json serializable dict.
+
+    Args:
+        groups (`List[str]`): The groups to run, defaults to all the groups.
+        config (`BenchConfig`): The benchmark parameters.
+    """
+    config = config or BenchConfig()
+    groups = groups or bench_groups()
+    results = {}
+    for group in groups:
+        if group not in _BENCH_GROUPS:
+            raise ValueError('Unknown benchmark group {}, should be one of {}.'.format(group, bench_groups()))
+        engine_log.info('Running benchmark group: %s', group)
+        for res in _BENCH_GROUPS[group](config):
+            results[res.name] = res.to_dict()
+    return {
+        'meta': {
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'timestamp': int(time.time()),
+            'config': config.to_dict(),
+        },
+        'results': results,
+    }
+
+
+def save_results(results: Dict, file_path: Union[str, Path]):
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+
+
+def load_results(file_path: Union[str, Path]) -> Dict:
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare_results(results: Dict, baseline: Dict, tolerance: float = 0.2) -> List[str]:
+    """
+    Compare the results with the baseline, returns the descriptions of the regressions.
+
+    A case regresses if its throughput drops or its p99 latency grows by more than `tolerance`,
+    cases missing from either side are ignored.
+
+    Examples:
+        >>> from towhee.tools.benchmark import compare_results
+        >>> base = {'results': {'a': {'rows_per_sec': 100, 'latency_ms': {'p99': 10}}}}
+        >>> cur = {'results': {'a': {'rows_per_sec': 50, 'latency_ms': {'p99': 10}}}}
+        >>> compare_results(cur, base)
+        ['a: rows_per_sec 50.00 < 100.00 (-50.0%)']
+    """
+    regressions = []
+    for name, base in baseline['results'].items():
+        cur = results['results'].get(name)
+        if cur is None:
+            continue
+        if cur['rows_per_sec'] < base['rows_per_sec'] * (1 - tolerance):
+            regressions.append('{}: rows_per_sec {:.2f} < {:.2f} ({:+.1f}%)'.format(
+                name, cur['rows_per_sec'], base['rows_per_sec'], (cur['rows_per_sec'] / base['rows_per_sec'] - 1) * 100))
+        if cur['latency_ms']['p99'] > base['latency_ms']['p99'] * (1 + tolerance):
+            regressions.append('{}: p99 {:.4f}ms > {:.4f}ms ({:+.1f}%)'.format(
+                name, cur['latency_ms']['p99'], base['latency_ms']['p99'], (cur['latency_ms']['p99'] / base['latency_ms']['p99'] - 1) * 100))
+    return regressions
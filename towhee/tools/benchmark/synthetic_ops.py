@@ -0,0 +1,97 @@
+# Copyright 2023 Zilliz. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+
+import numpy as np
+
+
+class SyntheticOp:
+    """
+    Operator with a configurable cost, returns its input unchanged.
+    """
+    def __init__(self, amount: int = 0):
+        self._amount = amount
+
+    def cost(self):
+        raise NotImplementedError
+
+    def __call__(self, x):
+        self.cost()
+        return x
+
+
+class CpuSpinOp(SyntheticOp):
+    """
+    Busy loop for `amount` microseconds, holding the GIL.
+    """
+    def cost(self):
+        end = time.perf_counter() + self._amount / 1000000
+        while time.perf_counter() < end:
+            pass
+
+
+class SleepOp(SyntheticOp):
+    """
+    Sleep for `amount` microseconds, like an operator waiting on IO.
+    """
+    def cost(self):
+        if self._amount > 0:
+            time.sleep(self._amount / 1000000)
+
+
+class NumpyAllocOp(SyntheticOp):
+    """
+    Allocate and fill an ndarray of `amount` bytes.
+    """
+    def cost(self):
+        np.ones(self._amount, dtype=np.uint8)
+
+
+class MatmulOp(SyntheticOp):
+    """
+    Multiply two `amount` x `amount` float32 matrices, running in the BLAS thread pool.
+    """
+    def __init__(self, amount: int = 0):
+        super().__init__(amount)
+        self._matrix = np.random.rand(amount, amount).astype(np.float32)
+
+    def cost(self):
+        np.matmul(self._matrix, self._matrix)
+
+
+SYNTHETIC_OPS = {
+    'cpu': CpuSpinOp,
+    'sleep': SleepOp,
+    'alloc': NumpyAllocOp,
+    'matmul': MatmulOp,
+}
+
+
+def synthetic_op(kind: str, amount: int) -> SyntheticOp:
+    """
+    Create a synthetic operator.
+
+    Args:
+        kind (`str`): One of 'cpu', 'sleep', 'alloc' and 'matmul'.
+        amount (`int`): Microseconds for 'cpu' and 'sleep', bytes for 'alloc', the matrix size for 'matmul'.
+
+    Examples:
+        >>> from towhee.tools.benchmark import synthetic_op
+        >>> synthetic_op('cpu', 10)(1)
+        1
+    """
+    if kind not in SYNTHETIC_OPS:
+        raise ValueError('Unknown synthetic op {}, should be one of {}.'.format(kind, list(SYNTHETIC_OPS)))
+    return SYNTHETIC_OPS[kind](amount)
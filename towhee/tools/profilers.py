@@ -30,6 +30,8 @@ class PipelineProfiler:
         self.time_in = None
         self.time_out = None
         self.data = None
+        # The peak bytes of the output queues of every node, if counted.
+        self.memory = {}
         self.node_tracer = {}
         self.node_report = {}
         for uid, node in nodes.items():
@@ -57,12 +59,13 @@ class PipelineProfiler:
                 wait_data=self.cal_time(tracer['queue_in'], tracer['process_in']),
                 call_op=self.cal_time(tracer['process_in'], tracer['process_out']),
                 output_data=self.cal_time(tracer['process_out'], tracer['queue_out']),
+                peak_bytes=self.memory.get(node_id, 0),
             )
 
     def show(self):
         print('Input: ', self.data)
         print('Total time(s):', round(self.time_out - self.time_in, 3))
-        headers = ['node', 'ncalls', 'total_time(s)', 'init(s)', 'wait_data(s)', 'call_op(s)', ' output_data(s)']
+        headers = ['node', 'ncalls', 'total_time(s)', 'init(s)', 'wait_data(s)', 'call_op(s)', ' output_data(s)', 'peak_bytes']
         print(tabulate([report.values() for _, report in self.node_report.items()], headers=headers))
 
     def dump(self, file_path):
@@ -161,6 +164,7 @@ class PerformanceProfiler:
         for tf in self._time_prfilers:
             p_tracer = PipelineProfiler(self._nodes)
             p_tracer.data = tf.inputs
+            p_tracer.memory = tf.memory or {}
             for ts_info in tf.time_record:
                 name, event, ts = ts_info.split('::')
                 p_tracer.add_node_tracer(name, event, ts)
@@ -178,6 +182,7 @@ class PerformanceProfiler:
                 self.node_report[node_id]['wait_data'] += node_tracer['wait_data']
                 self.node_report[node_id]['call_op'] += node_tracer['call_op']
                 self.node_report[node_id]['output_data'] += node_tracer['output_data']
+                self.node_report[node_id]['peak_bytes'] = max(self.node_report[node_id]['peak_bytes'], node_tracer['peak_bytes'])
 
     def get_timing_report(self):
         timeline = self.pipes_profiler[-1].time_out - self.pipes_profiler[0].time_in
@@ -195,7 +200,7 @@ class PerformanceProfiler:
         print('Avg time(s): ', self.timing[1])
         print('Max time(s): ', self.timing[2])
         print('Min time(s): ', self.timing[3])
-        headers = ['node', 'ncalls', 'total_time(s)', 'init(s)', 'wait_data(s)', 'call_op(s)', ' output_data(s)']
+        headers = ['node', 'ncalls', 'total_time(s)', 'init(s)', 'wait_data(s)', 'call_op(s)', ' output_data(s)', 'peak_bytes']
         print(tabulate([report.values() for _, report in self.node_report.items()], headers=headers))
 
     def sort(self):